@@ -0,0 +1,83 @@
+# Ceinture d'astéroïdes entre Mars et Jupiter
+# Les astéroïdes ne sont pas des CelestialBody : leurs paramètres vivent dans des
+# tableaux NumPy, leurs positions sont calculées en bloc et dessinées en un seul appel.
+from OpenGL.GL import *
+import numpy as np
+
+from ephemeris import Ephemeris
+
+
+class AsteroidBelt:
+    def __init__(self, count=100000, inner_radius=16.0, outer_radius=19.0,
+                 reference_distance=15.0, reference_period=687, max_inclination=3.0,
+                 color=(0.6, 0.55, 0.5), point_size=1.5, seed=None):
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.color = color
+        self.point_size = point_size
+
+        # Répartition uniforme en surface dans l'anneau
+        self.radius = np.sqrt(rng.uniform(inner_radius ** 2, outer_radius ** 2, count))
+        # Troisième loi de Kepler, calée sur l'orbite de Mars
+        period = reference_period * (self.radius / reference_distance) ** 1.5
+        self.rate = Ephemeris.angular_rate(period)
+        self.epoch_angle = rng.uniform(0, 360, count)
+
+        # Orientation du plan de chaque orbite (petite inclinaison, nœud aléatoire)
+        inclination = np.radians(rng.uniform(-max_inclination, max_inclination, count))
+        node = rng.uniform(0, 2 * np.pi, count)
+        self.cos_node = np.cos(node)
+        self.sin_node = np.sin(node)
+        self.cos_incl = np.cos(inclination)
+        self.sin_incl = np.sin(inclination)
+
+        # Tampons préalloués, réutilisés à chaque image
+        self.positions = np.zeros((count, 3), dtype=np.float32)
+        self._angle = np.empty(count)
+        self._p = np.empty(count)
+        self._q = np.empty(count)
+        self.vbo = None
+
+    def update(self, t):
+        """Calcule la position de tous les astéroïdes au temps simulé t"""
+        angle, p, q = self._angle, self._p, self._q
+        np.multiply(self.rate, t, out=angle)
+        angle += self.epoch_angle
+        np.radians(angle, out=angle)
+        np.cos(angle, out=p)
+        np.sin(angle, out=q)
+        p *= self.radius
+        q *= self.radius
+
+        # Même convention que les planètes : angle positif = rotation autour de +Y
+        self.positions[:, 0] = p * self.cos_node - q * self.cos_incl * self.sin_node
+        self.positions[:, 1] = q * self.sin_incl
+        self.positions[:, 2] = -(p * self.sin_node + q * self.cos_incl * self.cos_node)
+
+    def draw(self):
+        glPushAttrib(GL_ENABLE_BIT | GL_POINT_BIT | GL_CURRENT_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
+        glEnable(GL_POINT_SMOOTH)
+        glPointSize(self.point_size)
+        glColor3f(*self.color)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if bool(glGenBuffers):
+            # Un seul tampon de sommets, mis à jour en bloc à chaque image
+            if self.vbo is None:
+                self.vbo = glGenBuffers(1)
+                glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+                glBufferData(GL_ARRAY_BUFFER, self.positions.nbytes, None, GL_STREAM_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.positions.nbytes, self.positions)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glDrawArrays(GL_POINTS, 0, self.count)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            # Repli sans VBO : tableau de sommets côté client
+            glVertexPointer(3, GL_FLOAT, 0, self.positions)
+            glDrawArrays(GL_POINTS, 0, self.count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        glPopAttrib()
@@ -0,0 +1,41 @@
+# Horloge de simulation à pas fixe (accumulateur)
+# La simulation avance toujours par pas de 1/tick_rate seconde, quel que soit
+# le nombre d'images affichées : la vitesse des orbites ne dépend plus de la machine.
+import time
+
+
+class SimulationClock:
+    def __init__(self, tick_rate=60.0, max_steps=5):
+        self.tick_rate = float(tick_rate)  # Pas de simulation par seconde réelle
+        self.max_steps = max_steps  # Nombre maximal de pas de rattrapage par image
+        self.accumulator = 0.0
+        self.alpha = 0.0  # Fraction du pas suivant déjà écoulée (pour l'interpolation)
+        self.last_time = None
+
+    @property
+    def step_duration(self):
+        return 1.0 / self.tick_rate
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.last_time = None
+
+    def tick(self, now=None):
+        """Renvoie le nombre de pas fixes à simuler depuis le dernier appel"""
+        if now is None:
+            now = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += max(0.0, now - self.last_time)
+        self.last_time = now
+
+        dt = self.step_duration
+        steps = int(self.accumulator // dt)
+        if steps > self.max_steps:
+            # Machine trop lente : on abandonne le retard plutôt que de s'emballer
+            steps = self.max_steps
+            self.accumulator = dt * self.max_steps + self.accumulator % dt
+        self.accumulator -= steps * dt
+        self.alpha = self.accumulator / dt
+        return steps
@@ -0,0 +1,77 @@
+# Élimination des corps hors du champ de la caméra (frustum culling)
+# Chaque corps est englobé dans une sphère qui contient aussi ses anneaux et, récursivement,
+# ses lunes : si la sphère d'une planète est hors champ, ses lunes et ses anneaux ne sont
+# même pas testés. Tous les corps sont testés en une fois à partir de l'éphéméride.
+from OpenGL.GL import *
+import numpy as np
+
+
+def frustum_planes(projection, modelview):
+    """Les six plans (a, b, c, d) du volume de vue, normales vers l'intérieur
+
+    projection et modelview sont les matrices lues avec glGetDoublev (ordre colonne).
+    """
+    # Les tableaux lus sont les transposées : (P V)^T = V^T P^T
+    m = (np.asarray(modelview).reshape(4, 4) @ np.asarray(projection).reshape(4, 4)).T
+    planes = np.array([m[3] + m[0], m[3] - m[0],   # gauche, droite
+                       m[3] + m[1], m[3] - m[1],   # bas, haut
+                       m[3] + m[2], m[3] - m[2]])  # proche, lointain
+    return planes / np.linalg.norm(planes[:, :3], axis=1)[:, np.newaxis]
+
+
+def bounding_radii(ephemeris, extents=None):
+    """Rayon de la sphère englobant chaque corps, ses anneaux (extents) et toutes ses lunes"""
+    n = ephemeris.count
+    bound = ephemeris.radius[:n].copy()
+    if extents is not None:
+        np.maximum(bound, extents[:n], out=bound)
+    world = ephemeris.world_position[:n]
+    # Des lunes les plus profondes vers les racines, à partir des positions de l'image courante
+    for level in reversed(ephemeris.levels()[1:]):
+        parent = ephemeris.parent[level]
+        reach = np.linalg.norm(world[level] - world[parent], axis=1) + bound[level]
+        np.maximum.at(bound, parent, reach)
+    return bound
+
+
+class FrustumCuller:
+    def __init__(self):
+        # Résultats de l'image courante (None : tout est dessiné)
+        self.systems = None  # Sphère englobante (corps + lunes + anneaux) dans le champ
+        self.bodies = None   # Corps lui-même dans le champ
+        self.rings = None    # Anneaux dans le champ
+        self.stats = {'drawn': 0, 'culled': 0, 'rings_drawn': 0, 'rings_culled': 0}
+
+    def begin_frame(self, ephemeris, extents=None):
+        """À appeler avant de dessiner la scène, une fois la caméra placée (gluLookAt)"""
+        n = ephemeris.count
+        planes = frustum_planes(glGetDoublev(GL_PROJECTION_MATRIX), glGetDoublev(GL_MODELVIEW_MATRIX))
+        world = ephemeris.world_position[:n]
+        # Distance signée de chaque centre à chaque plan : (corps, plans)
+        distance = world @ planes[:, :3].T + planes[:, 3]
+
+        self.systems = np.all(distance > -bounding_radii(ephemeris, extents)[:, np.newaxis], axis=1)
+        for level in ephemeris.levels()[1:]:
+            self.systems[level] &= self.systems[ephemeris.parent[level]]
+        self.bodies = self.systems & np.all(distance > -ephemeris.radius[:n, np.newaxis], axis=1)
+
+        if extents is None:
+            self.rings = np.zeros(n, dtype=bool)
+            has_rings = self.rings
+        else:
+            has_rings = extents[:n] > 0
+            self.rings = self.systems & has_rings & np.all(distance > -extents[:n, np.newaxis], axis=1)
+
+        drawn = int(np.count_nonzero(self.bodies))
+        rings_drawn = int(np.count_nonzero(self.rings))
+        self.stats = {'drawn': drawn, 'culled': n - drawn,
+                      'rings_drawn': rings_drawn, 'rings_culled': int(np.count_nonzero(has_rings)) - rings_drawn}
+
+    def system_in_view(self, index):
+        return self.systems is None or bool(self.systems[index])
+
+    def body_in_view(self, index):
+        return self.bodies is None or bool(self.bodies[index])
+
+    def rings_in_view(self, index):
+        return self.rings is None or bool(self.rings[index])
@@ -0,0 +1,154 @@
+# Détection des éclipses et occultations
+# Pour chaque couple (cible, occulteur), l'ombre projetée par l'occulteur est un cône
+# d'ombre (umbra) et un cône de pénombre issus du soleil. Tous les couples, et tous les
+# instants d'une plage de temps, sont testés en bloc avec NumPy.
+import numpy as np
+
+from events import refine_roots
+
+
+def shadow_geometry(positions, radii, light_index, targets, occluders):
+    """Géométrie des ombres pour chaque couple (cible, occulteur)
+
+    positions a la forme (..., n, 3) ; le résultat a la forme (..., cibles, occulteurs) :
+    x     distance derrière l'occulteur le long de l'axe soleil -> occulteur
+    rho   distance de la cible à cet axe
+    umbra, penumbra   rayons des cônes d'ombre et de pénombre à la distance x
+    """
+    sun = positions[..., light_index, :]
+    sun_radius = radii[light_index]
+    occluder = positions[..., occluders, :]
+    occluder_radius = radii[occluders]
+
+    axis = occluder - sun[..., np.newaxis, :]
+    distance = np.linalg.norm(axis, axis=-1)
+    direction = axis / np.maximum(distance, 1e-12)[..., np.newaxis]
+
+    relative = positions[..., targets, np.newaxis, :] - occluder[..., np.newaxis, :, :]
+    x = np.einsum('...tok,...ok->...to', relative, direction)
+    rho = np.linalg.norm(relative - x[..., np.newaxis] * direction[..., np.newaxis, :, :], axis=-1)
+
+    # Demi-angles des cônes (tangentes intérieure et extérieure aux deux sphères)
+    sin_umbra = np.clip((sun_radius - occluder_radius) / np.maximum(distance, 1e-12), -0.999, 0.999)
+    sin_penumbra = np.clip((sun_radius + occluder_radius) / np.maximum(distance, 1e-12), -0.999, 0.999)
+    umbra = occluder_radius - x * np.tan(np.arcsin(sin_umbra))[..., np.newaxis, :]
+    penumbra = occluder_radius + x * np.tan(np.arcsin(sin_penumbra))[..., np.newaxis, :]
+    return x, rho, umbra, penumbra
+
+
+def _default_subsets(radii, light_index, targets, occluders):
+    everyone = np.flatnonzero(np.arange(len(radii)) != light_index)
+    targets = everyone if targets is None else np.asarray(targets, dtype=np.int64)
+    occluders = everyone[radii[everyone] > 0] if occluders is None else np.asarray(occluders, dtype=np.int64)
+    return targets, occluders
+
+
+def shadow_factors(positions, radii, light_index, targets=None, occluders=None):
+    """Fraction de lumière reçue par chaque corps (1 = pleinement éclairé, 0 = dans l'ombre)"""
+    positions = np.asarray(positions, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64)
+    targets, occluders = _default_subsets(radii, light_index, targets, occluders)
+    factors = np.ones(len(radii))
+    if len(targets) == 0 or len(occluders) == 0:
+        return factors
+
+    x, rho, umbra, penumbra = shadow_geometry(positions, radii, light_index, targets, occluders)
+    target_radius = radii[targets][:, np.newaxis]
+
+    # Rampe entre l'entrée dans la pénombre et l'immersion complète dans l'ombre
+    inner = umbra - target_radius
+    outer = penumbra + target_radius
+    ramp = np.clip((rho - inner) / np.maximum(outer - inner, 1e-12), 0, 1)
+
+    # Profondeur maximale : rapport des disques apparents de l'occulteur et du soleil
+    to_sun = np.linalg.norm(positions[light_index] - positions[targets], axis=-1)[:, np.newaxis]
+    to_occluder = np.linalg.norm(positions[occluders] - positions[targets][:, np.newaxis, :], axis=-1)
+    depth = np.minimum(1.0, (radii[occluders] * to_sun / (radii[light_index] * np.maximum(to_occluder, 1e-12))) ** 2)
+
+    occulted = depth * (1 - ramp)
+    occulted[(x <= 0) | (targets[:, np.newaxis] == occluders[np.newaxis, :])] = 0
+    factors[targets] = 1 - occulted.max(axis=1)
+    return factors
+
+
+def _contact_functions(positions, radii, light_index, targets, occluders):
+    # Négatives lorsque la cible touche la pénombre / l'ombre de l'occulteur
+    x, rho, umbra, penumbra = shadow_geometry(positions, radii, light_index, targets, occluders)
+    target_radius = radii[targets][:, np.newaxis]
+    behind = x > 0
+    far = np.abs(rho) + 1.0  # Valeur positive quand la cible est devant l'occulteur
+    penumbral = np.where(behind, rho - target_radius - penumbra, far)
+    umbral = np.where(behind & (umbra > 0), rho - target_radius - umbra, far)
+    return np.stack([penumbral, umbral], axis=-1)
+
+
+KINDS = ('penumbra', 'umbra')
+
+
+def find_eclipses(ephemeris, radii, light_index, t_start, t_end, step, targets=None, occluders=None,
+                  block=4096, tolerance=1e-4, max_iterations=60):
+    """Recherche les éclipses entre t_start et t_end
+
+    Échantillonnage grossier (pas step) de toutes les cibles et occulteurs à la fois, puis
+    raffinement vectorisé (fausse position) de chaque changement de signe. Renvoie une liste
+    de dictionnaires {target, occluder, kind, start, end} triée par date de début.
+    """
+    radii = np.asarray(radii, dtype=np.float64)
+    targets, occluders = _default_subsets(radii, light_index, targets, occluders)
+
+    # Seuls les corps concernés (et leurs parents) sont calculés
+    reduced, remap = ephemeris.subset(np.r_[targets, occluders, light_index])
+    reduced_radii = radii[remap >= 0]
+    reduced_targets, reduced_occluders, reduced_light = remap[targets], remap[occluders], remap[light_index]
+
+    def evaluate(times):
+        _, world = reduced.positions_at(*reduced.state_at(times))
+        return _contact_functions(world, reduced_radii, reduced_light, reduced_targets, reduced_occluders)
+
+    times = t_start + step * np.arange(int(np.ceil((t_end - t_start) / step)) + 1)
+    times[-1] = min(times[-1], t_end)
+
+    crossings = []  # (indice de couple à plat, temps et valeurs de part et d'autre, entrée ?)
+    initial = None
+    previous = None
+    for begin in range(0, len(times), block):
+        chunk_times = times[begin:begin + block]
+        values = evaluate(chunk_times).reshape(len(chunk_times), -1)
+        if previous is not None:
+            chunk_times = np.r_[previous[0], chunk_times]
+            values = np.vstack([previous[1], values])
+        else:
+            initial = values[0] < 0
+        inside = values < 0
+        change = inside[1:] != inside[:-1]
+        step_index, pair = np.nonzero(change)
+        crossings.append((pair, chunk_times[step_index], chunk_times[step_index + 1],
+                          values[step_index, pair], values[step_index + 1, pair], inside[step_index + 1, pair]))
+        previous = (chunk_times[-1:], values[-1:])
+
+    pair, low, high, f_low, f_high, entering = (np.concatenate(column) for column in zip(*crossings))
+
+    # Affinage simultané de tous les encadrements (fausse position)
+    roots = refine_roots(lambda t, active: evaluate(t).reshape(len(t), -1)[np.arange(len(t)), pair[active]],
+                         low, high, f_low, f_high, tolerance, max_iterations)
+
+    # Association des entrées et sorties de chaque couple
+    events = []
+    order = np.lexsort((roots, pair))
+    open_since = {p: t_start for p in np.flatnonzero(initial)}
+    for p, t, enter in zip(pair[order], roots[order], entering[order]):
+        if enter:
+            open_since[p] = t
+        elif p in open_since:
+            events.append((p, open_since.pop(p), t))
+    events.extend((p, start, t_end) for p, start in open_since.items())
+
+    result = []
+    for p, start, end in events:
+        target, occluder, kind = np.unravel_index(p, (len(targets), len(occluders), len(KINDS)))
+        if targets[target] == occluders[occluder]:
+            continue
+        result.append({'target': int(targets[target]), 'occluder': int(occluders[occluder]),
+                       'kind': KINDS[kind], 'start': float(start), 'end': float(end)})
+    result.sort(key=lambda event: event['start'])
+    return result
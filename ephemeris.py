@@ -0,0 +1,256 @@
+# Moteur d'éphémérides vectorisé (structure de tableaux)
+# Chaque corps céleste occupe une ligne des tableaux NumPy ci-dessous,
+# CelestialBody n'est plus qu'une vue sur sa ligne.
+import numpy as np
+
+from kepler import orbital_positions
+
+
+# Accès à une colonne de l'éphéméride pour la ligne du corps
+def ephemeris_field(name):
+    def getter(self):
+        return getattr(self.ephemeris, name)[self.index]
+
+    def setter(self, value):
+        getattr(self.ephemeris, name)[self.index] = value
+
+    return property(getter, setter)
+
+
+class Ephemeris:
+    # Champs optionnels : éléments orbitaux (degrés, nuls pour une orbite circulaire), masse et rayon
+    OPTIONAL_FIELDS = ('eccentricity', 'inclination', 'longitude_of_node', 'argument_of_periapsis', 'mass', 'radius')
+
+    # Champs stockés par corps (nom, type, valeur par défaut, largeur éventuelle)
+    FIELDS = (
+        ('distance', np.float64, 0.0),
+        ('orbital_period', np.float64, 0.0),
+        ('rotation_period', np.float64, 0.0),
+        ('orbit_angle', np.float64, 0.0),
+        ('rotation_angle', np.float64, 0.0),
+        ('parent', np.int64, -1),
+        ('eccentricity', np.float64, 0.0),
+        ('inclination', np.float64, 0.0),
+        ('longitude_of_node', np.float64, 0.0),
+        ('argument_of_periapsis', np.float64, 0.0),
+        ('mass', np.float64, 0.0),  # Masse pour le mode gravitationnel (0 = particule test)
+        ('radius', np.float64, 0.0),  # Rayon du corps (éclipses, sélection, culling)
+        # Angles à l'instant t = 0 (époque), pour le calcul en forme fermée
+        ('epoch_orbit_angle', np.float64, 0.0),
+        ('epoch_rotation_angle', np.float64, 0.0),
+        # État au pas précédent et angles interpolés pour l'affichage
+        ('previous_orbit_angle', np.float64, 0.0),
+        ('previous_rotation_angle', np.float64, 0.0),
+        ('render_orbit_angle', np.float64, 0.0),
+        ('render_rotation_angle', np.float64, 0.0),
+        # Positions résolues pour l'affichage : dans le repère du parent et dans la scène
+        ('local_position', np.float64, 0.0, 3),
+        ('world_position', np.float64, 0.0, 3),
+        # Facteur d'éclairage calculé en bloc (voir illumination.py), lu par draw()
+        ('illumination', np.float64, 1.0),
+    )
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = max(1, capacity)
+        self.time = 0.0  # Temps simulé (en pas à time_scale = 1)
+        self.previous_time = 0.0
+        self.render_time = 0.0  # Temps interpolé correspondant aux angles d'affichage
+        self._levels = None
+        for name, dtype, default, *width in self.FIELDS:
+            setattr(self, name, np.full((self.capacity, *width), default, dtype=dtype))
+
+    def _grow(self, minimum):
+        """Agrandit les tableaux (doublement de la capacité)"""
+        capacity = self.capacity
+        while capacity < minimum:
+            capacity *= 2
+        for name, dtype, default, *width in self.FIELDS:
+            old = getattr(self, name)
+            new = np.full((capacity, *width), default, dtype=dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def add_body(self, distance, orbital_period, rotation_period, orbit_angle=0.0, rotation_angle=0.0, **elements):
+        """Ajoute un corps et renvoie l'indice de sa ligne"""
+        if self.count >= self.capacity:
+            self._grow(self.count + 1)
+        index = self.count
+        self.distance[index] = distance
+        self.orbital_period[index] = orbital_period
+        self.rotation_period[index] = rotation_period
+        self.orbit_angle[index] = orbit_angle
+        self.rotation_angle[index] = rotation_angle
+        self.parent[index] = -1
+        self._set_elements(index, elements)
+        self.rebase(slice(index, index + 1))
+        self.count += 1
+        self._levels = None
+        return index
+
+    def add_bodies(self, distance, orbital_period, rotation_period, orbit_angle=0.0, rotation_angle=0.0, parent=-1,
+                   **elements):
+        """Ajoute un lot de corps en une fois (astéroïdes, lunes...) et renvoie leurs indices"""
+        distance = np.asarray(distance, dtype=np.float64)
+        n = distance.shape[0]
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+        rows = slice(self.count, self.count + n)
+        self.distance[rows] = distance
+        self.orbital_period[rows] = orbital_period
+        self.rotation_period[rows] = rotation_period
+        self.orbit_angle[rows] = orbit_angle
+        self.rotation_angle[rows] = rotation_angle
+        self.parent[rows] = parent
+        self._set_elements(rows, elements)
+        self.rebase(rows)
+        indices = np.arange(self.count, self.count + n)
+        self.count += n
+        self._levels = None
+        return indices
+
+    def _set_elements(self, rows, elements):
+        for name in self.OPTIONAL_FIELDS:
+            getattr(self, name)[rows] = elements.pop(name, 0.0)
+        if elements:
+            raise TypeError(f"Champ inconnu : {', '.join(elements)}")
+
+    def rebase(self, rows=None):
+        """Recalcule l'époque à partir des angles courants (après modification d'une période)"""
+        if rows is None:
+            rows = slice(0, self.count)
+        self.epoch_orbit_angle[rows] = self.orbit_angle[rows] - self.angular_rate(self.orbital_period[rows]) * self.time
+        self.epoch_rotation_angle[rows] = self.rotation_angle[rows] - self.angular_rate(self.rotation_period[rows]) * self.time
+        self._reset_history(rows)
+
+    def _reset_history(self, rows):
+        for prefix in ('previous_', 'render_'):
+            getattr(self, prefix + 'orbit_angle')[rows] = self.orbit_angle[rows]
+            getattr(self, prefix + 'rotation_angle')[rows] = self.rotation_angle[rows]
+
+    def set_parent(self, index, parent):
+        self.parent[index] = parent
+        self._levels = None
+
+    def subset(self, rows):
+        """Copie réduite aux corps donnés et à leurs ancêtres
+
+        Renvoie la nouvelle éphéméride et la table de correspondance des indices (-1 si absent).
+        """
+        keep = set()
+        for row in np.atleast_1d(rows):
+            row = int(row)
+            while row >= 0 and row not in keep:
+                keep.add(row)
+                row = int(self.parent[row])
+        keep = np.array(sorted(keep), dtype=np.int64)
+        remap = np.full(self.count, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        sub = Ephemeris(len(keep))
+        for name, *_ in self.FIELDS:
+            getattr(sub, name)[:len(keep)] = getattr(self, name)[keep]
+        parent = self.parent[keep]
+        sub.parent[:len(keep)] = np.where(parent >= 0, remap[np.maximum(parent, 0)], -1)
+        sub.count = len(keep)
+        sub.time = sub.previous_time = sub.render_time = self.time
+        return sub, remap
+
+    def levels(self):
+        """Indices des corps regroupés par profondeur (racines, lunes, lunes de lunes...)"""
+        if self._levels is None:
+            parent = self.parent[:self.count]
+            depth = np.zeros(self.count, dtype=np.int64)
+            ancestor = parent.copy()
+            while np.any(ancestor >= 0):
+                has_parent = ancestor >= 0
+                depth[has_parent] += 1
+                ancestor[has_parent] = parent[ancestor[has_parent]]
+            self._levels = [np.flatnonzero(depth == d) for d in range(int(depth.max(initial=0)) + 1)]
+        return self._levels
+
+    @staticmethod
+    def angular_rate(period):
+        """Vitesse angulaire (degrés par pas de temps), nulle si la période n'est pas positive"""
+        period = np.asarray(period, dtype=np.float64)
+        rate = np.zeros_like(period)
+        # Même échelle que l'ancien CelestialBody.update (ajustée pour la visualisation)
+        np.divide(360.0, period * 10, out=rate, where=period > 0)
+        return rate
+
+    def state_at(self, t):
+        """Angles (orbite, rotation) de tous les corps au temps t, calculés directement depuis l'époque
+
+        t peut être un scalaire ou un tableau de temps : le résultat a alors la forme t.shape + (count,)
+        """
+        n = self.count
+        t = np.asarray(t, dtype=np.float64)[..., np.newaxis]
+        orbit = self.epoch_orbit_angle[:n] + self.angular_rate(self.orbital_period[:n]) * t
+        rotation = self.epoch_rotation_angle[:n] + self.angular_rate(self.rotation_period[:n]) * t
+        return orbit, rotation
+
+    def seek(self, t):
+        """Place directement la simulation au temps t, sans rejouer les pas intermédiaires"""
+        n = self.count
+        self.time = self.previous_time = self.render_time = float(t)
+        self.orbit_angle[:n], self.rotation_angle[:n] = self.state_at(self.time)
+        self._reset_history(slice(0, n))
+
+    def advance(self, time_scale):
+        """Fait avancer tous les corps d'un pas en une seule opération"""
+        n = self.count
+        self.previous_orbit_angle[:n] = self.orbit_angle[:n]
+        self.previous_rotation_angle[:n] = self.rotation_angle[:n]
+        self.previous_time = self.time
+        self.time += time_scale
+        self.orbit_angle[:n], self.rotation_angle[:n] = self.state_at(self.time)
+
+    def interpolate(self, alpha):
+        """Calcule les angles d'affichage entre le pas précédent et le pas courant"""
+        n = self.count
+        self.render_time = self.previous_time + (self.time - self.previous_time) * alpha
+        for name in ('orbit_angle', 'rotation_angle'):
+            previous = getattr(self, 'previous_' + name)[:n]
+            current = getattr(self, name)[:n]
+            render = getattr(self, 'render_' + name)
+            np.subtract(current, previous, out=render[:n])
+            render[:n] *= alpha
+            render[:n] += previous
+
+    def positions_at(self, orbit_angle, rotation_angle, fixed=None):
+        """Positions locales et positions dans la scène pour des angles donnés
+
+        Les angles peuvent avoir des dimensions en tête (plusieurs instants) :
+        le résultat a alors la forme orbit_angle.shape + (3,).
+        Les lunes sont placées dans le repère tournant de leur parent, comme au dessin.
+        fixed = (indices, positions) impose la position de corps racines (mode gravitationnel).
+        """
+        n = self.count
+        local = orbital_positions(
+            self.distance[:n], self.eccentricity[:n], self.inclination[:n],
+            self.longitude_of_node[:n], self.argument_of_periapsis[:n], orbit_angle
+        )
+        if fixed is not None:
+            rows, positions = fixed
+            local[..., rows, :] = positions
+        world = local.copy()
+        # Orientation du repère dans lequel sont dessinés les enfants de chaque corps
+        frame = np.asarray(orbit_angle + rotation_angle, dtype=np.float64).copy()
+        for rows in self.levels()[1:]:
+            parents = self.parent[rows]
+            yaw = np.radians(frame[..., parents])
+            c, s = np.cos(yaw), np.sin(yaw)
+            lx, ly, lz = local[..., rows, 0], local[..., rows, 1], local[..., rows, 2]
+            world[..., rows, 0] = world[..., parents, 0] + c * lx + s * lz
+            world[..., rows, 1] = world[..., parents, 1] + ly
+            world[..., rows, 2] = world[..., parents, 2] - s * lx + c * lz
+            frame[..., rows] += frame[..., parents]
+        return local, world
+
+    def solve_positions(self, fixed=None):
+        """Résout en un seul passage les positions d'affichage de tous les corps"""
+        n = self.count
+        local, world = self.positions_at(self.render_orbit_angle[:n], self.render_rotation_angle[:n], fixed)
+        self.local_position[:n] = local
+        self.world_position[:n] = world
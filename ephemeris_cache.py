@@ -0,0 +1,137 @@
+# Cache d'éphémérides précalculées pour la relecture de longues plages de temps
+# Les positions et angles de tous les corps sont échantillonnés à intervalle fixe
+# dans un fichier binaire .npy, projeté en mémoire et interpolé à l'exécution.
+# Le nom du fichier dépend des paramètres de la scène : toute modification des
+# corps dans SolarSystem.__init__ invalide donc automatiquement le cache.
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = "ephemeris_cache"
+
+# Paramètres qui définissent la scène (et donc la validité du cache)
+SCENE_FIELDS = (
+    'distance', 'orbital_period', 'rotation_period', 'parent',
+    'eccentricity', 'inclination', 'longitude_of_node', 'argument_of_periapsis',
+    'epoch_orbit_angle', 'epoch_rotation_angle',
+)
+
+# Colonnes d'un échantillon : position locale (3), position dans la scène (3), angles (2)
+LOCAL, WORLD, ORBIT, ROTATION = slice(0, 3), slice(3, 6), 6, 7
+COLUMNS = 8
+
+
+def scene_key(ephemeris):
+    """Empreinte des paramètres de tous les corps de la scène"""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}:{ephemeris.count}".encode())
+    for name in SCENE_FIELDS:
+        digest.update(np.ascontiguousarray(getattr(ephemeris, name)[:ephemeris.count]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def cache_paths(directory, key):
+    base = os.path.join(directory, f"ephemeris_{key}")
+    return base + ".npy", base + ".json"
+
+
+def build_cache(ephemeris, directory, start, end, interval, block=1024):
+    """Précalcule les échantillons entre start et end et renvoie le chemin du fichier"""
+    os.makedirs(directory, exist_ok=True)
+    key = scene_key(ephemeris)
+    data_path, meta_path = cache_paths(directory, key)
+    times = start + interval * np.arange(int(np.floor((end - start) / interval)) + 1)
+    if len(times) < 2:
+        raise ValueError("La plage doit contenir au moins deux échantillons")
+
+    temporary = data_path + ".tmp"
+    data = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float32,
+                                     shape=(len(times), ephemeris.count, COLUMNS))
+    # Calcul par blocs d'instants : tous les corps et tous les instants du bloc en une fois
+    for begin in range(0, len(times), block):
+        t = times[begin:begin + block]
+        orbit, rotation = ephemeris.state_at(t)
+        local, world = ephemeris.positions_at(orbit, rotation)
+        chunk = data[begin:begin + block]
+        chunk[..., LOCAL] = local
+        chunk[..., WORLD] = world
+        chunk[..., ORBIT] = np.mod(orbit, 360)
+        chunk[..., ROTATION] = np.mod(rotation, 360)
+    data.flush()
+    del data
+    os.replace(temporary, data_path)
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({'version': CACHE_VERSION, 'key': key, 'start': float(start), 'interval': float(interval),
+                   'samples': len(times), 'bodies': ephemeris.count}, f)
+    return data_path
+
+
+class EphemerisCache:
+    def __init__(self, data_path, meta):
+        self.data = np.load(data_path, mmap_mode='r')  # Projection en mémoire, lue à la demande
+        self.start = meta['start']
+        self.interval = meta['interval']
+        self.samples = meta['samples']
+        self.end = self.start + self.interval * (self.samples - 1)
+
+    @classmethod
+    def open(cls, directory, ephemeris):
+        """Ouvre le cache de la scène courante, ou renvoie None s'il est absent ou périmé"""
+        data_path, meta_path = cache_paths(directory, scene_key(ephemeris))
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_VERSION or meta.get('bodies') != ephemeris.count:
+            return None
+        return cls(data_path, meta)
+
+    def covers(self, t):
+        return self.start <= t <= self.end
+
+    @staticmethod
+    def _interpolate_angle(a, b, rate, interval, fraction):
+        # Les angles sont stockés modulo 360 : on reconstitue le nombre de tours à partir de la vitesse
+        wrapped = np.mod(b - a, 360)
+        turns = np.round((rate * interval - wrapped) / 360)
+        return a + (wrapped + 360 * turns) * fraction
+
+    def apply(self, ephemeris, t=None):
+        """Écrit dans l'éphéméride les positions et angles d'affichage interpolés au temps t"""
+        if t is None:
+            t = ephemeris.render_time
+        n = ephemeris.count
+        x = (t - self.start) / self.interval
+        i = min(max(int(np.floor(x)), 0), self.samples - 2)
+        fraction = x - i
+        a = np.asarray(self.data[i], dtype=np.float64)
+        b = np.asarray(self.data[i + 1], dtype=np.float64)
+
+        ephemeris.local_position[:n] = a[:, LOCAL] + (b[:, LOCAL] - a[:, LOCAL]) * fraction
+        ephemeris.world_position[:n] = a[:, WORLD] + (b[:, WORLD] - a[:, WORLD]) * fraction
+        ephemeris.render_orbit_angle[:n] = self._interpolate_angle(
+            a[:, ORBIT], b[:, ORBIT], ephemeris.angular_rate(ephemeris.orbital_period[:n]), self.interval, fraction)
+        ephemeris.render_rotation_angle[:n] = self._interpolate_angle(
+            a[:, ROTATION], b[:, ROTATION], ephemeris.angular_rate(ephemeris.rotation_period[:n]),
+            self.interval, fraction)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Précalcule le cache d'éphémérides de la scène")
+    parser.add_argument('--start', type=float, default=0.0, help="temps simulé de début (pas)")
+    parser.add_argument('--end', type=float, default=36500.0, help="temps simulé de fin (pas)")
+    parser.add_argument('--interval', type=float, default=1.0, help="intervalle entre deux échantillons")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--seed', type=int, default=0, help="graine des positions de départ")
+    args = parser.parse_args()
+
+    # Scène construite sans contexte OpenGL
+    from main import SolarSystem
+    scene = SolarSystem(asteroid_count=0, load_textures=False, seed=args.seed)
+    path = build_cache(scene.ephemeris, args.cache_dir, args.start, args.end, args.interval)
+    print(f"Cache écrit : {path} ({os.path.getsize(path) / 1e6:.1f} Mo)")
@@ -0,0 +1,160 @@
+# Recherche d'événements astronomiques : conjonctions, oppositions, rapprochements
+# Les positions sont calculées directement depuis les paramètres d'orbite (state_at) :
+# tous les couples de corps et tous les instants d'un bloc sont évalués en une fois,
+# puis chaque encadrement est affiné simultanément (fausse position / section dorée).
+import numpy as np
+
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def refine_roots(function, low, high, f_low, f_high, tolerance=1e-4, max_iterations=60):
+    """Racines de function dans chaque encadrement [low, high] (méthode de fausse position Illinois)
+
+    function(times, active) renvoie la valeur de la fonction de chaque encadrement actif
+    (indices active) aux instants times. Les encadrements convergés sont retirés à chaque itération.
+    """
+    low, high = np.array(low, dtype=np.float64), np.array(high, dtype=np.float64)
+    f_low, f_high = np.array(f_low, dtype=np.float64), np.array(f_high, dtype=np.float64)
+    roots = 0.5 * (low + high)
+    side = np.zeros(len(low), dtype=np.int8)  # Dernier côté remplacé : -1 bas, +1 haut
+    active = np.arange(len(low))
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+        lo, hi, flo, fhi = low[active], high[active], f_low[active], f_high[active]
+        denominator = fhi - flo
+        middle = np.where(denominator != 0, hi - fhi * (hi - lo) / np.where(denominator != 0, denominator, 1),
+                          0.5 * (lo + hi))
+        values = function(middle, active)
+
+        replace_low = (values < 0) == (flo < 0)
+        last = side[active]
+        f_high[active] = np.where(replace_low & (last == -1), 0.5 * fhi, np.where(replace_low, fhi, values))
+        f_low[active] = np.where(~replace_low & (last == 1), 0.5 * flo, np.where(replace_low, values, flo))
+        low[active] = np.where(replace_low, middle, lo)
+        high[active] = np.where(replace_low, hi, middle)
+        side[active] = np.where(replace_low, -1, 1)
+
+        converged = (np.abs(middle - roots[active]) < tolerance) | (high[active] - low[active] < tolerance) \
+            | (values == 0)
+        roots[active] = middle
+        active = active[~converged]
+    return roots
+
+
+def refine_minima(function, low, high, tolerance=1e-4):
+    """Minimum de function dans chaque intervalle [low, high] (section dorée vectorisée)"""
+    low, high = np.array(low, dtype=np.float64), np.array(high, dtype=np.float64)
+    everyone = np.arange(len(low))
+    x1 = high - GOLDEN * (high - low)
+    x2 = low + GOLDEN * (high - low)
+    f1, f2 = function(x1, everyone), function(x2, everyone)
+    while len(low) and np.max(high - low) > tolerance:
+        left = f1 < f2  # Le minimum est dans [low, x2]
+        high = np.where(left, x2, high)
+        low = np.where(left, low, x1)
+        x1, x2 = np.where(left, high - GOLDEN * (high - low), x2), np.where(left, x1, low + GOLDEN * (high - low))
+        f1, f2 = np.where(left, np.nan, f2), np.where(left, f1, np.nan)
+        values = function(np.where(left, x1, x2), everyone)
+        f1 = np.where(left, values, f1)
+        f2 = np.where(left, f2, values)
+    return 0.5 * (low + high)
+
+
+def _wrap(angle):
+    # Ramène un angle en degrés dans [-180, 180[
+    return np.remainder(angle + 180.0, 360.0) - 180.0
+
+
+def _sign_changes(times, values, continuous):
+    """Encadrements où values (instants, couples) change de signe sans saut"""
+    negative = values < 0
+    step_index, pair = np.nonzero((negative[1:] != negative[:-1]) & continuous)
+    return pair, times[step_index], times[step_index + 1], values[step_index, pair], values[step_index + 1, pair]
+
+
+def find_events(ephemeris, bodies, t_start, t_end, step=1.0, observer=None, block=2048, tolerance=1e-3):
+    """Conjonctions, oppositions et rapprochements maximaux entre tous les couples de bodies
+
+    Les longitudes sont mesurées dans le plan de l'écliptique depuis observer (indice d'un corps,
+    l'origine de la scène si None) : depuis le soleil, une conjonction Terre-Mars est une
+    opposition de Mars vue de la Terre. Renvoie une liste de dictionnaires
+    {kind, bodies, time, separation (degrés) ou distance} triée par date.
+    """
+    bodies = np.asarray(bodies, dtype=np.int64)
+    if observer is not None:
+        bodies = bodies[bodies != observer]
+    first, second = np.triu_indices(len(bodies), k=1)
+    if len(first) == 0:
+        return []
+
+    # Seuls les corps concernés (et leurs parents) sont calculés
+    reduced, remap = ephemeris.subset(bodies if observer is None else np.r_[bodies, observer])
+    a, b = remap[bodies[first]], remap[bodies[second]]
+    origin = None if observer is None else remap[observer]
+
+    def relative_positions(times):
+        _, world = reduced.positions_at(*reduced.state_at(times))
+        if origin is not None:
+            world = world - world[..., origin, np.newaxis, :]
+        return world[..., a, :], world[..., b, :]
+
+    def longitude_difference(times):
+        pa, pb = relative_positions(times)
+        # Longitude dans le plan de l'orbite : x = X, y = -Z (cf. kepler.orbital_positions)
+        return np.degrees(np.arctan2(-pa[..., 2], pa[..., 0]) - np.arctan2(-pb[..., 2], pb[..., 0]))
+
+    def distance(times):
+        pa, pb = relative_positions(times)
+        return np.linalg.norm(pa - pb, axis=-1)
+
+    times = t_start + step * np.arange(int(np.ceil((t_end - t_start) / step)) + 1)
+    times[-1] = min(times[-1], t_end)
+
+    brackets = {'conjunction': [], 'opposition': []}
+    minima = []
+    for begin in range(0, len(times), block):
+        # Recouvrement avec le bloc précédent : un échantillon pour les racines, deux pour les minima
+        chunk = times[max(begin - 2, 0):begin + block]
+        difference = longitude_difference(chunk)
+        for kind, offset in (('conjunction', 0.0), ('opposition', 180.0)):
+            values = _wrap(difference - offset)
+            # Un passage par ±180° est un saut de la fonction, pas une racine
+            continuous = np.abs(values[1:] - values[:-1]) < 180.0
+            overlap = 1 if begin else 0
+            brackets[kind].append(_sign_changes(chunk[overlap:], values[overlap:], continuous[overlap:]))
+
+        d = distance(chunk)
+        scale = 1e-9 * d[1:-1]
+        step_index, pair = np.nonzero((d[:-2] - d[1:-1] > scale) & (d[2:] - d[1:-1] > scale))
+        minima.append((pair, chunk[step_index], chunk[step_index + 2]))
+
+    events = []
+    for kind, offset in (('conjunction', 0.0), ('opposition', 180.0)):
+        pair, low, high, f_low, f_high = (np.concatenate(column) for column in zip(*brackets[kind]))
+        roots = refine_roots(
+            lambda t, active: _wrap(longitude_difference(t)[np.arange(len(t)), pair[active]] - offset),
+            low, high, f_low, f_high, tolerance
+        )
+        if len(roots) == 0:
+            continue
+        pa, pb = relative_positions(roots)
+        pa, pb = pa[np.arange(len(roots)), pair], pb[np.arange(len(roots)), pair]
+        cosine = np.einsum('ij,ij->i', pa, pb) / np.maximum(
+            np.linalg.norm(pa, axis=-1) * np.linalg.norm(pb, axis=-1), 1e-300)
+        separation = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+        for p, t, s in zip(pair, roots, separation):
+            events.append({'kind': kind, 'bodies': (int(bodies[first[p]]), int(bodies[second[p]])),
+                           'time': float(t), 'separation': float(s)})
+
+    pair, low, high = (np.concatenate(column) for column in zip(*minima))
+    roots = refine_minima(lambda t, active: distance(t)[np.arange(len(t)), pair[active]], low, high, tolerance)
+    if len(roots):
+        closest = distance(roots)[np.arange(len(roots)), pair]
+        for p, t, d in zip(pair, roots, closest):
+            events.append({'kind': 'closest_approach', 'bodies': (int(bodies[first[p]]), int(bodies[second[p]])),
+                           'time': float(t), 'distance': float(d)})
+
+    events.sort(key=lambda event: event['time'])
+    return events
@@ -0,0 +1,159 @@
+# Maillages de sphères partagés
+# Chaque tessellation (nombre de méridiens/parallèles, orientation) est calculée une seule
+# fois pour une sphère de rayon 1, envoyée dans un tampon de sommets (VBO) ou, à défaut,
+# compilée dans une display list, puis réutilisée par tous les corps avec un simple glScalef.
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+
+
+STRIDE = 8 * 4  # position (3), normale (3), coordonnées de texture (2) en float32
+
+
+def sphere_arrays(slices, stacks, inside=False):
+    """Sommets entrelacés et indices de triangles d'une sphère unité
+
+    Même paramétrage que gluSphere : axe des pôles selon z, s = 0 sur l'axe +y,
+    t = 0 au pôle -z et 1 au pôle +z.
+    """
+    s = np.linspace(0.0, 1.0, slices + 1)
+    t = np.linspace(1.0, 0.0, stacks + 1)
+    theta = 2 * np.pi * s
+    rho = np.pi * (1.0 - t)
+    sin_rho = np.sin(rho)[:, np.newaxis]
+
+    vertices = np.empty((stacks + 1, slices + 1, 8), dtype=np.float32)
+    vertices[..., 0] = np.sin(theta) * sin_rho
+    vertices[..., 1] = np.cos(theta) * sin_rho
+    vertices[..., 2] = np.cos(rho)[:, np.newaxis]
+    vertices[..., 3:6] = -vertices[..., 0:3] if inside else vertices[..., 0:3]
+    vertices[..., 6] = 1.0 - s  # Même sens de parcours que GLU
+    vertices[..., 7] = t[:, np.newaxis]
+
+    # Deux triangles par case de la grille (parallèle j, méridien i)
+    j, i = np.meshgrid(np.arange(stacks), np.arange(slices), indexing='ij')
+    a = j * (slices + 1) + i
+    b = a + slices + 1
+    quads = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=-1) if inside else \
+        np.stack([a, a + 1, b, a + 1, b + 1, b], axis=-1)
+    return vertices.reshape(-1, 8), quads.astype(np.uint32).ravel()
+
+
+class SphereMesh:
+    """Sphère unité prête à dessiner ; les objets GL sont créés au premier dessin"""
+
+    def __init__(self, slices, stacks, inside=False):
+        self.vertices, self.indices = sphere_arrays(slices, stacks, inside)
+        self.vbo = None
+        self.ibo = None
+        self.display_list = None
+
+    def draw(self, radius=1.0):
+        glPushMatrix()
+        glScalef(radius, radius, radius)
+        # Normales remises à l'unité après la mise à l'échelle (uniforme : GL_RESCALE_NORMAL suffit),
+        # sans laisser l'état activé pour les dessins suivants
+        glPushAttrib(GL_ENABLE_BIT)
+        glEnable(GL_RESCALE_NORMAL)
+
+        if self.display_list is not None:
+            glCallList(self.display_list)
+        elif bool(glGenBuffers):
+            if self.vbo is None:
+                self.vbo, self.ibo = glGenBuffers(2)
+                glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+                glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+                glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            self._draw_elements(None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            # Repli sans VBO : tableaux côté client compilés une fois dans une display list
+            self.display_list = glGenLists(1)
+            glNewList(self.display_list, GL_COMPILE_AND_EXECUTE)
+            self._draw_elements(self.vertices)
+            glEndList()
+
+        glPopAttrib()
+        glPopMatrix()
+
+    def _draw_elements(self, vertices):
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        if vertices is None:
+            # Décalages dans le VBO lié
+            glVertexPointer(3, GL_FLOAT, STRIDE, ctypes.c_void_p(0))
+            glNormalPointer(GL_FLOAT, STRIDE, ctypes.c_void_p(12))
+            glTexCoordPointer(2, GL_FLOAT, STRIDE, ctypes.c_void_p(24))
+            glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, None)
+        else:
+            # Tableaux contigus séparés (PyOpenGL recopierait une vue entrelacée)
+            glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 0:3]))
+            glNormalPointer(GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 3:6]))
+            glTexCoordPointer(2, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 6:8]))
+            glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, self.indices)
+        glPopClientAttrib()
+
+
+_meshes = {}
+
+
+def sphere_mesh(slices=32, stacks=32, inside=False):
+    """Maillage partagé pour cette tessellation (créé au premier appel)"""
+    key = (slices, stacks, inside)
+    if key not in _meshes:
+        _meshes[key] = SphereMesh(slices, stacks, inside)
+    return _meshes[key]
+
+
+def draw_sphere(radius, slices=32, stacks=32, inside=False):
+    """Remplace gluSphere / glutSolidSphere (normales et coordonnées de texture incluses)"""
+    sphere_mesh(slices, stacks, inside).draw(radius)
+
+
+class LineLoops:
+    """Boucles fermées (orbites) rangées dans un seul tampon de sommets
+
+    set() remplace les boucles (tableau boucles x points x 3) ; draw() les dessine toutes
+    en un seul appel glMultiDrawArrays. key permet de ne reconstruire qu'en cas de changement.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.vertices = None
+        self.first = None
+        self.counts = None
+        self.vbo = None
+        self.uploaded = False
+
+    def set(self, loops, key=None):
+        loops = np.asarray(loops)
+        self.vertices = np.ascontiguousarray(loops.reshape(-1, 3), dtype=np.float32)
+        self.first = np.arange(loops.shape[0], dtype=np.int32) * loops.shape[1]
+        self.counts = np.full(loops.shape[0], loops.shape[1], dtype=np.int32)
+        self.key = key
+        self.uploaded = False
+
+    def draw(self):
+        if self.vertices is None or len(self.counts) == 0:
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if bool(glGenBuffers):
+            if self.vbo is None:
+                self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            if not self.uploaded:
+                glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+                self.uploaded = True
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glMultiDrawArrays(GL_LINE_LOOP, self.first, self.counts, len(self.counts))
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, self.vertices)
+            glMultiDrawArrays(GL_LINE_LOOP, self.first, self.counts, len(self.counts))
+        glDisableClientState(GL_VERTEX_ARRAY)
@@ -0,0 +1,178 @@
+# File de rendu triée par état GL
+# Les objets de la scène ne sont plus dessinés au fil du parcours : chacun est déposé dans
+# une file avec son état (texture, transparence, éclairage, test de profondeur, couleur,
+# programme GLSL) et sa matrice. La file est triée pour regrouper les objets qui partagent
+# le même état, puis dessinée à travers une copie de l'état GL qui n'envoie que les
+# changements réels.
+from OpenGL.GL import *
+import numpy as np
+
+
+class GLStateCache:
+    """Copie côté Python de l'état GL : les appels qui ne changeraient rien ne sont pas envoyés
+
+    reset() oublie tout (après du code qui modifie l'état sans passer par le cache) :
+    le premier réglage de chaque état est alors toujours envoyé.
+    """
+
+    def __init__(self):
+        self.capabilities = {}
+        self.texture = None
+        self.blend_function = None
+        self.depth_write = None
+        self.color = None
+        self.program = None
+        self.shader_mode = None
+        self.issued = 0
+        self.saved = 0
+
+    def reset(self):
+        self.capabilities = {}
+        self.texture = None
+        self.blend_function = None
+        self.depth_write = None
+        self.color = None
+        self.program = None
+        self.shader_mode = None
+
+    def _changed(self, changed):
+        if changed:
+            self.issued += 1
+        else:
+            self.saved += 1
+        return changed
+
+    def set_capability(self, capability, enabled):
+        if self._changed(self.capabilities.get(capability) != enabled):
+            self.capabilities[capability] = enabled
+            (glEnable if enabled else glDisable)(capability)
+
+    def bind_texture(self, texture):
+        if self._changed(self.texture != texture):
+            self.texture = texture
+            glBindTexture(GL_TEXTURE_2D, texture)
+
+    def set_blend_function(self, source, destination):
+        if self._changed(self.blend_function != (source, destination)):
+            self.blend_function = (source, destination)
+            glBlendFunc(source, destination)
+
+    def set_depth_write(self, enabled):
+        if self._changed(self.depth_write != enabled):
+            self.depth_write = enabled
+            glDepthMask(GL_TRUE if enabled else GL_FALSE)
+
+    def set_color(self, color):
+        if self._changed(self.color != color):
+            self.color = color
+            if len(color) == 4:
+                glColor4f(*color)
+            else:
+                glColor3f(*color)
+
+    def use_program(self, program):
+        if self._changed(self.program != program):
+            self.program = program
+            glUseProgram(program)
+
+    def set_shader_mode(self, shader, mode):
+        """Mode de dessin d'un programme (shader.set_mode, voir shaders.py), gardé par programme"""
+        if self._changed(self.shader_mode != (shader.program, mode)):
+            self.shader_mode = (shader.program, mode)
+            shader.set_mode(mode)
+
+
+class RenderItem:
+    __slots__ = ('draw', 'matrix', 'texture', 'blend', 'lighting', 'depth_test', 'depth_write', 'color',
+                 'shader', 'mode', 'layer', 'order')
+
+    def __init__(self, draw, matrix, texture, blend, lighting, depth_test, depth_write, color, shader, mode,
+                 layer, order):
+        self.draw = draw
+        self.matrix = matrix
+        self.texture = texture
+        self.blend = blend
+        self.lighting = lighting
+        self.depth_test = depth_test
+        self.depth_write = depth_write
+        self.color = color
+        self.shader = shader
+        self.mode = mode
+        self.layer = layer
+        self.order = order
+
+    @property
+    def program(self):
+        return self.shader.program if self.shader is not None else 0
+
+    def sort_key(self):
+        # Couches d'abord (fond, scène...), puis opaques avant transparents. Les objets transparents
+        # gardent leur ordre de dépôt (le mélange en dépend) ; les opaques sont regroupés par état.
+        if self.blend:
+            return (self.layer, 1, self.order)
+        return (self.layer, 0, self.depth_test, self.depth_write, self.program, self.mode or 0, self.lighting,
+                self.texture or 0, self.order)
+
+
+class RenderQueue:
+    """File des objets d'une image ; submit() les dépose, flush() les dessine triés
+
+    draw est appelée sans argument, avec la matrice modelview du moment du dépôt ; elle ne doit
+    pas laisser modifiés les états gérés par la file (ou les sauvegarder avec glPushAttrib).
+    shader : programme (shaders.py, shadows.py) actif pendant le dessin (None : pipeline fixe),
+    mode : valeur passée à shader.set_mode, ignorée sans programme.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or GLStateCache()
+        self.items = []
+        self.stats = {'items': 0, 'state_changes': 0, 'calls_saved': 0}
+
+    def submit(self, draw, texture=None, blend=False, lighting=True, depth_test=True, depth_write=True,
+               color=None, shader=None, mode=None, layer=0):
+        matrix = np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(16)
+        self.items.append(RenderItem(draw, matrix, texture, blend, lighting, depth_test, depth_write, color,
+                                     shader, mode, layer, len(self.items)))
+
+    def flush(self):
+        """Dessine et vide la file ; les états reviennent ensuite aux valeurs par défaut de la scène"""
+        items, self.items = sorted(self.items, key=RenderItem.sort_key), []
+        cache = self.cache
+        cache.reset()  # Le reste de l'image (interface...) a pu changer l'état
+        cache.issued = cache.saved = 0
+        # Sans aucun programme dans la file, glUseProgram n'est jamais appelé (pipeline fixe seul)
+        programs = any(item.shader is not None for item in items)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        for item in items:
+            cache.set_capability(GL_LIGHTING, item.lighting)
+            cache.set_capability(GL_DEPTH_TEST, item.depth_test)
+            cache.set_depth_write(item.depth_write)
+            cache.set_capability(GL_BLEND, item.blend)
+            if item.blend:
+                cache.set_blend_function(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            cache.set_capability(GL_TEXTURE_2D, item.texture is not None)
+            if item.texture is not None:
+                cache.bind_texture(item.texture)
+            if item.color is not None:
+                cache.set_color(item.color)
+            if programs:
+                cache.use_program(item.program)
+            if item.shader is not None and item.mode is not None:
+                cache.set_shader_mode(item.shader, item.mode)
+            glLoadMatrixd(item.matrix)
+            item.draw()
+        glPopMatrix()
+
+        # État attendu par le code qui dessine hors de la file
+        cache.set_capability(GL_LIGHTING, True)
+        cache.set_capability(GL_DEPTH_TEST, True)
+        cache.set_depth_write(True)
+        cache.set_capability(GL_BLEND, False)
+        cache.set_capability(GL_TEXTURE_2D, False)
+        cache.bind_texture(0)
+        if programs:
+            cache.use_program(0)
+
+        self.stats = {'items': len(items), 'state_changes': cache.issued, 'calls_saved': cache.saved}
@@ -0,0 +1,192 @@
+# Rendu hors écran, sans fenêtre ni serveur d'affichage
+# Le contexte OpenGL est créé par EGL (plateforme « surfaceless » de Mesa, sinon l'affichage
+# par défaut) ou par OSMesa (rendu logiciel), puis la scène de main.py est dessinée par le
+# même SolarSystem.draw dans un framebuffer dont les images sont écrites sur disque.
+#
+# Exemple : python headless.py --frames 240 --width 1920 --height 1080 --time-scale 2 -o images/
+#           python headless.py --frames 900 --width 3840 --height 2160 -o survol.mp4
+#
+# PyOpenGL choisit sa plateforme (PYOPENGL_PLATFORM) au premier import : le module OpenGL
+# n'est donc importé qu'après select_backend().
+import argparse
+import ctypes
+import ctypes.util
+import math
+import os
+import time
+
+
+BACKENDS = ('egl', 'osmesa')
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+def select_backend(requested='auto'):
+    """Fixe PYOPENGL_PLATFORM ; 'auto' prend EGL s'il est installé, sinon OSMesa"""
+    if requested == 'auto':
+        requested = os.environ.get('PYOPENGL_PLATFORM')
+        if requested not in BACKENDS:
+            requested = 'egl' if ctypes.util.find_library('EGL') else 'osmesa'
+    if requested not in BACKENDS:
+        raise ValueError(f"Rendu hors écran inconnu : {requested} (choix : {', '.join(BACKENDS)})")
+    if 'OpenGL' in __import__('sys').modules and os.environ.get('PYOPENGL_PLATFORM') != requested:
+        raise RuntimeError("OpenGL est déjà importé : select_backend() doit être appelé avant")
+    os.environ['PYOPENGL_PLATFORM'] = requested
+    return requested
+
+
+class OffscreenContext:
+    """Contexte OpenGL sans fenêtre et framebuffer de la taille demandée"""
+
+    def __init__(self, width, height, backend='auto'):
+        self.width = width
+        self.height = height
+        self.backend = select_backend(backend)
+        if self.backend == 'egl':
+            self._create_egl()
+        else:
+            self._create_osmesa()
+        self._create_framebuffer()
+
+    def _create_egl(self):
+        from OpenGL import EGL
+
+        # Plateforme sans surface (nœuds de calcul sans GPU ni serveur X), sinon l'affichage par défaut
+        display = EGL.EGL_NO_DISPLAY
+        if bool(EGL.eglGetPlatformDisplay):
+            display = EGL.eglGetPlatformDisplay(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if display == EGL.EGL_NO_DISPLAY or not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+            if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+                raise RuntimeError("Initialisation d'EGL impossible")
+
+        attributes = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE
+        )
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        if not EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count)) \
+                or count.value == 0:
+            raise RuntimeError("Aucune configuration EGL compatible OpenGL")
+        # Petite surface : le rendu se fait dans le framebuffer, jamais dans la surface
+        surface = EGL.eglCreatePbufferSurface(
+            display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)  # OpenGL de bureau (pipeline fixe), pas OpenGL ES
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+        if context == EGL.EGL_NO_CONTEXT or not EGL.eglMakeCurrent(display, surface, surface, context):
+            raise RuntimeError("Création du contexte EGL impossible")
+        self._egl = (display, surface, context)
+
+    def _create_osmesa(self):
+        from OpenGL import GL, arrays, osmesa
+
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not context:
+            raise RuntimeError("Création du contexte OSMesa impossible")
+        # Tampon minimal exigé par OSMesaMakeCurrent : le rendu se fait dans le framebuffer
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((1, 1, 4))
+        if not osmesa.OSMesaMakeCurrent(context, self._osmesa_buffer, GL.GL_UNSIGNED_BYTE, 1, 1):
+            raise RuntimeError("Activation du contexte OSMesa impossible")
+        self._osmesa = context
+
+    def _create_framebuffer(self):
+        from OpenGL.GL import (GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT, GL_DEPTH_COMPONENT24, GL_FRAMEBUFFER,
+                               GL_FRAMEBUFFER_COMPLETE, GL_RENDERBUFFER, GL_RGBA8, glBindFramebuffer,
+                               glBindRenderbuffer, glCheckFramebufferStatus, glFramebufferRenderbuffer,
+                               glGenFramebuffers, glGenRenderbuffers, glRenderbufferStorage, glViewport)
+
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        self.color_buffer, self.depth_buffer = glGenRenderbuffers(2)
+        for buffer, storage, attachment in ((self.color_buffer, GL_RGBA8, GL_COLOR_ATTACHMENT0),
+                                            (self.depth_buffer, GL_DEPTH_COMPONENT24, GL_DEPTH_ATTACHMENT)):
+            glBindRenderbuffer(GL_RENDERBUFFER, buffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, storage, self.width, self.height)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, buffer)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Framebuffer hors écran incomplet")
+        glViewport(0, 0, self.width, self.height)
+
+    def close(self):
+        if self.backend == 'egl':
+            from OpenGL import EGL
+            display, surface, context = self._egl
+            EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroySurface(display, surface)
+            EGL.eglDestroyContext(display, context)
+            EGL.eglTerminate(display)
+        else:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._osmesa)
+
+
+def render_frame(solar_system, width, height, camera_distance=80, camera_height=5, camera_angle=0):
+    """Dessine une image de la scène avec la même caméra que display() dans main.py"""
+    from OpenGL.GL import (GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_LIGHT0, GL_MODELVIEW, GL_POSITION,
+                           GL_PROJECTION, glClear, glLightfv, glLoadIdentity, glMatrixMode)
+    from OpenGL.GLU import gluLookAt, gluPerspective
+
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(45, width / height, 0.1, 1000)
+    glMatrixMode(GL_MODELVIEW)
+
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    glLoadIdentity()
+    cam_x = math.sin(math.radians(camera_angle)) * camera_distance
+    cam_z = math.cos(math.radians(camera_angle)) * camera_distance
+    gluLookAt(cam_x, camera_height, cam_z, 0, 0, 0, 0, 1, 0)
+    glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 0.0, 0.0, 1.0])
+    solar_system.draw()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rendu hors écran du système solaire 3D, image par image")
+    parser.add_argument('-n', '--frames', type=int, default=60, help="nombre d'images à rendre")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--time-scale', type=float, default=1.0, help="vitesse de la simulation (comme main.py)")
+    parser.add_argument('--fps', type=float, default=30.0, help="images par seconde de temps simulé")
+    parser.add_argument('-o', '--output', default='frames',
+                        help="dossier d'images PNG ou vidéo .mp4/.mkv (ffmpeg)")
+    parser.add_argument('--workers', type=int, default=None, help="threads de compression PNG")
+    parser.add_argument('--backend', default='auto', choices=('auto',) + BACKENDS)
+    parser.add_argument('--seed', type=int, default=0, help="graine des positions de départ")
+    parser.add_argument('--asteroids', type=int, default=100000, help="nombre d'astéroïdes (0 : aucun)")
+    parser.add_argument('--camera-distance', type=float, default=80)
+    parser.add_argument('--camera-height', type=float, default=5)
+    parser.add_argument('--camera-angle', type=float, default=0)
+    args = parser.parse_args(argv)
+
+    context = OffscreenContext(args.width, args.height, args.backend)
+    import main as scene  # Après le choix de la plateforme OpenGL
+    from recorder import FrameRecorder
+
+    # Pas de rattrapage limité : chaque image avance exactement de 1/fps seconde de simulation
+    tick_rate = 60
+    solar_system = scene.SolarSystem(tick_rate=tick_rate, max_steps=int(math.ceil(tick_rate / args.fps)) + 1,
+                                     asteroid_count=args.asteroids, seed=args.seed)
+    scene.solar_system = solar_system
+    scene.initialize()
+    solar_system.time_scale = args.time_scale
+
+    # Lecture et encodage asynchrones : le rendu de l'image suivante n'attend pas l'écriture
+    recorder = FrameRecorder(args.output, args.width, args.height, fps=args.fps, workers=args.workers)
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        solar_system.update(now=frame / args.fps)
+        render_frame(solar_system, args.width, args.height,
+                     args.camera_distance, args.camera_height, args.camera_angle)
+        recorder.capture()
+    recorder.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.frames} images {args.width}x{args.height} ({context.backend}) écrites dans {args.output} "
+          f"en {elapsed:.1f} s")
+    context.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Calcul de l'éclairage de tous les corps en un seul passage vectorisé
+# Remplace les appels récursifs à CelestialBody.update_illumination : le résultat est
+# écrit dans le tableau préalloué ephemeris.illumination, lu ensuite par draw().
+import numpy as np
+
+from eclipses import shadow_factors
+
+
+def sigmoid_model(dot, out):
+    """Transition jour/nuit nette (fonction sigmoïde), minimum visible côté jour"""
+    day = dot > 0
+    np.multiply(np.abs(dot), 0.01, out=out)
+    out += 0.02  # Côté nuit : éclairage très faible (lumière réfléchie)
+    np.copyto(out, np.maximum(0.1, 1.0 / (1.0 + np.exp(-12 * (dot - 0.5)))), where=day)
+
+
+def lambert_model(dot, out):
+    """Modèle de Lambert avec lumière ambiante"""
+    np.maximum(dot, 0, out=out)
+    out *= 0.8
+    out += 0.2  # 0.2 = lumière ambiante
+
+
+MODELS = {'sigmoid': sigmoid_model, 'lambert': lambert_model}
+
+
+def compute_illumination(ephemeris, model='sigmoid', sun_position=(0.0, 0.0, 0.0), light_index=None):
+    """Facteur d'éclairage de chaque corps, à partir des positions locales résolues
+
+    Les planètes sont éclairées par le soleil, les lunes depuis la position de leur parent
+    (comme l'ancien calcul récursif). Les corps au centre de leur repère (le soleil) valent 1.
+    Si light_index (indice du soleil) est fourni, les éclipses assombrissent les corps dans l'ombre.
+    """
+    n = ephemeris.count
+    positions = ephemeris.local_position[:n]
+    parent = ephemeris.parent[:n]
+    out = ephemeris.illumination[:n]
+
+    # Source de lumière de chaque corps
+    light = np.empty_like(positions)
+    light[:] = sun_position
+    moons = parent >= 0
+    light[moons] = ephemeris.local_position[parent[moons]]
+
+    # Cosinus entre la normale (direction du corps) et la direction source -> corps
+    to_body = positions - light
+    length = np.sqrt(np.einsum('ij,ij->i', positions, positions) * np.einsum('ij,ij->i', to_body, to_body))
+    dot = np.einsum('ij,ij->i', positions, to_body)
+    lit = length > 0
+    np.divide(dot, length, out=dot, where=lit)
+
+    MODELS[model](dot, out)
+    out[~lit] = 1.0
+
+    if light_index is not None:
+        out *= shadow_factors(ephemeris.world_position[:n], ephemeris.radius[:n], light_index)
+    return out
@@ -0,0 +1,60 @@
+# Résolution vectorisée des orbites képlériennes
+# Toutes les fonctions travaillent sur des tableaux NumPy : un seul appel traite
+# l'ensemble des corps (et éventuellement plusieurs instants à la fois).
+import numpy as np
+
+
+def solve_kepler(mean_anomaly, eccentricity, iterations=8, tolerance=1e-10):
+    """Résout l'équation de Kepler E - e sin E = M par itérations de Newton (radians)
+
+    Le nombre d'itérations est borné pour garder un coût fixe par image.
+    """
+    e = np.asarray(eccentricity, dtype=np.float64)
+    if not np.any(e):
+        # Orbites toutes circulaires : E = M, inutile d'itérer
+        return np.asarray(mean_anomaly, dtype=np.float64)
+    # Anomalie moyenne ramenée dans [-pi, pi[
+    M = np.remainder(np.asarray(mean_anomaly, dtype=np.float64) + np.pi, 2 * np.pi) - np.pi
+    # Point de départ robuste pour les fortes excentricités
+    E = np.where(e < 0.8, M + e * np.sin(M), np.pi * np.sign(M + (M == 0)))
+    for _ in range(iterations):
+        delta = (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+        E -= delta
+        if np.max(np.abs(delta), initial=0.0) < tolerance:
+            break
+    return E
+
+
+def orbital_positions(distance, eccentricity, inclination, longitude_of_node, argument_of_periapsis,
+                      orbit_angle, out=None):
+    """Position de chaque corps dans le repère de son parent (coordonnées OpenGL, Y vers le haut)
+
+    distance est le demi-grand axe, orbit_angle l'anomalie moyenne en degrés ;
+    les angles d'orientation sont aussi en degrés. Pour une orbite circulaire non
+    inclinée on retrouve exactement glRotatef(orbit_angle, 0, 1, 0) puis glTranslatef(distance, 0, 0).
+    """
+    a = np.asarray(distance, dtype=np.float64)
+    e = np.asarray(eccentricity, dtype=np.float64)
+    E = solve_kepler(np.radians(orbit_angle), e)
+
+    # Position dans le plan de l'orbite (périapside sur l'axe p)
+    p = a * (np.cos(E) - e)
+    q = a * np.sqrt(1.0 - e * e) * np.sin(E)
+
+    # Argument du périapside, inclinaison puis longitude du nœud ascendant
+    w = np.radians(argument_of_periapsis)
+    i = np.radians(inclination)
+    node = np.radians(longitude_of_node)
+    x1 = p * np.cos(w) - q * np.sin(w)
+    y1 = p * np.sin(w) + q * np.cos(w)
+    y2 = y1 * np.cos(i)
+    z2 = y1 * np.sin(i)
+    x = x1 * np.cos(node) - y2 * np.sin(node)
+    y = x1 * np.sin(node) + y2 * np.cos(node)
+
+    if out is None:
+        out = np.empty(np.shape(x) + (3,), dtype=np.float64)
+    out[..., 0] = x
+    out[..., 1] = z2
+    out[..., 2] = -y
+    return out
@@ -0,0 +1,74 @@
+# Niveau de détail des sphères selon leur taille à l'écran
+# Le rayon projeté (en pixels) de chaque corps choisit l'une des tessellations
+# précalculées de geometry.py ; une marge d'hystérésis évite les changements de
+# niveau incessants (popping) quand un corps est à la limite entre deux niveaux.
+from OpenGL.GL import *
+import numpy as np
+
+from geometry import sphere_mesh
+
+
+LEVELS = (8, 12, 16, 24, 32, 48, 64)  # Méridiens = parallèles
+
+
+class LevelOfDetail:
+    def __init__(self, levels=LEVELS, pixels_per_segment=8.0, hysteresis=0.25):
+        self.levels = levels
+        self.pixels_per_segment = pixels_per_segment
+        self.hysteresis = hysteresis
+        self.current = {}  # Niveau retenu pour chaque objet (indice dans levels)
+        self.focal = 1.0
+        self.w_from_depth = (-1.0, 0.0)  # w = a * z + b (perspective : w = -z)
+        # Statistiques de l'image en cours et de l'image précédente
+        self.spheres = 0
+        self.triangles = 0
+        self.stats = {'spheres': 0, 'triangles': 0, 'levels': {}}
+        self._levels_used = {}
+
+    def begin_frame(self):
+        """À appeler avant de dessiner la scène (projection et viewport déjà en place)"""
+        self.stats = {'spheres': self.spheres, 'triangles': self.triangles, 'levels': self._levels_used}
+        self.spheres = 0
+        self.triangles = 0
+        self._levels_used = {}
+        projection = np.asarray(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4, 4)
+        viewport = glGetIntegerv(GL_VIEWPORT)
+        # Pixels par unité pour w = 1 ; w dépend de la profondeur en perspective, pas en orthographique
+        self.focal = projection[1][1] * viewport[3] / 2.0
+        self.w_from_depth = (projection[2][3], projection[3][3])
+
+    def projected_radius(self, radius):
+        """Rayon en pixels d'une sphère centrée à l'origine du repère courant"""
+        modelview = np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4)
+        scale = np.sqrt(modelview[0][0] ** 2 + modelview[0][1] ** 2 + modelview[0][2] ** 2)
+        radius *= scale
+        a, b = self.w_from_depth
+        w = a * modelview[3][2] + b  # modelview[3][2] : profondeur du centre dans le repère de la caméra
+        if w <= -radius * abs(a):
+            return 0.0  # Entièrement derrière la caméra
+        if w <= radius * abs(a):
+            return float('inf')  # Caméra dans ou tout contre la sphère
+        return radius * self.focal / w
+
+    def select(self, key, radius):
+        """Indice de tessellation pour l'objet key, avec hystérésis"""
+        wanted = 2 * np.pi * self.projected_radius(radius) / self.pixels_per_segment
+        target = int(np.searchsorted(self.levels, min(wanted, self.levels[-1])))
+        current = self.current.get(key)
+        if current is None:
+            current = target
+        elif target > current and wanted > self.levels[current] * (1 + self.hysteresis):
+            current = target
+        elif target < current and wanted < self.levels[current - 1] * (1 - self.hysteresis):
+            current = target
+        self.current[key] = current
+        return current
+
+    def draw_sphere(self, key, radius, inside=False):
+        """Dessine une sphère au niveau de détail adapté à sa taille à l'écran"""
+        segments = self.levels[self.select(key, radius)]
+        mesh = sphere_mesh(segments, segments, inside)
+        mesh.draw(radius)
+        self.spheres += 1
+        self.triangles += len(mesh.indices) // 3
+        self._levels_used[segments] = self._levels_used.get(segments, 0) + 1
@@ -3,86 +3,117 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
 from OpenGL.GLUT import GLUT_STROKE_ROMAN, GLUT_BITMAP_9_BY_15
-from PIL import Image
 import numpy as np
 import math
 import time
 import os
-import ctypes
+import argparse
+from functools import partial
+
+from asteroids import AsteroidBelt
+from clock import SimulationClock
+from culling import FrustumCuller
+from eclipses import find_eclipses
+from ephemeris import Ephemeris, ephemeris_field
+from ephemeris_cache import DEFAULT_CACHE_DIR, EphemerisCache
+from events import find_events
+from geometry import LineLoops
+from glstate import RenderQueue
+from kepler import orbital_positions
+from lod import LevelOfDetail
+from nbody import NBodySimulation
+from picking import BodyPicker
+from recorder import FrameRecorder
+from scheduler import FrameScheduler
+from skybox import Skybox, load_cube_faces
+from text import TextBatch
+from texture_cache import TextureCache
+from textures import TextureLoader
 
 
 print("Lancement de l'application...")
 
+
  # Class pour le corps des celèstes
 class CelestialBody:
-    def __init__(self, name, distance, orbital_period, rotation_period, radius, color, texture_path=None, moons=None):
+    ephemeris = Ephemeris()  # Éphéméride partagée (remplacée par SolarSystem)
+    lod = LevelOfDetail()  # Choix de la tessellation des sphères (remplacé par SolarSystem)
+    culler = FrustumCuller()  # Corps dans le champ de la caméra (remplacé par SolarSystem)
+    render_queue = RenderQueue()  # Objets à dessiner, triés par état GL (remplacée par SolarSystem)
+    texture_loader = None  # Décodage des textures en parallèle (remplacé par SolarSystem)
+
+    # Les paramètres orbitaux vivent dans l'éphéméride, le corps n'en est qu'une vue
+    distance = ephemeris_field('distance')  # distance from parent (AU scaled)
+    orbital_period = ephemeris_field('orbital_period')  # Earth year (Révolution)
+    rotation_period = ephemeris_field('rotation_period')  # Earth days (Rotation)
+    orbit_angle = ephemeris_field('orbit_angle')
+    rotation_angle = ephemeris_field('rotation_angle')
+    # Angles interpolés entre deux pas de simulation, utilisés pour le dessin
+    render_orbit_angle = ephemeris_field('render_orbit_angle')
+    render_rotation_angle = ephemeris_field('render_rotation_angle')
+    # Éléments képlériens optionnels (degrés) : orbite circulaire si tous nuls
+    eccentricity = ephemeris_field('eccentricity')
+    inclination = ephemeris_field('inclination')
+    longitude_of_node = ephemeris_field('longitude_of_node')
+    argument_of_periapsis = ephemeris_field('argument_of_periapsis')
+    mass = ephemeris_field('mass')  # Masses solaires, pour le mode gravitationnel
+    radius = ephemeris_field('radius')  # Earth radii scaled
+    # Position résolue dans le repère du parent et dans la scène
+    local_position = ephemeris_field('local_position')
+    world_position = ephemeris_field('world_position')
+
+    def __init__(self, name, distance, orbital_period, rotation_period, radius, color, texture_path=None, moons=None,
+                 eccentricity=0.0, inclination=0.0, longitude_of_node=0.0, argument_of_periapsis=0.0, mass=0.0):
         self.name = name
-        self.distance = distance  # distance from parent (AU scaled)
-        self.orbital_period = orbital_period  # Earth year (Révolution)
-        self.rotation_period = rotation_period  # Earth days (Rotation)
-        self.radius = radius  # Earth radii scaled
         self.color = color
         self.texture_id = None
         self.moons = moons or []
         
+        # Current angles
+        self.ephemeris = CelestialBody.ephemeris
+        self.index = self.ephemeris.add_body(
+            distance, orbital_period, rotation_period,
+            orbit_angle=np.random.uniform(0, 360),  # Start with random position
+            rotation_angle=0,
+            eccentricity=eccentricity,
+            inclination=inclination,
+            longitude_of_node=longitude_of_node,
+            argument_of_periapsis=argument_of_periapsis,
+            mass=mass,
+            radius=radius
+        )
+        for moon in self.moons:
+            self.ephemeris.set_parent(moon.index, self.index)
+        
         if texture_path and os.path.exists(texture_path):
             self.load_texture(texture_path)
-        
-        # Current angles
-        self.orbit_angle = np.random.uniform(0, 360)  # Start with random position
-        self.rotation_angle = 0
     
     # Fonction pour charger les textures dans fichier    
     def load_texture(self, texture_path):
-        try:
-            img = Image.open(texture_path).convert("RGB")
-            img_data = np.array(img, dtype=np.uint8)
-        except Exception as e:
-            print(f"Erreur lors du chargement de {texture_path} : {e}")
-            return
-
-        self.texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.size[0], img.size[1], 
-                     0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-    
-    def update(self, time_scale):
-        # Update angles based on time
-        if self.orbital_period > 0:  # Only update orbit if orbital_period is positive
-            self.orbit_angle += (360 / (self.orbital_period * 10)) * time_scale  # Adjusted for better visualization
-        
-        if self.rotation_period > 0:  # Only update rotation if rotation_period is positive
-            self.rotation_angle += (360 / (self.rotation_period * 10)) * time_scale  # Adjusted for better visualization
-            
-        for moon in self.moons:
-            moon.update(time_scale)
+        # Décodage dans un thread ; texture_id est renseigné à l'envoi (TextureLoader.finish)
+        self.texture_loader.request(texture_path, partial(setattr, self, 'texture_id'))
     
     # Fonction pour dessiner les planètes, solei, lune et orbites
     def draw(self):
+        if not self.culler.system_in_view(self.index):
+            return  # Le corps et toutes ses lunes sont hors du champ
+        
         glPushMatrix()
         
-        # Orbital position
-        glRotatef(self.orbit_angle, 0, 1, 0)
-        glTranslatef(self.distance, 0, 0)
+        # Orbital position (orbite képlérienne résolue par l'éphéméride)
+        glTranslatef(*self.local_position)
         
         # Rotation
-        glRotatef(self.rotation_angle, 0, 1, 0)
+        glRotatef(self.render_orbit_angle + self.render_rotation_angle, 0, 1, 0)
         
-        # Draw the body
-        if self.texture_id:
-            glEnable(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, self.texture_id)
-            quad = gluNewQuadric()
-            gluQuadricTexture(quad, GL_TRUE)
-            gluQuadricNormals(quad, GLU_SMOOTH)
-            gluSphere(quad, self.radius, 32, 32)
-            gluDeleteQuadric(quad)
-            glDisable(GL_TEXTURE_2D)
-        else:
-            glColor3f(*self.color)
-            glutSolidSphere(self.radius, 32, 32)
+        # Draw the body (ses lunes peuvent rester visibles même s'il est hors champ)
+        # Déposé dans la file de rendu avec sa matrice : dessiné plus tard, regroupé par texture
+        if self.culler.body_in_view(self.index):
+            self.render_queue.submit(
+                partial(self.lod.draw_sphere, self, self.radius),  # Tessellation adaptée à la taille à l'écran
+                texture=self.texture_id,
+                color=(1.0, 1.0, 1.0) if self.texture_id else self.color
+            )
         
         # Draw moons
         for moon in self.moons:
@@ -91,95 +122,117 @@ class CelestialBody:
         glPopMatrix()
 
 
-# Fonction pour le chargement des textures étoiles à l'arrière-plan
-def load_skybox_texture(path):
-    """Charge uniquement la texture des étoiles, ignore les autres"""
-    if "2k_stars_milky_way" not in path:
-        return None  # Ne charge pas les autres textures
-        
-    try:
-        img = Image.open(path).convert("RGB")
-        img_data = np.array(img, dtype=np.uint8)
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.size[0], img.size[1], 
-                    0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-        return texture_id
-    except Exception as e:
-        print(f"Erreur de chargement de la texture des étoiles : {e}")
-        return None
-    
+# Paramètres qui déterminent le tracé d'une orbite
+ORBIT_FIELDS = ('distance', 'eccentricity', 'inclination', 'longitude_of_node', 'argument_of_periapsis')
+
+
 # Class pour le système solaire    
 class SolarSystem:
-    def __init__(self):
+    TEXTURE_DIR = "Texture/"
+    SKYBOX_FILE = "8k_stars_milky_way.jpg"
+    RING_FILE = "2k_saturn_ring_alpha.png"
+    BODY_FILES = ("2k_sun.jpg", "2k_mercury.jpg", "2k_venus_surface.jpg", "2k_earth_daymap.jpg", "2k_moon.jpg",
+                  "2k_mars.jpg", "2k_jupiter.jpg", "2k_saturn.jpg", "2k_uranus.jpg", "2k_neptune.jpg",
+                  "2k_pluton.jpeg")
+    
+    @classmethod
+    def prefetch_textures(cls, texture_loader):
+        """Lance le décodage de toutes les images de la scène (possible avant le contexte OpenGL)"""
+        for name in cls.BODY_FILES:
+            path = os.path.join(cls.TEXTURE_DIR, name)
+            if os.path.exists(path):
+                texture_loader.prefetch(path)
+        ring_path = os.path.join(cls.TEXTURE_DIR, cls.RING_FILE)
+        if os.path.exists(ring_path):
+            texture_loader.prefetch(ring_path, 'RGBA')
+        skybox_path = os.path.join(cls.TEXTURE_DIR, cls.SKYBOX_FILE)
+        if os.path.exists(skybox_path):
+            texture_loader.submit(('skybox', skybox_path), load_cube_faces, skybox_path, None, texture_loader.cache)
+    
+    def __init__(self, tick_rate=60, max_steps=5, asteroid_count=100000, load_textures=True, seed=None,
+                 texture_loader=None):
+        # Éphéméride commune à tous les corps de la scène
+        self.ephemeris = Ephemeris()
+        CelestialBody.ephemeris = self.ephemeris
+        self.lod = CelestialBody.lod = LevelOfDetail()
+        self.culler = CelestialBody.culler = FrustumCuller()
+        self.picker = BodyPicker()
+        self.render_queue = CelestialBody.render_queue = RenderQueue()
+        # Décodage des textures en parallèle ; un chargeur fourni a déjà reçu prefetch_textures (voir __main__)
+        if load_textures and texture_loader is None:
+            texture_loader = TextureLoader(cache=TextureCache())
+            self.prefetch_textures(texture_loader)
+        self.texture_loader = CelestialBody.texture_loader = texture_loader if load_textures else None
+        
         # Vérifier si le dossier Texture existe
-        texture_dir = "Texture/"
+        texture_dir = self.TEXTURE_DIR
         if not os.path.exists(texture_dir):
             print(f"ATTENTION: Le dossier {texture_dir} n'existe pas")
             os.makedirs(texture_dir, exist_ok=True)
         
-        # Charger la texture du ciel (avec vérification)
-        skybox_path = os.path.join(texture_dir, "2k_stars_milky_way.jpg")
+        # Chemin de texture (aucune texture sans contexte OpenGL, ex. outils en ligne de commande)
+        def texture(name):
+            return os.path.join(texture_dir, name) if load_textures else None
+        
+        # Positions de départ reproductibles (nécessaire pour le cache d'éphémérides)
+        if seed is not None:
+            np.random.seed(seed)
+        
+        # Fond d'étoiles : cubemap convertie une fois de l'image équirectangulaire (voir skybox.py)
+        skybox_path = os.path.join(texture_dir, self.SKYBOX_FILE)
         self.skybox_path = skybox_path  # Stocker le chemin pour référence ultérieure
-        if os.path.exists(skybox_path):
-            self.skybox_texture = load_skybox_texture(skybox_path)
-        else:
+        self.skybox = None
+        if load_textures and not os.path.exists(skybox_path):
             print(f"ATTENTION: Texture de fond non trouvée à {skybox_path}")
-            self.skybox_texture = None
         
         # Initialiser saturn_rings avant de l'utiliser
         self.saturn_rings = {
             'inner_radius': 1.0,  # Augmenté pour mieux correspondre à la taille de Saturne
             'outer_radius': 2.0,  # Augmenté pour mieux correspondre à la taille de Saturne
-            'texture_id': None
+            'texture_id': None,
+            'quadric': None  # Créé au premier dessin
         }
                 
         # Charger la texture des anneaux si elle existe
-        ring_texture_path = os.path.join(texture_dir, "2k_saturn_ring_alpha.png")
-        if os.path.exists(ring_texture_path):
-            try:
-                img = Image.open(ring_texture_path).convert("RGBA")
-                img_data = np.array(img, np.uint8)
-                self.saturn_rings['texture_id'] = glGenTextures(1)
-                glBindTexture(GL_TEXTURE_2D, self.saturn_rings['texture_id'])
-                glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-                glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-                glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, img.size[0], img.size[4], 
-                             0, GL_RGBA, GL_UNSIGNED_BYTE, img_data)
-            except Exception as e:
-                print(f"Erreur lors du chargement de la texture des anneaux: {e}")
+        ring_texture_path = os.path.join(texture_dir, self.RING_FILE)
+        if load_textures and os.path.exists(ring_texture_path):
+            self.texture_loader.request(ring_texture_path, partial(self.saturn_rings.__setitem__, 'texture_id'),
+                                        mode='RGBA')
         
         # Configuration des planètes avec des paramètres ajustés pour un meilleur mouvement
         self.sun = CelestialBody(
             "Soleil", 0, 0, 25, 2.0, (1.0, 0.8, 0.0), 
-            texture_path=os.path.join(texture_dir, "2k_sun.jpg")
+            texture_path=texture("2k_sun.jpg"),
+            mass=1.0
         )
         
         # Planètes intérieures
         self.mercury = CelestialBody(
             "Mercure", 4, 10, 70, 0.4, (0.7, 0.7, 0.7),
-            texture_path=os.path.join(texture_dir, "2k_mercury.jpg")
+            texture_path=texture("2k_mercury.jpg"),
+            mass=1.66e-7
         )
         
         self.venus = CelestialBody(
             "Venus", 7, 120, 243, 0.6, (0.9, 0.7, 0.2),
-            texture_path=os.path.join(texture_dir, "2k_venus_surface.jpg")
+            texture_path=texture("2k_venus_surface.jpg"),
+            mass=2.45e-6
         )
         
         self.earth = CelestialBody(
             "Terre", 10, 365, 4, 0.6, (0.2, 0.2, 1.0),
-            texture_path=os.path.join(texture_dir, "2k_earth_daymap.jpg"),
+            texture_path=texture("2k_earth_daymap.jpg"),
+            mass=3.0e-6,
             moons=[
                 CelestialBody("Moon", 1.5, 7.3, 27.3, 0.15, (0.8, 0.8, 0.8),
-                             texture_path=os.path.join(texture_dir, "2k_moon.jpg"))
+                             texture_path=texture("2k_moon.jpg"))
             ]
         )
         
         self.mars = CelestialBody(
             "Mars", 15, 687, 3, 0.5, (0.8, 0.4, 0.1),
-            texture_path=os.path.join(texture_dir, "2k_mars.jpg"),
+            texture_path=texture("2k_mars.jpg"),
+            mass=3.2e-7,
             moons=[
                 CelestialBody("Phobos", 0.8, 3.319, 3.319, 0.05, (0.6, 0.6, 0.6)),
                 CelestialBody("Deimos", 1.2, 5.262, 5.262, 0.03, (0.6, 0.6, 0.6))
@@ -189,7 +242,8 @@ class SolarSystem:
         # Planètes extérieures
         self.jupiter = CelestialBody(
             "Jupiter", 20, 433, 3, 1.2, (0.8, 0.6, 0.4),
-            texture_path=os.path.join(texture_dir, "2k_jupiter.jpg"),
+            texture_path=texture("2k_jupiter.jpg"),
+            mass=9.5e-4,
             moons=[
                 CelestialBody("Io", 1.5, 1.769, 1.769, 0.1, (0.9, 0.8, 0.5)),
                 CelestialBody("Europa", 2.0, 3.551, 3.551, 0.08, (0.8, 0.8, 0.9)),
@@ -200,7 +254,8 @@ class SolarSystem:
         
         self.saturn = CelestialBody(
             "Saturne", 25, 10759, 3, 1.0, (0.9, 0.8, 0.6),
-            texture_path=os.path.join(texture_dir, "2k_saturn.jpg"),
+            texture_path=texture("2k_saturn.jpg"),
+            mass=2.86e-4,
             moons=[
                 CelestialBody("Titan", 2.2, 15.945, 15.945, 0.15, (0.8, 0.7, 0.5)),
                 CelestialBody("Rhea", 1.5, 4.518, 4.518, 0.08, (0.8, 0.8, 0.8)),
@@ -210,7 +265,8 @@ class SolarSystem:
         
         self.uranus = CelestialBody(
             "Uranus", 28, 30687, 3, 0.7, (0.5, 0.8, 0.9),
-            texture_path=os.path.join(texture_dir, "2k_uranus.jpg"),
+            texture_path=texture("2k_uranus.jpg"),
+            mass=4.4e-5,
             moons=[
                 CelestialBody("Titania", 0.9, 8.706, 8.706, 0.08, (0.8, 0.8, 0.8)),
                 CelestialBody("Oberon", 1.1, 13.463, 13.463, 0.07, (0.7, 0.7, 0.7))
@@ -219,7 +275,8 @@ class SolarSystem:
 
         self.neptune = CelestialBody(
             "Neptune", 30, 60190, 3, 0.7, (0.2, 0.3, 0.9),
-            texture_path=os.path.join(texture_dir, "2k_neptune.jpg"),
+            texture_path=texture("2k_neptune.jpg"),
+            mass=5.15e-5,
             moons=[
                 CelestialBody("Triton", 1.2, 5.877, 5.877, 0.1, (0.7, 0.8, 0.9))
             ]
@@ -227,7 +284,8 @@ class SolarSystem:
         
         self.pluto = CelestialBody(
             "Pluton", 35, 90560, 6.39, 0.2, (0.8, 0.6, 0.4),
-            texture_path=os.path.join(texture_dir, "2k_pluton.jpeg"),
+            texture_path=texture("2k_pluton.jpeg"),
+            mass=6.6e-9,
             moons=[
                 CelestialBody("Charon", 0.4, 6.387, 6.387, 0.1, (0.7, 0.7, 0.7))
             ]
@@ -236,23 +294,186 @@ class SolarSystem:
         self.planets = [self.mercury, self.venus, self.earth, self.mars, 
                        self.jupiter, self.saturn, self.uranus, self.neptune, self.pluto]
         
-        # Time management
-        self.last_time = time.time()
+        # Envoi à OpenGL des textures demandées, à mesure que leurs décodages se terminent
+        if load_textures:
+            self.texture_loader.finish(report=False)
+            if os.path.exists(skybox_path):
+                # Faces préparées dans un thread depuis prefetch_textures
+                self.skybox = self.texture_loader.complete(('skybox', skybox_path),
+                                                           lambda faces: Skybox(skybox_path, faces=faces))
+            self.texture_loader.print_report()  # Après le fond d'étoiles, qui y figure aussi
+        
+        # Ceinture d'astéroïdes entre Mars (15) et Jupiter (20), calée sur l'orbite de Mars
+        self.asteroid_belt = AsteroidBelt(
+            asteroid_count, inner_radius=16.0, outer_radius=19.0,
+            reference_distance=self.mars.distance, reference_period=self.mars.orbital_period
+        ) if asteroid_count else None
+        
+        # Time management : horloge à pas fixe, indépendante de la vitesse d'affichage
+        self.clock = SimulationClock(tick_rate=tick_rate, max_steps=max_steps)
         self.time_scale = 1.0  # Vitesse par défaut plus raisonnable
-
-    def update(self):
-        current_time = time.time()
-        delta_time = current_time - self.last_time
-        self.last_time = current_time
+        self.ephemeris.solve_positions()
+        if self.asteroid_belt:
+            self.asteroid_belt.update(self.ephemeris.render_time)
+        
+        # Mode gravitationnel optionnel (voir enable_gravity)
+        self.gravity = None
+        self.gravity_bodies = None
+        
+        # Relecture optionnelle d'éphémérides précalculées (voir use_ephemeris_cache)
+        self.ephemeris_cache = None
+        
+        # Tracés des orbites, calculés une fois (voir draw_orbits)
+        self.orbit_paths = LineLoops()
         
-        # Pas besoin de mettre à jour le soleil car il ne bouge pas
+        # Rayon des anneaux de chaque corps (0 sans anneaux), pour l'élimination hors champ
+        self.ring_extents = np.zeros(self.ephemeris.count)
+        self.ring_extents[self.saturn.index] = self.saturn_rings['outer_radius']
+
+    def update(self, now=None):
+        """Avance la simulation ; renvoie True si la scène affichée a changé
+        
+        now : instant (secondes) à utiliser à la place de l'horloge réelle (rendu image par image)
+        """
+        previous_time = self.ephemeris.render_time
+        
+        # Tous les corps (planètes et lunes) avancent en une seule opération par pas fixe
+        for _ in range(self.clock.tick(now)):
+            self.ephemeris.advance(self.time_scale)
+            if self.gravity is not None:
+                self.gravity.step(self.time_scale)
+        
+        # Position d'affichage interpolée entre les deux derniers pas
+        self.ephemeris.interpolate(self.clock.alpha)
+        if self.gravity is not None:
+            fixed = (self.gravity_bodies, self.gravity.interpolated_positions(self.clock.alpha))
+            self.ephemeris.solve_positions(fixed)
+        elif self.ephemeris_cache is not None and self.ephemeris_cache.covers(self.ephemeris.render_time):
+            # Interpolation entre deux échantillons du cache au lieu du calcul des orbites
+            self.ephemeris_cache.apply(self.ephemeris)
+        else:
+            self.ephemeris.solve_positions()
+        if self.asteroid_belt:
+            self.asteroid_belt.update(self.ephemeris.render_time)
+        
+        # Tout (orbites, rotations, cache, astéroïdes) dépend du temps affiché : en pause, il ne bouge plus
+        return self.ephemeris.render_time != previous_time
+    
+    def enable_gravity(self, G=None, theta=0.5, softening=1e-3):
+        """Active le mode gravitationnel (leapfrog + Barnes-Hut)
+        
+        Le soleil, les planètes et tous les corps racines sont intégrés ; les lunes gardent
+        leur orbite autour de leur parent. Sans G fourni, la constante est calibrée pour que
+        les orbites conservent en moyenne leur période actuelle.
+        """
+        ephemeris = self.ephemeris
+        roots = ephemeris.levels()[0]
+        positions = ephemeris.world_position[roots].copy()
+        masses = ephemeris.mass[roots].copy()
+        central = int(np.argmax(masses))
+        
+        # Direction du mouvement donnée par le modèle cinématique
+        h = 0.5
+        _, before = ephemeris.positions_at(*ephemeris.state_at(ephemeris.time - h))
+        _, after = ephemeris.positions_at(*ephemeris.state_at(ephemeris.time + h))
+        velocities = (after[roots] - before[roots]) / (2 * h)
+        offset = positions - positions[central]
+        radius = np.linalg.norm(offset, axis=1)
+        speed = np.linalg.norm(velocities, axis=1)
+        orbiting = (radius > 0) & (speed > 0)
+        
+        if G is None:
+            G = np.median(speed[orbiting] ** 2 * radius[orbiting]) / masses[central]
+        
+        # Vitesse circulaire autour du corps central
+        circular = np.sqrt(G * masses[central] / radius[orbiting])
+        velocities[orbiting] *= (circular / speed[orbiting])[:, None]
+        velocities[~orbiting] = 0
+        
+        self.gravity = NBodySimulation(positions, velocities, masses, G=G, theta=theta, softening=softening)
+        self.gravity_bodies = roots
+    
+    def use_ephemeris_cache(self, directory=DEFAULT_CACHE_DIR):
+        """Active la relecture du cache précalculé (python ephemeris_cache.py) s'il correspond à la scène"""
+        self.ephemeris_cache = EphemerisCache.open(directory, self.ephemeris)
+        if self.ephemeris_cache is None:
+            print(f"ATTENTION: Aucun cache d'éphémérides valide pour cette scène dans {directory}")
+        return self.ephemeris_cache is not None
+    
+    def disable_gravity(self):
+        """Revient au modèle cinématique"""
+        self.gravity = None
+        self.gravity_bodies = None
+    
+    def state_at(self, t):
+        """Angles d'orbite et de rotation de tous les corps au temps simulé t (scalaire ou tableau)"""
+        return self.ephemeris.state_at(t)
+    
+    def seek(self, t):
+        """Saute directement au temps simulé t (défilement de la ligne de temps)"""
+        self.ephemeris.seek(t)
+    
+    def find_eclipses(self, t_start, t_end, step=0.25, targets=None, occluders=None):
+        """Éclipses (ombre et pénombre) entre t_start et t_end, éventuellement limitées à certains corps
+        
+        Exemple : find_eclipses(0, 365000, targets=self.jupiter.moons, occluders=[self.jupiter])
+        """
+        events = find_eclipses(
+            self.ephemeris, self.ephemeris.radius[:self.ephemeris.count], self.sun.index, t_start, t_end, step,
+            targets=None if targets is None else [body.index for body in targets],
+            occluders=None if occluders is None else [body.index for body in occluders]
+        )
+        bodies = {body.index: body for body in self.all_bodies()}
+        for event in events:
+            event['target'] = bodies[event['target']]
+            event['occluder'] = bodies[event['occluder']]
+        return events
+    
+    def find_events(self, t_start, t_end, step=1.0, bodies=None, observer=None):
+        """Conjonctions, oppositions et rapprochements entre les corps donnés (les planètes par défaut)
+        
+        Les angles sont mesurés depuis observer (le soleil par défaut). Exemple, oppositions de
+        Mars vues de la Terre : find_events(0, 36500, bodies=[self.sun, mars], observer=earth)
+        """
+        bodies = self.planets if bodies is None else bodies
+        observer = self.sun if observer is None else observer
+        events = find_events(self.ephemeris, [body.index for body in bodies], t_start, t_end, step,
+                             observer=observer.index)
+        by_index = {body.index: body for body in self.all_bodies()}
+        for event in events:
+            event['bodies'] = tuple(by_index[index] for index in event['bodies'])
+        return events
+    
+    def pick(self, x, y):
+        """Corps sous le pixel (x, y) de la fenêtre lors de la dernière image, None sinon"""
+        index = self.picker.pick(self.ephemeris, x, y)
+        if index is None:
+            return None
+        return next((body for body in self.all_bodies() if body.index == index), None)
+    
+    def all_bodies(self):
+        """Le soleil, les planètes et toutes leurs lunes"""
+        bodies = [self.sun]
         for planet in self.planets:
-            planet.update(self.time_scale)
+            bodies.append(planet)
+            bodies.extend(planet.moons)
+        return bodies
+    
+    @property
+    def simulation_time(self):
+        return self.ephemeris.time
     
     def draw(self):
+        self.lod.begin_frame()
+        self.culler.begin_frame(self.ephemeris, self.ring_extents)
+        self.picker.begin_frame()
+        
+        # Fond d'étoiles
+        self.draw_skybox()
+        
         # Draw the sun
         glPushMatrix()
-        glRotatef(self.sun.rotation_angle, 0, 1, 0)
+        glRotatef(self.sun.render_rotation_angle, 0, 1, 0)
         self.sun.draw()
         glPopMatrix()
         
@@ -260,72 +481,53 @@ class SolarSystem:
         for planet in self.planets:
             planet.draw()
         
+        # Ceinture d'astéroïdes (un seul appel de dessin)
+        if self.asteroid_belt:
+            self.render_queue.submit(self.asteroid_belt.draw, lighting=False)
+        
         # Special case: Saturn's rings - MODIFIÉ
-        glPushMatrix()
-        # Position at Saturn's location
-        glRotatef(self.saturn.orbit_angle, 0, 1, 0)
-        glTranslatef(self.saturn.distance, 0, 0)
-        
-        if self.saturn_rings['texture_id']:
-            glEnable(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, self.saturn_rings['texture_id'])
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            
-            # Dessiner un anneau avec un disque troué
-            quad = gluNewQuadric()
-            gluQuadricTexture(quad, GL_TRUE)
-            gluQuadricOrientation(quad, GLU_OUTSIDE)
-            glRotatef(90, 1, 0, 0)  # Orienter horizontalement
-            gluDisk(quad, self.saturn_rings['inner_radius'], 
-                    self.saturn_rings['outer_radius'], 64, 1)
-            gluDeleteQuadric(quad)
-            
-            glDisable(GL_BLEND)
-            glDisable(GL_TEXTURE_2D)
-        glPopMatrix()
+        if self.saturn_rings['texture_id'] and self.culler.rings_in_view(self.saturn.index):
+            glPushMatrix()
+            # Position at Saturn's location
+            glTranslatef(*self.saturn.world_position)
+            self.render_queue.submit(self.draw_saturn_rings, texture=self.saturn_rings['texture_id'], blend=True)
+            glPopMatrix()
         
         # Draw orbital paths
         self.draw_orbits()
+        
+        # Tout ce qui a été déposé est dessiné maintenant, trié par état
+        self.render_queue.flush()
+    
+    def draw_saturn_rings(self):
+        """Dessiner un anneau avec un disque troué (texture et transparence réglées par la file)"""
+        if self.saturn_rings['quadric'] is None:
+            quad = self.saturn_rings['quadric'] = gluNewQuadric()
+            gluQuadricTexture(quad, GL_TRUE)
+            gluQuadricOrientation(quad, GLU_OUTSIDE)
+        glRotatef(90, 1, 0, 0)  # Orienter horizontalement
+        gluDisk(self.saturn_rings['quadric'], self.saturn_rings['inner_radius'],
+                self.saturn_rings['outer_radius'], 64, 1)
     
     def draw_orbits(self):
-        glDisable(GL_LIGHTING)
-        glColor3f(0.5, 0.5, 0.5)
+        # Tampon reconstruit uniquement si les paramètres d'orbite d'une planète ont changé
+        rows = [planet.index for planet in self.planets]
+        elements = np.stack([getattr(self.ephemeris, name)[rows] for name in ORBIT_FIELDS], axis=1)
+        key = elements.tobytes()
+        if key != self.orbit_paths.key:
+            # Ellipses képlériennes (cercles si l'excentricité est nulle), 360 points par planète
+            self.orbit_paths.set(orbital_positions(*elements.T[:, :, np.newaxis], np.arange(360)), key)
         
-        for planet in self.planets:
-            glPushMatrix()
-            
-            # Draw orbit circle
-            glBegin(GL_LINE_LOOP)
-            for i in range(360):
-                angle = math.radians(i)
-                x = planet.distance * math.cos(angle)
-                z = planet.distance * math.sin(angle)
-                glVertex3f(x, 0, z)
-            glEnd()
-            
-            glPopMatrix()
-        
-        glEnable(GL_LIGHTING)
+        self.render_queue.submit(self.orbit_paths.draw, lighting=False, color=(0.5, 0.5, 0.5))
         
         
     def draw_skybox(self):
         """Dessine uniquement le fond d'étoiles"""
-        if not hasattr(self, 'skybox_texture') or not self.skybox_texture:
+        if self.skybox is None:
             return
 
-        glDisable(GL_LIGHTING)
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, self.skybox_texture)
-        
-        quad = gluNewQuadric()
-        gluQuadricTexture(quad, GL_TRUE)
-        gluQuadricOrientation(quad, GLU_INSIDE)
-        gluSphere(quad, 1000, 64, 64)
-        gluDeleteQuadric(quad)
-        
-        glDisable(GL_TEXTURE_2D)
-        glEnable(GL_LIGHTING) 
+        # Couche du fond : toujours dessinée avant le reste de la scène
+        self.render_queue.submit(self.skybox.draw, lighting=False, depth_test=False, depth_write=False, layer=-1)
         
         
 
@@ -344,7 +546,7 @@ solar_system = None
 
 # Commande par souris
 def mouse(button, state, x, y):
-    global left_button_pressed, right_button_pressed, mouse_x, mouse_y, camera_distance, selected_body
+    global left_button_pressed, right_button_pressed, mouse_x, mouse_y, camera_distance, selected_body, click_start
     
     mouse_x, mouse_y = x, y
     
@@ -352,19 +554,14 @@ def mouse(button, state, x, y):
         left_button_pressed = (state == GLUT_DOWN)
         
         if state == GLUT_DOWN:
-            # Conversion correcte des coordonnées Y pour la détection des boutons
-            window_height = glutGet(GLUT_WINDOW_HEIGHT)
-            gl_y = window_height - y  # Conversion coordonnées OpenGL
-            
-            # Vérifier si on a cliqué sur un bouton
-            for btn in planet_buttons:
-                if (btn['x'] <= x <= btn['x'] + btn['width'] and 
-                    btn['y'] <= gl_y <= btn['y'] + btn['height']):
-                    selected_body = btn['body']
-                    print(f"Sélectionné: {selected_body.name}")  # Debug
-                    break
-            else:
-                selected_body = None
+            click_start = (x, y)
+        elif click_start is not None:
+            # Un clic (pas une rotation à la souris) sélectionne le corps visé, ou désélectionne
+            if abs(x - click_start[0]) + abs(y - click_start[1]) <= 3:
+                selected_body = solar_system.pick(x, y)
+                if selected_body:
+                    center_camera_on_body(selected_body)
+            click_start = None
                 
     elif button == GLUT_RIGHT_BUTTON:
         right_button_pressed = (state == GLUT_DOWN)
@@ -373,7 +570,7 @@ def mouse(button, state, x, y):
     elif button == 4:  # Roulette vers le bas (zoom arrière)
         camera_distance += 2
     
-    glutPostRedisplay()
+    scheduler.invalidate()
     
 
 def motion(x, y):
@@ -390,7 +587,7 @@ def motion(x, y):
         camera_y -= dy * 0.01
     
     mouse_x, mouse_y = x, y
-    glutPostRedisplay()       
+    scheduler.invalidate()
 
 def display():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -405,50 +602,32 @@ def display():
               camera_x, camera_y, camera_z, 
               0, 1, 0)
     
-    # Dessine le fond en premier
-    solar_system.draw_skybox()
-    
-    # Dessine le système solaire
+    # Dessine le système solaire (fond d'étoiles compris)
     solar_system.draw()
     
-    # Affiche les infos
-    show_info()
-    
-
-    # Afficher le nom du corps sélectionné au-dessus de l'objet
+    # Nom du corps sélectionné au-dessus de l'objet, ajouté au texte de l'interface
     if selected_body:
-        glDisable(GL_LIGHTING)
-        glColor3f(1, 1, 1)
-        
-        # Positionner le texte
-        glPushMatrix()
-        
         if selected_body == solar_system.sun:
-            glTranslatef(0, selected_body.radius + 1, 0)
+            anchor = (0, selected_body.radius + 1, 0)
         else:
             # Pour les planètes et lunes
-            glRotatef(selected_body.orbit_angle, 0, 1, 0)
-            glTranslatef(selected_body.distance, selected_body.radius + 0.5, 0)
-        
-        # Orientation face à la caméra
-        glRotatef(-camera_angle, 0, 1, 0)
-        glRotatef(-camera_height, 1, 0, 0)
-        glScalef(0.002, 0.002, 0.002)
-        
-        # Dessiner le texte
-        for char in selected_body.name:
-            glutStrokeCharacter(GLUT_STROKE_ROMAN, ord(char))
-        glPopMatrix()
-        
-        glEnable(GL_LIGHTING)
+            x, y, z = selected_body.world_position
+            anchor = (x, y + selected_body.radius + 0.5, z)
+        window_x, window_y, depth = gluProject(*anchor)
+        if 0 <= depth <= 1:  # Point devant la caméra
+            hud_text.add(selected_body.name, round(window_x), round(window_y))
+    
+    # Image enregistrée sans l'interface
+    if recorder is not None:
+        recorder.capture()
+    
+    # Affiche les infos
+    show_info()
     
     glutSwapBuffers()
 
 # Affichage des information pour l'utilisateur
 def show_info():
-    glDisable(GL_LIGHTING)
-    glColor3f(1, 1, 1)
-    
     # Set up orthographic projection for text
     glMatrixMode(GL_PROJECTION)
     glPushMatrix()
@@ -469,14 +648,17 @@ def show_info():
         "Rotation: Clic gauche + déplacement de la souris",
         "Déplacement: Clic droit + déplacement de la souris",
         "Vues prédéfinies: h (haut), b (bas), g (gauche), d (droite), f (face), r (arrière)",
-        "P (pause), Q (quitter)"
+        "P (pause), E (enregistrer), Q (quitter)",
+        "Sphères: {spheres}  Triangles: {triangles}".format(**solar_system.lod.stats),
+        "Corps affichés: {drawn}  hors champ: {culled}".format(**solar_system.culler.stats),
+        "Changements d'état GL: {state_changes}  évités: {calls_saved}".format(**solar_system.render_queue.stats)
     ]
+    if recorder is not None:
+        text_lines.append("Enregistrement: {captured} images  écrites: {written}".format(**recorder.stats))
     
     y_pos = window_height - 20  # Commence en haut
     for line in text_lines:
-        glRasterPos2f(10, y_pos)
-        for char in line:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
+        hud_text.add(line, 10, y_pos)
         y_pos -= 15  # Descend pour chaque ligne
     
     # Display planet shortcuts at bottom
@@ -494,11 +676,7 @@ def show_info():
     ]
     
     # Calculate starting position for centered text
-    total_width = 0
-    for text, _ in planet_shortcuts:
-        # Convertir le texte en tableau de caractères (bytes) pour glutBitmapLength
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        total_width += glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
+    total_width = sum(hud_text.width(text) for text, _ in planet_shortcuts)
     total_width += len(planet_shortcuts) * 10  # Ajouter l'espacement
     
     start_x = (window_width - total_width) // 4
@@ -507,34 +685,27 @@ def show_info():
     x_pos = start_x
     
     for text, body in planet_shortcuts:
-        # Change color if this is the selected body
-        if selected_body == body:
-            glColor3f(0, 1, 1)  # Cyan for selected
-        else:
-            glColor3f(1, 1, 1)  # White for others
-            
-        glRasterPos2f(x_pos, y_bottom)
-        for char in text:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
-        
-        # Add spacing between items
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        text_width = glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
-        x_pos += text_width + 12  # 12px spacing
+        # Cyan pour le corps sélectionné, blanc pour les autres
+        color = (0, 1, 1) if selected_body == body else (1, 1, 1)
+        hud_text.add(text, x_pos, y_bottom, color)
+        x_pos += hud_text.width(text) + 12  # 12px spacing
+    
+    # Tout le texte de l'image en un seul appel, l'état (éclairage, profondeur...) réglé par la file
+    hud_text.submit(hud_queue)
+    hud_queue.flush()
     
     # Restore previous matrices
     glPopMatrix()
     glMatrixMode(GL_PROJECTION)
     glPopMatrix()
     glMatrixMode(GL_MODELVIEW)
-    glEnable(GL_LIGHTING)
     
     
 # Affichage des listes de planètes
 # def show_planete_name():
 
 # Variables globales pour l'interface
-planet_buttons = []
+click_start = None  # Position du bouton gauche enfoncé (clic ou rotation)
 # Variables globales (modifiées)
 camera_distance = 80
 camera_angle = 0
@@ -548,11 +719,14 @@ mouse_x = 0
 mouse_y = 0
 solar_system = None
 selected_body = None  # Pour suivre la sélection actuelle
+hud_text = None  # Texte de l'interface, dessiné en un seul lot (voir text.py)
+hud_queue = None  # File de rendu de l'interface (projection en pixels), même cache d'état que la scène
+scheduler = None  # Images dessinées à la demande (voir scheduler.py)
+recorder = None  # Enregistrement en cours (voir recorder.py)
+record_output = None  # Dossier ou vidéo de l'enregistrement (touche E)
 
 def initialize():
     
-    global planet_buttons
-    
     glEnable(GL_DEPTH_TEST)
     glEnable(GL_LIGHTING)
     glEnable(GL_LIGHT0)
@@ -586,9 +760,13 @@ def keyboard(key, x, y):
     elif key == '-':
         camera_distance += 2
     elif key == 'q':
+        if recorder is not None:
+            toggle_recording()  # Termine l'écriture des dernières images
         os._exit(0)
     elif key == 'p':
         solar_system.time_scale = 0 if solar_system.time_scale > 0 else 0.5
+    elif key == 'e':
+        toggle_recording()
     
     # Commandes de sélection des corps célestes
     elif key == 's' and glutGetModifiers() == GLUT_ACTIVE_ALT:  # Alt+S pour Soleil
@@ -654,7 +832,20 @@ def keyboard(key, x, y):
         camera_distance = 30
         camera_x = camera_y = camera_z = 0
     
-    glutPostRedisplay()
+    scheduler.invalidate()
+
+def toggle_recording():
+    """Démarre ou arrête l'enregistrement des images (taille de la fenêtre au démarrage)"""
+    global recorder, record_output
+    if recorder is not None:
+        recorder.close()
+        print(f"Enregistrement terminé : {recorder.stats['written']} images dans {recorder.output}")
+        recorder = None
+        return
+    output = record_output or time.strftime("enregistrement_%Y%m%d_%H%M%S")
+    record_output = None  # Les enregistrements suivants (touche E) ne l'écrasent pas
+    recorder = FrameRecorder(output, glutGet(GLUT_WINDOW_WIDTH), glutGet(GLUT_WINDOW_HEIGHT), fps=scheduler.fps)
+    print(f"Enregistrement vers {output}")
 
 def center_camera_on_body(body):
     """Centre la caméra sur le corps céleste spécifié"""
@@ -665,10 +856,8 @@ def center_camera_on_body(body):
         camera_z = 0
         camera_distance = 30  # Distance de vue pour le soleil
     else:
-        # Calculer la position orbitale actuelle
-        angle_rad = math.radians(body.orbit_angle)
-        camera_x = body.distance * math.cos(angle_rad)
-        camera_z = body.distance * math.sin(angle_rad)
+        # Position actuelle résolue par l'éphéméride (lunes comprises)
+        camera_x, _, camera_z = body.world_position
         camera_distance = 5  # Distance de vue pour les planètes
     
     # Ajuster la hauteur pour une bonne vue
@@ -684,28 +873,62 @@ def reshape(width, height):
     glLoadIdentity()
     gluPerspective(45, width / height, 0.1, 1000)
     glMatrixMode(GL_MODELVIEW)
+    # Un enregistrement garde la taille de son début
+    if recorder is not None and (recorder.width, recorder.height) != (width, height):
+        toggle_recording()
+    scheduler.invalidate()
 
-def idle():
-    solar_system.update()
-    glutPostRedisplay()
+def animate():
+    """Cadence du FrameScheduler : redessine seulement si la simulation a avancé"""
+    changed = solar_system.update()
+    return changed or recorder is not None  # Une image par cadence pendant l'enregistrement
 
-# Configuration initiale
-glutInit()
-glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH | GLUT_ALPHA)
-glutInitWindowSize(1200, 800)
-glutCreateWindow(b"System Solar 3D - by KADAFI Ben")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Système solaire 3D")
+    parser.add_argument('--ephemeris-cache', metavar='DOSSIER',
+                        help="rejoue les éphémérides précalculées par ephemeris_cache.py")
+    parser.add_argument('--seed', type=int, default=None, help="graine des positions de départ")
+    parser.add_argument('--fps', type=float, default=60.0, help="fréquence d'images maximale")
+    parser.add_argument('--texture-cache-mb', type=int, default=512,
+                        help="taille maximale du cache des textures décodées (dossier texture_cache/)")
+    parser.add_argument('--record', metavar='SORTIE',
+                        help="enregistre dès le lancement : dossier d'images PNG ou vidéo .mp4/.mkv (ffmpeg)")
+    args = parser.parse_args()
+    
+    # Décodage des textures lancé avant la création de la fenêtre
+    texture_loader = TextureLoader(cache=TextureCache(max_bytes=args.texture_cache_mb * 1024 * 1024))
+    SolarSystem.prefetch_textures(texture_loader)
+    
+    # Configuration initiale
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH | GLUT_ALPHA)
+    glutInitWindowSize(1200, 800)
+    glutCreateWindow(b"System Solar 3D - by KADAFI Ben")
 
-# Initialisation
-solar_system = SolarSystem()
+    # Initialisation (le cache suppose les mêmes positions de départ que l'outil, graine 0 par défaut)
+    if args.ephemeris_cache and args.seed is None:
+        args.seed = 0
+    solar_system = SolarSystem(seed=args.seed, texture_loader=texture_loader)
+    if args.ephemeris_cache:
+        solar_system.use_ephemeris_cache(args.ephemeris_cache)
 
-initialize()
+    initialize()
+    hud_text = TextBatch()
+    hud_queue = RenderQueue(cache=solar_system.render_queue.cache)
 
-# Configuration des callbacks
-glutDisplayFunc(display)
-glutReshapeFunc(reshape)
-glutKeyboardFunc(keyboard)
-glutMouseFunc(mouse)
-glutMotionFunc(motion)
-glutIdleFunc(idle)
+    # Configuration des callbacks
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    glutKeyboardFunc(keyboard)
+    glutMouseFunc(mouse)
+    glutMotionFunc(motion)
+    
+    # Pas de fonction idle : rien n'est redessiné tant que rien ne change (pause, caméra immobile)
+    # Le temps passé à dormir n'est pas du temps de simulation : l'horloge repart du réveil
+    scheduler = FrameScheduler(animate, fps=args.fps, on_wake=solar_system.clock.reset)
+    scheduler.start()
+    record_output = args.record
+    if record_output:
+        toggle_recording()
 
-glutMainLoop()
\ No newline at end of file
+    glutMainLoop()
\ No newline at end of file
@@ -2,85 +2,72 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
 from OpenGL.GLUT import GLUT_STROKE_ROMAN, GLUT_BITMAP_9_BY_15
-from PIL import Image
 import numpy as np
 import math
-import time
 import os
-import ctypes
+from functools import partial
+
+from clock import SimulationClock
+from culling import FrustumCuller
+from ephemeris import Ephemeris, ephemeris_field
+from geometry import LineLoops
+from glstate import RenderQueue
+from illumination import compute_illumination
+from lod import LevelOfDetail
+from shaders import EMISSIVE, LIT, UNLIT, BodyShader
+from scheduler import FrameScheduler
+from skybox import Skybox
+from text import TextBatch
+from texture_cache import TextureCache
+from textures import upload_texture
 
 # --- AJOUT ---
-background_texture_id = None
-
-# Fonction pour le chargement de l'image de fond
-def load_background_texture(image_path):
-    global background_texture_id
-    try:
-        img = Image.open(image_path).convert("RGB")
-        img_data = np.array(img, dtype=np.uint8)
-
-        background_texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, background_texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.size[0], img.size[1], 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-    except Exception as e:
-        print(f"Erreur chargement image de fond: {e}")
+skybox = None  # Fond d'étoiles en cubemap (voir skybox.py)
+texture_cache = TextureCache()  # Textures décodées gardées sur disque (voir texture_cache.py)
 
 # Fonction pour le dessin de l'image de fond
 def draw_background():
-    global background_texture_id
-    if not background_texture_id:
-        return
-
-    glDisable(GL_DEPTH_TEST)
-    glDisable(GL_LIGHTING)
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    glOrtho(-1, 1, -1, 1, -1, 1)
-
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
-
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, background_texture_id)
-
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(-1, -1)
-    glTexCoord2f(1, 0); glVertex2f( 1, -1)
-    glTexCoord2f(1, 1); glVertex2f( 1,  1)
-    glTexCoord2f(0, 1); glVertex2f(-1,  1)
-    glEnd()
-
-    glDisable(GL_TEXTURE_2D)
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-
-    glEnable(GL_DEPTH_TEST)
-    glEnable(GL_LIGHTING)
+    # Cube centré sur la caméra, déposé dans la couche du fond de la file de rendu (dessinée avant
+    # le reste de la scène) : à appeler après gluLookAt, avant solar_system.draw()
+    if skybox is not None:
+        solar_system.render_queue.submit(skybox.draw, lighting=False, depth_test=False, depth_write=False,
+                                         layer=-1)
 
 
 class CelestialBody:
+    ephemeris = Ephemeris()  # Éphéméride partagée (remplacée par SolarSystem)
+    lod = LevelOfDetail()  # Choix de la tessellation des sphères (remplacé par SolarSystem)
+    culler = FrustumCuller()  # Corps dans le champ de la caméra (remplacé par SolarSystem)
+    shader = None  # Programme GLSL des corps (None : pipeline fixe, voir SolarSystem.enable_shaders)
+    render_queue = RenderQueue()  # Objets à dessiner, triés par état GL (remplacée par SolarSystem)
+
+    # Paramètres et état stockés dans l'éphéméride (le corps n'en est qu'une vue)
+    distance = ephemeris_field('distance')
+    orbital_period = ephemeris_field('orbital_period')
+    rotation_period = ephemeris_field('rotation_period')
+    orbit_angle = ephemeris_field('orbit_angle')
+    rotation_angle = ephemeris_field('rotation_angle')
+    radius = ephemeris_field('radius')
+    illumination = ephemeris_field('illumination')  # Facteur d'éclairage (1 = pleinement éclairé, 0 = dans l'ombre)
+
     def __init__(self, name, distance, orbital_period, rotation_period, radius, color, texture_path=None, moons=None):
         self.name = name
-        self.distance = distance
-        self.orbital_period = orbital_period
-        self.rotation_period = rotation_period
-        self.radius = radius
         self.color = color
         self.texture_id = None
         self.moons = moons or []
-        self.illumination = 1.0  # Facteur d'éclairage (1 = pleinement éclairé, 0 = dans l'ombre)
+        
+        self.ephemeris = CelestialBody.ephemeris
+        self.index = self.ephemeris.add_body(
+            distance, orbital_period, rotation_period,
+            orbit_angle=np.random.uniform(0, 360),
+            rotation_angle=0,
+            radius=radius
+        )
+        for moon in self.moons:
+            self.ephemeris.set_parent(moon.index, self.index)
         
         if texture_path and os.path.exists(texture_path):
             self.load_texture(texture_path)
-        
-        self.orbit_angle = np.random.uniform(0, 360)
-        self.rotation_angle = 0
     
     _texture_cache = {}  # Cache partagé entre toutes les instances
 
@@ -90,78 +77,51 @@ class CelestialBody:
             return
 
         try:
-            img = Image.open(texture_path).convert("RGB")
-            img_data = np.array(img, dtype=np.uint8)
+            levels, _ = texture_cache.load_texture(texture_path)  # Mipmaps relues du disque si déjà décodées
         except Exception as e:
             print(f"Erreur lors du chargement de {texture_path} : {e}")
             return
 
-        self.texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)  # Ajout du mipmapping
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        gluBuild2DMipmaps(GL_TEXTURE_2D, GL_RGB, img.size[0], img.size[1], 
-                        GL_RGB, GL_UNSIGNED_BYTE, img_data)
+        self.texture_id = upload_texture(levels)
         
         CelestialBody._texture_cache[texture_path] = self.texture_id
         
         
-    def update(self, time_scale):
-        if self.orbital_period > 0:
-            self.orbit_angle += (360 / (self.orbital_period * 10)) * time_scale
-        
-        if self.rotation_period > 0:
-            self.rotation_angle += (360 / (self.rotation_period * 10)) * time_scale
-            
-        for moon in self.moons:
-            moon.update(time_scale)
     
 
     def draw_saturn_rings(self):
         glPushMatrix()
         glRotatef(-26.7, 1, 0, 0)  # Inclinaison exacte de Saturne (26.7 degrés)
         
-        # Sauvegarde des états OpenGL
-        glPushAttrib(GL_ENABLE_BIT | GL_LIGHTING_BIT)
-        glDisable(GL_LIGHTING)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
         # Anneau principal avec transparence
-        self.draw_flat_ring(1.5, 2.5, (0.9, 0.85, 0.7, 0.8), 128)
+        self.submit_ring(1.5, 2.5, (0.9, 0.85, 0.7, 0.8), 128)
         
         # Division de Cassini
-        self.draw_flat_ring(1.8, 1.9, (0.1, 0.1, 0.1, 1.0), 64)
+        self.submit_ring(1.8, 1.9, (0.1, 0.1, 0.1, 1.0), 64)
         
         # Anneau extérieur
-        self.draw_flat_ring(2.2, 2.8, (0.7, 0.65, 0.6, 0.7), 128)
+        self.submit_ring(2.2, 2.8, (0.7, 0.65, 0.6, 0.7), 128)
         
-        # Restauration des états OpenGL
-        glPopAttrib()
         glPopMatrix()
 
     def draw_uranus_rings(self):
         glPushMatrix()
         glRotatef(98, 1, 0, 0)  # Inclinaison exacte d'Uranus (98 degrés)
         
-        # Sauvegarde des états OpenGL
-        glPushAttrib(GL_ENABLE_BIT | GL_LIGHTING_BIT)
-        glDisable(GL_LIGHTING)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
         # Anneaux plus fins et sombres comme dans la réalité
-        self.draw_flat_ring(1.1, 1.3, (0.4, 0.4, 0.5, 0.6), 64)
-        self.draw_flat_ring(1.4, 1.6, (0.3, 0.3, 0.4, 0.5), 64)
-        self.draw_flat_ring(1.7, 1.9, (0.2, 0.2, 0.3, 0.4), 64)
+        self.submit_ring(1.1, 1.3, (0.4, 0.4, 0.5, 0.6), 64)
+        self.submit_ring(1.4, 1.6, (0.3, 0.3, 0.4, 0.5), 64)
+        self.submit_ring(1.7, 1.9, (0.2, 0.2, 0.3, 0.4), 64)
         
-        # Restauration des états OpenGL
-        glPopAttrib()
         glPopMatrix()
 
-    def draw_flat_ring(self, inner_radius, outer_radius, color, segments):
-        """Dessine un anneau plat avec quadrilatères et transparence"""
-        glColor4f(*color)
+    def submit_ring(self, inner_radius, outer_radius, color, segments):
+        """Dépose un anneau transparent et sans éclairage dans la file (dessiné après les objets opaques)"""
+        self.render_queue.submit(partial(self.draw_flat_ring, inner_radius, outer_radius, segments),
+                                 blend=True, lighting=False, color=color, shader=self.shader, mode=UNLIT)
+
+    def draw_flat_ring(self, inner_radius, outer_radius, segments):
+        """Dessine un anneau plat avec quadrilatères (couleur et transparence réglées par la file)"""
         glBegin(GL_QUAD_STRIP)
         
         for i in range(segments + 1):
@@ -180,83 +140,26 @@ class CelestialBody:
     def draw_sun_glow(self):
         if self != solar_system.sun:
             return
-            
-        glDisable(GL_LIGHTING)
-        glDisable(GL_DEPTH_TEST)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        # Utilisation d'un display list pour optimiser le rendu
-        if not hasattr(self, 'glow_display_list'):
-            self.glow_display_list = glGenLists(1)
-            glNewList(self.glow_display_list, GL_COMPILE)
-            
-            # Couche interne (haute intensité)
-            glColor4f(1.0, 0.9, 0.7, 0.4)
-            glutSolidSphere(self.radius * 1.5, 24, 24)  # Réduction des segments
-            
-            # Couche moyenne
-            glColor4f(1.0, 0.7, 0.4, 0.3)
-            glutSolidSphere(self.radius * 2.0, 20, 20)
-            
-            # Couche externe (faible intensité)
-            glColor4f(1.0, 0.5, 0.2, 0.2)
-            glutSolidSphere(self.radius * 2.5, 16, 16)
-            
-            glEndList()
-        
-        glCallList(self.glow_display_list)
         
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_LIGHTING)
-        glDisable(GL_BLEND) 
-            
-    
-    # Dans la classe CelestialBody, modifier la méthode update_illumination
-    def update_illumination(self, sun_position):
-        """Calcule l'éclairage en fonction de la position du soleil avec un modèle plus réaliste"""
-        if self == solar_system.sun:
-            self.illumination = 1.0
-            return
-            
-        angle_rad = math.radians(self.orbit_angle)
-        planet_pos = np.array([
-            self.distance * math.cos(angle_rad),
-            0,
-            self.distance * math.sin(angle_rad)
-        ])
-        
-        # Calcul du vecteur soleil -> planète et de la normale
-        sun_to_planet = planet_pos - sun_position
-        sun_to_planet_normalized = sun_to_planet / np.linalg.norm(sun_to_planet)
-        normal = planet_pos / np.linalg.norm(planet_pos)
-        
-        # Produit scalaire pour déterminer l'angle entre la normale et la direction du soleil
-        dot_product = np.dot(normal, sun_to_planet_normalized)
-        
-        # Modèle d'éclairage amélioré
-        if dot_product > 0:  # Côté jour
-            # Transition plus nette avec fonction sigmoïde
-            illumination = 1.0 / (1.0 + math.exp(-12 * (dot_product - 0.5)))
-            self.illumination = max(0.1, illumination)  # Minimum pour voir les détails
-        else:  # Côté nuit
-            # Éclairage très faible avec possibilité d'effet de lumière réfléchie
-            self.illumination = 0.02 + 0.01 * abs(dot_product)
-        
-        # Mise à jour des lunes
-        for moon in self.moons:
-            moon.update_illumination(planet_pos)
-            
+        # Couche du fond : après les étoiles et avant tout le reste, sans test de profondeur
+        # Sphères partagées, tessellation choisie selon la taille à l'écran
+        layers = (
+            (1.5, (1.0, 0.9, 0.7, 0.4)),  # Couche interne (haute intensité)
+            (2.0, (1.0, 0.7, 0.4, 0.3)),  # Couche moyenne
+            (2.5, (1.0, 0.5, 0.2, 0.2)),  # Couche externe (faible intensité)
+        )
+        for i, (scale, color) in enumerate(layers):
+            self.render_queue.submit(partial(self.lod.draw_sphere, (self, 'glow', i), self.radius * scale),
+                                     blend=True, lighting=False, depth_test=False, depth_write=False,
+                                     color=color, shader=self.shader, mode=UNLIT, layer=-1)
 
-    def draw(self):
-        glPushMatrix()
-        glRotatef(self.orbit_angle, 0, 1, 0)
-        glTranslatef(self.distance, 0, 0)
-        
-        # Dessiner la planète d'abord
-        if self != solar_system.sun:
-            glRotatef(self.rotation_angle, 0, 1, 0)
-            
+    def draw_lit_sphere(self):
+        """Sphère en pipeline fixe avec son matériau (texture et couleur réglées par la file)"""
+        if self == solar_system.sun:
+            # Configuration spéciale pour le soleil (émet sa propre lumière)
+            glMaterialfv(GL_FRONT, GL_EMISSION, [0.8, 0.7, 0.6, 1.0])
+            glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1.0, 0.9, 0.7, 1.0])
+        else:
             # Configuration du matériau avec éclairage dynamique
             ambient = [0.1, 0.1, 0.1, 1.0]  # Faible lumière ambiante
             diffuse = [
@@ -270,36 +173,54 @@ class CelestialBody:
             glMaterialfv(GL_FRONT, GL_DIFFUSE, diffuse)
             glMaterialfv(GL_FRONT, GL_SPECULAR, [0.3, 0.3, 0.3, 1.0])
             glMaterialfv(GL_FRONT, GL_SHININESS, [30.0])
-        else:
-            # Dessiner le glow avant le soleil pour un meilleur effet
-            self.draw_sun_glow()
-            
-            # Configuration spéciale pour le soleil (émet sa propre lumière)
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0.8, 0.7, 0.6, 1.0])
-            glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1.0, 0.9, 0.7, 1.0])
         
-        # Dessin de la sphère (planète ou soleil)
-        if self.texture_id:
-            glEnable(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, self.texture_id)
-            quad = gluNewQuadric()
-            gluQuadricTexture(quad, GL_TRUE)
-            gluQuadricNormals(quad, GLU_SMOOTH)
-            gluSphere(quad, self.radius, 32, 32)
-            gluDeleteQuadric(quad)
-            glDisable(GL_TEXTURE_2D)
-        else:
-            glutSolidSphere(self.radius, 32, 32)
+        self.lod.draw_sphere(self, self.radius)  # Tessellation adaptée à la taille à l'écran
         
         # Réinitialiser les propriétés d'émission pour les autres objets
         if self == solar_system.sun:
             glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
+
+    def draw(self):
+        if not self.culler.system_in_view(self.index):
+            return  # Le corps, ses anneaux et toutes ses lunes sont hors du champ
+        
+        glPushMatrix()
+        glRotatef(self.orbit_angle, 0, 1, 0)
+        glTranslatef(self.distance, 0, 0)
+        
+        is_sun = self == solar_system.sun
+        if not is_sun:
+            glRotatef(self.rotation_angle, 0, 1, 0)
+        else:
+            # Le halo est dessiné avant le soleil pour un meilleur effet (couche du fond)
+            self.draw_sun_glow()
+        
+        # Sphère (planète ou soleil) déposée dans la file de rendu avec sa matrice : dessinée plus tard,
+        # regroupée par programme et par texture ; ses lunes peuvent rester visibles s'il est hors champ
+        if not self.culler.body_in_view(self.index):
+            pass
+        elif self.shader is not None:
+            # Éclairage calculé par le shader ; il échantillonne toujours une texture : blanche pour
+            # les corps sans texture
+            self.render_queue.submit(
+                partial(self.lod.draw_sphere, self, self.radius),
+                texture=self.texture_id or self.shader.white_texture,
+                color=(1.0, 1.0, 1.0) if self.texture_id else self.color,
+                shader=self.shader, mode=EMISSIVE if is_sun else LIT
+            )
+        else:
+            # La couleur (suivie par GL_COLOR_MATERIAL) porte l'éclairage calculé sur le processeur
+            illumination = 1.0 if is_sun else self.illumination
+            base = (1.0, 1.0, 1.0) if self.texture_id else self.color
+            self.render_queue.submit(self.draw_lit_sphere, texture=self.texture_id,
+                                     color=tuple(c * illumination for c in base))
         
         # Dessiner les anneaux APRÈS la planète mais avant les lunes
-        if self.name == "Saturne":
-            self.draw_saturn_rings()
-        elif self.name == "Uranus":
-            self.draw_uranus_rings()
+        if self.culler.rings_in_view(self.index):
+            if self.name == "Saturne":
+                self.draw_saturn_rings()
+            elif self.name == "Uranus":
+                self.draw_uranus_rings()
         
         # Dessiner les lunes
         for moon in self.moons:
@@ -309,7 +230,15 @@ class CelestialBody:
     
 
 class SolarSystem:
-    def __init__(self):
+    def __init__(self, tick_rate=60, max_steps=5):
+        # Éphéméride commune à tous les corps de la scène
+        self.ephemeris = Ephemeris()
+        CelestialBody.ephemeris = self.ephemeris
+        self.lod = CelestialBody.lod = LevelOfDetail()
+        self.culler = CelestialBody.culler = FrustumCuller()
+        self.shader = CelestialBody.shader = None
+        self.render_queue = CelestialBody.render_queue = RenderQueue()
+        
         texture_dir = "Texture/"
         if not os.path.exists(texture_dir):
             print(f"ATTENTION: Le dossier {texture_dir} n'existe pas")
@@ -401,24 +330,58 @@ class SolarSystem:
         self.planets = [self.mercury, self.venus, self.earth, self.mars, 
                        self.jupiter, self.saturn, self.uranus, self.neptune, self.pluto]
         
-        self.last_time = time.time()
+        # Tracés des orbites, calculés une fois (voir draw_orbits)
+        self.orbit_paths = LineLoops()
+        
+        # Rayon des anneaux et du halo de chaque corps (0 sans), pour l'élimination hors champ
+        self.ring_extents = np.zeros(self.ephemeris.count)
+        self.ring_extents[self.saturn.index] = 2.8
+        self.ring_extents[self.uranus.index] = 1.9
+        self.ring_extents[self.sun.index] = self.sun.radius * 2.5
+        
+        # Horloge à pas fixe, comme main.py : la vitesse ne dépend plus de la cadence d'affichage
+        self.clock = SimulationClock(tick_rate=tick_rate, max_steps=max_steps)
         self.time_scale = 1.0
 
-    def update(self):
-        current_time = time.time()
-        delta_time = current_time - self.last_time
-        self.last_time = current_time
+    def update(self, now=None):
+        """Avance la simulation ; renvoie True si la scène affichée a changé
         
-        # Mettre à jour les positions
-        for planet in self.planets:
-            planet.update(self.time_scale)
+        now : instant (secondes) à utiliser à la place de l'horloge réelle
+        """
+        previous_time = self.ephemeris.render_time
         
-        # Mettre à jour l'éclairage
-        sun_position = np.array([0, 0, 0])  # Le soleil est à l'origine
-        for planet in self.planets:
-            planet.update_illumination(sun_position)
+        # Tous les corps avancent en une seule opération par pas fixe
+        for _ in range(self.clock.tick(now)):
+            self.ephemeris.advance(self.time_scale)
+        
+        # Position d'affichage interpolée entre les deux derniers pas
+        self.ephemeris.interpolate(self.clock.alpha)
+        self.ephemeris.solve_positions()
+        
+        # Mettre à jour l'éclairage de toutes les planètes et lunes en un seul passage (éclipses comprises)
+        # Inutile avec les shaders : l'éclairage est alors calculé par pixel sur la carte graphique
+        if self.shader is None:
+            compute_illumination(self.ephemeris, model='sigmoid', light_index=self.sun.index)
+        
+        # Orbites et rotations dépendent du temps affiché : en pause, il ne bouge plus
+        return self.ephemeris.render_time != previous_time
+    
+    def enable_shaders(self):
+        """Active le rendu GLSL des corps ; reste en pipeline fixe si les shaders ne sont pas disponibles"""
+        try:
+            self.shader = CelestialBody.shader = BodyShader()
+        except Exception as e:
+            print(f"ATTENTION: Shaders indisponibles, éclairage en pipeline fixe ({e})")
+            self.shader = CelestialBody.shader = None
+        return self.shader is not None
     
     def draw(self):
+        self.lod.begin_frame()
+        self.culler.begin_frame(self.ephemeris, self.ring_extents)
+        
+        if self.shader is not None:
+            self.shader.begin_frame(self.ephemeris, self.sun.index)
+        
         # Draw the sun
         glPushMatrix()
         glRotatef(self.sun.rotation_angle, 0, 1, 0)
@@ -431,23 +394,24 @@ class SolarSystem:
         
         # Draw orbital paths
         self.draw_orbits()
+        
+        # Tout ce qui a été déposé est dessiné maintenant, trié par état (programme compris)
+        self.render_queue.flush()
+        if self.shader is not None:
+            self.shader.end_frame()  # Programme laissé actif par begin_frame si aucun corps n'en a eu besoin
     
     def draw_orbits(self):
-        glDisable(GL_LIGHTING)
-        glColor3f(0.5, 0.5, 0.5)
+        # Tampon reconstruit uniquement si la distance d'une planète a changé
+        key = tuple(planet.distance for planet in self.planets)
+        if key != self.orbit_paths.key:
+            angle = np.radians(np.arange(360))
+            distance = np.array(key)[:, np.newaxis]
+            path = np.zeros((len(key), 360, 3))
+            path[..., 0] = distance * np.cos(angle)
+            path[..., 2] = distance * np.sin(angle)
+            self.orbit_paths.set(path, key)
         
-        for planet in self.planets:
-            glPushMatrix()
-            glBegin(GL_LINE_LOOP)
-            for i in range(360):
-                angle = math.radians(i)
-                x = planet.distance * math.cos(angle)
-                z = planet.distance * math.sin(angle)
-                glVertex3f(x, 0, z)
-            glEnd()
-            glPopMatrix()
-        
-        glEnable(GL_LIGHTING)
+        self.render_queue.submit(self.orbit_paths.draw, lighting=False, color=(0.5, 0.5, 0.5))
 
 
 # Variables globales
@@ -462,6 +426,9 @@ right_button_pressed = False
 mouse_x = 0
 mouse_y = 0
 solar_system = None
+hud_text = None  # Texte de l'interface, dessiné en un seul lot (voir text.py)
+hud_queue = None  # File de rendu de l'interface (projection en pixels), même cache d'état que la scène
+scheduler = None  # Images dessinées à la demande (voir scheduler.py)
 selected_body = None
 planet_buttons = []
 # Ajouter cette variable globale
@@ -548,7 +515,7 @@ def mouse(button, state, x, y):
     elif button == 4:  # Roulette vers le bas (zoom arrière)
         camera_distance += 2
     
-    glutPostRedisplay()
+    scheduler.invalidate()
     
 
 def motion(x, y):
@@ -565,7 +532,7 @@ def motion(x, y):
         camera_y -= dy * 0.01
     
     mouse_x, mouse_y = x, y
-    glutPostRedisplay()
+    scheduler.invalidate()
     
 
 # Modifier la fonction display() pour supprimer l'affichage du texte
@@ -574,8 +541,6 @@ def display():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
 
-    draw_background()
-
     # Mettre à jour la position de la lumière (toujours au soleil)
     glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 0.0, 0.0, 1.0])
     
@@ -588,6 +553,8 @@ def display():
               camera_x, camera_y, camera_z,
               0, 1, 0)
 
+    draw_background()
+
     # Dessiner le système solaire
     solar_system.draw()
     show_info()
@@ -597,9 +564,6 @@ def display():
 
 # Affichage des information pour l'utilisateur
 def show_info():
-    glDisable(GL_LIGHTING)
-    glColor3f(1, 1, 1)
-    
     # Set up orthographic projection for text
     glMatrixMode(GL_PROJECTION)
     glPushMatrix()
@@ -625,9 +589,7 @@ def show_info():
     
     y_pos = window_height - 20  # Commence en haut
     for line in text_lines:
-        glRasterPos2f(10, y_pos)
-        for char in line:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
+        hud_text.add(line, 10, y_pos)
         y_pos -= 15  # Descend pour chaque ligne
     
     # Display planet shortcuts at bottom
@@ -645,11 +607,7 @@ def show_info():
     ]
     
     # Calculate starting position for centered text
-    total_width = 0
-    for text, _ in planet_shortcuts:
-        # Convertir le texte en tableau de caractères (bytes) pour glutBitmapLength
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        total_width += glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
+    total_width = sum(hud_text.width(text) for text, _ in planet_shortcuts)
     total_width += len(planet_shortcuts) * 10  # Ajouter l'espacement
     
     start_x = (window_width - total_width) // 4
@@ -658,27 +616,20 @@ def show_info():
     x_pos = start_x
     
     for text, body in planet_shortcuts:
-        # Change color if this is the selected body
-        if selected_body == body:
-            glColor3f(0, 1, 1)  # Cyan for selected
-        else:
-            glColor3f(1, 1, 1)  # White for others
-            
-        glRasterPos2f(x_pos, y_bottom)
-        for char in text:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
-        
-        # Add spacing between items
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        text_width = glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
-        x_pos += text_width + 12  # 12px spacing
+        # Cyan pour le corps sélectionné, blanc pour les autres
+        color = (0, 1, 1) if selected_body == body else (1, 1, 1)
+        hud_text.add(text, x_pos, y_bottom, color)
+        x_pos += hud_text.width(text) + 12  # 12px spacing
+    
+    # Tout le texte de l'image en un seul appel, l'état (éclairage, profondeur...) réglé par la file
+    hud_text.submit(hud_queue)
+    hud_queue.flush()
     
     # Restore previous matrices
     glPopMatrix()
     glMatrixMode(GL_PROJECTION)
     glPopMatrix()
     glMatrixMode(GL_MODELVIEW)
-    glEnable(GL_LIGHTING)    
 
 
 # Fonction pour calculer la position orbitale actuelle d'une planète :
@@ -774,7 +725,7 @@ def keyboard(key, x, y):
         camera_distance = 30
         camera_x = camera_y = camera_z = 0
     
-    glutPostRedisplay()
+    scheduler.invalidate()
 
 # Fonction de centrage avec zoom dynamique
 # Modifier la fonction center_camera_on_body() pour un meilleur suivi
@@ -860,11 +811,16 @@ def reshape(width, height):
     glLoadIdentity()
     gluPerspective(45, width / height, 0.1, 1000)
     glMatrixMode(GL_MODELVIEW)
+    scheduler.invalidate()
 
-def idle():
-    solar_system.update()
+def animate():
+    """Cadence du FrameScheduler : redessine seulement si la simulation ou la caméra a bougé"""
+    moved = solar_system.update()
+    camera = (camera_x, camera_z, camera_angle, camera_distance)
     update_camera_tracking()  # Ajout de la mise à jour du suivi
-    glutPostRedisplay()
+    # Le suivi converge sans jamais s'arrêter exactement : en deçà d'un seuil, la caméra est immobile
+    settled = max(abs(a - b) for a, b in zip(camera, (camera_x, camera_z, camera_angle, camera_distance))) < 1e-4
+    return moved or not settled
 
 
 # Fonction main
@@ -874,18 +830,26 @@ def main():
     glutInitWindowSize(1200, 800)
     glutCreateWindow(b"System Solar 3D - Simplified")
 
-    global solar_system
+    global solar_system, hud_text, hud_queue, scheduler, skybox
     solar_system = SolarSystem()
     initialize()
+    hud_text = TextBatch()
+    hud_queue = RenderQueue(cache=solar_system.render_queue.cache)
+    solar_system.enable_shaders()
 
-    load_background_texture("etoile.jpg")
+    skybox_path = os.path.join("Texture", "8k_stars_milky_way.jpg")
+    if os.path.exists(skybox_path):
+        skybox = Skybox(skybox_path, cache=texture_cache)
 
     glutDisplayFunc(display)
     glutReshapeFunc(reshape)
     glutKeyboardFunc(keyboard)
     glutMouseFunc(mouse)
     glutMotionFunc(motion)
-    glutIdleFunc(idle)
+    
+    # Pas de fonction idle : rien n'est redessiné tant que rien ne change (pause, caméra immobile)
+    scheduler = FrameScheduler(animate, on_wake=solar_system.clock.reset)
+    scheduler.start()
 
     glutMainLoop()
 
@@ -2,139 +2,80 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
 from OpenGL.GLUT import GLUT_STROKE_ROMAN, GLUT_BITMAP_9_BY_15
-from PIL import Image
 import numpy as np
 import math
-import time
 import os
-import ctypes
+
+from clock import SimulationClock
+from culling import FrustumCuller
+from ephemeris import Ephemeris, ephemeris_field
+from geometry import LineLoops
+from glstate import RenderQueue
+from illumination import compute_illumination
+from lod import LevelOfDetail
+from scheduler import FrameScheduler
+from skybox import Skybox
+from shadows import CubeShadowMap, ShadowShader
+from text import TextBatch
+from texture_cache import TextureCache
+from textures import upload_texture
 
 # --- Variables globales ---
-background_texture_id = None
-shadow_texture_id = None
-shadow_map_size = 2048  # Taille de la texture pour les ombres
-
-# Fonction pour le chargement de l'image de fond
-def load_background_texture(image_path):
-    global background_texture_id
-    try:
-        img = Image.open(image_path).convert("RGB")
-        img_data = np.array(img, dtype=np.uint8)
-
-        background_texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, background_texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.size[0], img.size[1], 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-    except Exception as e:
-        print(f"Erreur chargement image de fond: {e}")
+skybox = None  # Fond d'étoiles en cubemap (voir skybox.py)
+texture_cache = TextureCache()  # Textures décodées gardées sur disque (voir texture_cache.py)
 
 # Fonction pour le dessin de l'image de fond
 def draw_background():
-    global background_texture_id
-    if not background_texture_id:
-        return
-
-    glDisable(GL_DEPTH_TEST)
-    glDisable(GL_LIGHTING)
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    glOrtho(-1, 1, -1, 1, -1, 1)
-
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
+    # Cube centré sur la caméra, déposé dans la couche du fond de la file de rendu (dessinée avant
+    # le reste de la scène) : à appeler après gluLookAt, avant solar_system.draw()
+    if skybox is not None:
+        solar_system.render_queue.submit(skybox.draw, lighting=False, depth_test=False, depth_write=False,
+                                         layer=-1)
 
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, background_texture_id)
-
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(-1, -1)
-    glTexCoord2f(1, 0); glVertex2f( 1, -1)
-    glTexCoord2f(1, 1); glVertex2f( 1,  1)
-    glTexCoord2f(0, 1); glVertex2f(-1,  1)
-    glEnd()
-
-    glDisable(GL_TEXTURE_2D)
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-
-    glEnable(GL_DEPTH_TEST)
-    glEnable(GL_LIGHTING)
-
-# Initialisation du shadow mapping
-def init_shadow_map():
-    global shadow_texture_id
-    shadow_texture_id = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, shadow_texture_id)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_DEPTH_COMPONENT, 
-                 shadow_map_size, shadow_map_size, 0,
-                 GL_DEPTH_COMPONENT, GL_UNSIGNED_BYTE, None)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-    
-    # Création du framebuffer pour les ombres
-    shadow_fbo = glGenFramebuffers(1)
-    glBindFramebuffer(GL_FRAMEBUFFER, shadow_fbo)
-    glFramebufferTexture2D(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_TEXTURE_2D, shadow_texture_id, 0)
-    
-    glDrawBuffer(GL_NONE)
-    glReadBuffer(GL_NONE)
-    
-    status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
-    if status != GL_FRAMEBUFFER_COMPLETE:
-        print("Erreur lors de la création du framebuffer pour les ombres")
-    
-    glBindFramebuffer(GL_FRAMEBUFFER, 0)
-    return shadow_fbo
 
 class CelestialBody:
+    ephemeris = Ephemeris()  # Éphéméride partagée (remplacée par SolarSystem)
+    lod = LevelOfDetail()  # Choix de la tessellation des sphères (remplacé par SolarSystem)
+    culler = FrustumCuller()  # Corps dans le champ de la caméra (remplacé par SolarSystem)
+    shader = None  # Éclairage avec ombres portées (None : pipeline fixe, voir SolarSystem.enable_shadows)
+    render_queue = RenderQueue()  # Objets à dessiner, triés par état GL (remplacée par SolarSystem)
+
+    # Paramètres et état stockés dans l'éphéméride (le corps n'en est qu'une vue)
+    distance = ephemeris_field('distance')
+    orbital_period = ephemeris_field('orbital_period')
+    rotation_period = ephemeris_field('rotation_period')
+    orbit_angle = ephemeris_field('orbit_angle')
+    rotation_angle = ephemeris_field('rotation_angle')
+    radius = ephemeris_field('radius')
+    illumination = ephemeris_field('illumination')  # Facteur d'éclairage (1 = pleinement éclairé, 0 = dans l'ombre)
+
     def __init__(self, name, distance, orbital_period, rotation_period, radius, color, texture_path=None, moons=None):
         self.name = name
-        self.distance = distance
-        self.orbital_period = orbital_period
-        self.rotation_period = rotation_period
-        self.radius = radius
         self.color = color
         self.texture_id = None
         self.moons = moons or []
-        self.illumination = 1.0  # Facteur d'éclairage (1 = pleinement éclairé, 0 = dans l'ombre)
+        
+        self.ephemeris = CelestialBody.ephemeris
+        self.index = self.ephemeris.add_body(
+            distance, orbital_period, rotation_period,
+            orbit_angle=np.random.uniform(0, 360),
+            rotation_angle=0,
+            radius=radius
+        )
+        for moon in self.moons:
+            self.ephemeris.set_parent(moon.index, self.index)
         
         if texture_path and os.path.exists(texture_path):
             self.load_texture(texture_path)
-        
-        self.orbit_angle = np.random.uniform(0, 360)
-        self.rotation_angle = 0
     
     def load_texture(self, texture_path):
         try:
-            img = Image.open(texture_path).convert("RGB")
-            img_data = np.array(img, dtype=np.uint8)
+            levels, _ = texture_cache.load_texture(texture_path)  # Mipmaps relues du disque si déjà décodées
         except Exception as e:
             print(f"Erreur lors du chargement de {texture_path} : {e}")
             return
 
-        self.texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.size[0], img.size[1], 
-                     0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-    
-    def update(self, time_scale):
-        if self.orbital_period > 0:
-            self.orbit_angle += (360 / (self.orbital_period * 10)) * time_scale
-        
-        if self.rotation_period > 0:
-            self.rotation_angle += (360 / (self.rotation_period * 10)) * time_scale
-            
-        for moon in self.moons:
-            moon.update(time_scale)
+        self.texture_id = upload_texture(levels)
     
     def draw_saturn_rings():
         glPushMatrix()
@@ -143,79 +84,64 @@ class CelestialBody:
         glutSolidTorus(0.2, 1.5, 32, 32)  # Anneau intérieur
         glutSolidTorus(0.15, 2.0, 32, 32) # Anneau extérieur
         glPopMatrix()       
-            
-    def update_illumination(self, sun_position):
-        """Calcule l'éclairage en fonction de la position du soleil"""
+
+    def draw_lit_sphere(self):
+        """Sphère avec son matériau (texture, couleur et programme réglés par la file de rendu)"""
+        if self != solar_system.sun:
+            # Configuration du matériau pour les planètes
+            glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, 
+                        [self.color[0]*self.illumination, 
+                         self.color[1]*self.illumination,
+                         self.color[2]*self.illumination, 1.0])
+        else:
+            # Configuration spéciale pour le soleil (émet sa propre lumière)
+            glMaterialfv(GL_FRONT, GL_EMISSION, [0.8, 0.7, 0.6, 1.0])
+            glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1.0, 0.9, 0.7, 1.0])
+        
+        self.lod.draw_sphere(self, self.radius)  # Tessellation adaptée à la taille à l'écran
+        
+        # Réinitialiser les propriétés d'émission pour les autres objets
         if self == solar_system.sun:
-            self.illumination = 1.0
-            return
-            
-        # Position actuelle de la planète
-        angle_rad = math.radians(self.orbit_angle)
-        planet_pos = np.array([
-            self.distance * math.cos(angle_rad),
-            0,
-            self.distance * math.sin(angle_rad)
-        ])
-        
-        # Vecteur soleil -> planète
-        sun_to_planet = planet_pos - sun_position
-        sun_to_planet_normalized = sun_to_planet / np.linalg.norm(sun_to_planet)
-        
-        # Normal à la surface (pointe vers l'extérieur de la planète)
-        normal = planet_pos / np.linalg.norm(planet_pos)
-        
-        # Calcul de l'éclairage (modèle de Lambert amélioré)
-        dot_product = max(0, np.dot(normal, sun_to_planet_normalized))
-        self.illumination = 0.2 + 0.8 * dot_product  # 0.2 = lumière ambiante
-        
-        # Mettre à jour l'éclairage des lunes
-        for moon in self.moons:
-            moon.update_illumination(planet_pos)
+            glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
 
-    def draw(self, shadow_pass=False):
+    def draw(self):
+        if not self.culler.system_in_view(self.index):
+            return  # Le corps et toutes ses lunes sont hors du champ de la caméra
+        
         glPushMatrix()
         glRotatef(self.orbit_angle, 0, 1, 0)
         glTranslatef(self.distance, 0, 0)
         
-        if self != solar_system.sun:
+        is_sun = self == solar_system.sun
+        if not is_sun:
             glRotatef(self.rotation_angle, 0, 1, 0)
-            
-            if not shadow_pass:
-                # Configuration du matériau pour les planètes
-                glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, 
-                            [self.color[0]*self.illumination, 
-                             self.color[1]*self.illumination,
-                             self.color[2]*self.illumination, 1.0])
-        else:
-            if not shadow_pass:
-                # Configuration spéciale pour le soleil (émet sa propre lumière)
-                glMaterialfv(GL_FRONT, GL_EMISSION, [0.8, 0.7, 0.6, 1.0])
-                glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1.0, 0.9, 0.7, 1.0])
-        
-        if not shadow_pass and self.texture_id:
-            glEnable(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, self.texture_id)
-            quad = gluNewQuadric()
-            gluQuadricTexture(quad, GL_TRUE)
-            gluQuadricNormals(quad, GLU_SMOOTH)
-            gluSphere(quad, self.radius, 32, 32)
-            gluDeleteQuadric(quad)
-            glDisable(GL_TEXTURE_2D)
-        else:
-            glutSolidSphere(self.radius, 32, 32)
         
-        # Réinitialiser les propriétés d'émission pour les autres objets
-        if not shadow_pass and self == solar_system.sun:
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
+        # Déposé dans la file de rendu avec sa matrice : dessiné plus tard, regroupé par texture
+        if self.culler.body_in_view(self.index):  # Sinon ses lunes peuvent rester visibles
+            texture = self.texture_id
+            if self.shader is not None:
+                # Le shader échantillonne toujours une texture : blanche pour les corps sans texture
+                texture = texture or self.shader.white_texture
+            # La couleur (suivie par GL_COLOR_MATERIAL) porte l'éclairage calculé sur le processeur
+            illumination = 1.0 if is_sun else self.illumination
+            base = (1.0, 1.0, 1.0) if self.texture_id else self.color
+            self.render_queue.submit(self.draw_lit_sphere, texture=texture, shader=self.shader,
+                                     color=tuple(c * illumination for c in base))
         
         for moon in self.moons:
-            moon.draw(shadow_pass)
+            moon.draw()
         
         glPopMatrix()
 
 class SolarSystem:
-    def __init__(self):
+    def __init__(self, tick_rate=60, max_steps=5):
+        # Éphéméride commune à tous les corps de la scène
+        self.ephemeris = Ephemeris()
+        CelestialBody.ephemeris = self.ephemeris
+        self.lod = CelestialBody.lod = LevelOfDetail()
+        self.culler = CelestialBody.culler = FrustumCuller()
+        self.render_queue = CelestialBody.render_queue = RenderQueue()
+        
         texture_dir = "Texture/"
         if not os.path.exists(texture_dir):
             print(f"ATTENTION: Le dossier {texture_dir} n'existe pas")
@@ -307,61 +233,55 @@ class SolarSystem:
         self.planets = [self.mercury, self.venus, self.earth, self.mars, 
                        self.jupiter, self.saturn, self.uranus, self.neptune, self.pluto]
         
-        self.last_time = time.time()
+        # Tracés des orbites, calculés une fois (voir draw_orbits)
+        self.orbit_paths = LineLoops()
+        
+        # Horloge à pas fixe, comme main.py : la vitesse ne dépend plus de la cadence d'affichage
+        self.clock = SimulationClock(tick_rate=tick_rate, max_steps=max_steps)
         self.time_scale = 1.0
-        self.shadow_fbo = init_shadow_map()
+        self.shader = CelestialBody.shader = None
 
-    def update(self):
-        current_time = time.time()
-        delta_time = current_time - self.last_time
-        self.last_time = current_time
+    def update(self, now=None):
+        """Avance la simulation ; renvoie True si la scène affichée a changé
         
-        # Mettre à jour les positions
-        for planet in self.planets:
-            planet.update(self.time_scale)
-        
-        # Mettre à jour l'éclairage
-        sun_position = np.array([0, 0, 0])  # Le soleil est à l'origine
-        for planet in self.planets:
-            planet.update_illumination(sun_position)
-    
-    def render_shadow_map(self):
-        """Rend la carte d'ombres depuis la perspective du soleil"""
-        glBindFramebuffer(GL_FRAMEBUFFER, self.shadow_fbo)
-        glViewport(0, 0, shadow_map_size, shadow_map_size)
-        
-        glClear(GL_DEPTH_BUFFER_BIT)
-        glEnable(GL_DEPTH_TEST)
+        now : instant (secondes) à utiliser à la place de l'horloge réelle
+        """
+        previous_time = self.ephemeris.render_time
         
-        # Configuration de la vue depuis le soleil
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
+        # Tous les corps avancent en une seule opération par pas fixe
+        for _ in range(self.clock.tick(now)):
+            self.ephemeris.advance(self.time_scale)
         
-        # Vue orthographique couvrant tout le système solaire
-        gluOrtho2D(-40, 40, -40, 40)
-        glOrtho(-40, 40, -40, 40, -100, 100)
+        # Position d'affichage interpolée entre les deux derniers pas
+        self.ephemeris.interpolate(self.clock.alpha)
+        self.ephemeris.solve_positions()
         
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        gluLookAt(0, 10, 0,   # Position du soleil
-                  0, 0, 0,    # Centre de la scène
-                  0, 0, 1)    # Orientation
+        # Mettre à jour l'éclairage de toutes les planètes et lunes en un seul passage (éclipses comprises)
+        # Inutile avec la carte d'ombres : les éclipses sont alors des ombres portées calculées par pixel
+        if self.shader is None:
+            compute_illumination(self.ephemeris, model='lambert', light_index=self.sun.index)
         
-        # Dessiner tous les objets (sauf le soleil) en mode ombre
-        for planet in self.planets:
-            planet.draw(shadow_pass=True)
-            for moon in planet.moons:
-                moon.draw(shadow_pass=True)
-        
-        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        # Orbites et rotations dépendent du temps affiché : en pause, il ne bouge plus
+        return self.ephemeris.render_time != previous_time
+    
+    def enable_shadows(self):
+        """Active les ombres portées par le soleil ; reste en pipeline fixe si elles ne sont pas disponibles"""
+        try:
+            # Plan lointain au-delà de l'orbite (et des lunes) du corps le plus éloigné
+            far = 2 * max(planet.distance for planet in self.planets)
+            self.shader = CelestialBody.shader = ShadowShader(CubeShadowMap(size=2048, near=self.sun.radius / 2, far=far))
+        except Exception as e:
+            print(f"ATTENTION: Ombres indisponibles, éclairage en pipeline fixe ({e})")
+            self.shader = CelestialBody.shader = None
+        return self.shader is not None
     
     def draw(self):
-        # Étape 1: Rendu de la carte d'ombres
-        self.render_shadow_map()
+        self.lod.begin_frame()
+        self.culler.begin_frame(self.ephemeris)
         
-        # Étape 2: Rendu normal de la scène
-        glViewport(0, 0, glutGet(GLUT_WINDOW_WIDTH), glutGet(GLUT_WINDOW_HEIGHT))
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        # Faces de la carte d'ombres re-rendues seulement si leurs corps ont bougé
+        if self.shader is not None:
+            self.shader.begin_frame(self.ephemeris, self.sun.index)
         
         # Dessiner le soleil
         glPushMatrix()
@@ -375,23 +295,24 @@ class SolarSystem:
         
         # Dessiner les orbites
         self.draw_orbits()
+        
+        # Tout ce qui a été déposé est dessiné maintenant, trié par état (programme compris)
+        self.render_queue.flush()
+        if self.shader is not None:
+            self.shader.end_frame()  # Carte d'ombres détachée de son unité de texture
     
     def draw_orbits(self):
-        glDisable(GL_LIGHTING)
-        glColor3f(0.5, 0.5, 0.5)
-        
-        for planet in self.planets:
-            glPushMatrix()
-            glBegin(GL_LINE_LOOP)
-            for i in range(360):
-                angle = math.radians(i)
-                x = planet.distance * math.cos(angle)
-                z = planet.distance * math.sin(angle)
-                glVertex3f(x, 0, z)
-            glEnd()
-            glPopMatrix()
-        
-        glEnable(GL_LIGHTING)
+        # Tampon reconstruit uniquement si la distance d'une planète a changé
+        key = tuple(planet.distance for planet in self.planets)
+        if key != self.orbit_paths.key:
+            angle = np.radians(np.arange(360))
+            distance = np.array(key)[:, np.newaxis]
+            path = np.zeros((len(key), 360, 3))
+            path[..., 0] = distance * np.cos(angle)
+            path[..., 2] = distance * np.sin(angle)
+            self.orbit_paths.set(path, key)
+        
+        self.render_queue.submit(self.orbit_paths.draw, lighting=False, color=(0.5, 0.5, 0.5))
 
 # Variables globales
 camera_distance = 80
@@ -405,6 +326,9 @@ right_button_pressed = False
 mouse_x = 0
 mouse_y = 0
 solar_system = None
+hud_text = None  # Texte de l'interface, dessiné en un seul lot (voir text.py)
+hud_queue = None  # File de rendu de l'interface (projection en pixels), même cache d'état que la scène
+scheduler = None  # Images dessinées à la demande (voir scheduler.py)
 selected_body = None
 planet_buttons = []
 tracking_mode = False
@@ -449,7 +373,7 @@ def mouse(button, state, x, y):
     elif button == 4:  # Roulette vers le bas (zoom arrière)
         camera_distance += 2
     
-    glutPostRedisplay()
+    scheduler.invalidate()
 
 def motion(x, y):
     global camera_angle, camera_height, mouse_x, mouse_y, camera_x, camera_y, camera_z
@@ -465,17 +389,12 @@ def motion(x, y):
         camera_y -= dy * 0.01
     
     mouse_x, mouse_y = x, y
-    glutPostRedisplay()
+    scheduler.invalidate()
 
 def display():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
 
-    draw_background()
-
-    # Mettre à jour la position de la lumière (toujours au soleil)
-    glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 0.0, 0.0, 1.0])
-    
     # Position de la caméra
     cam_x = math.sin(math.radians(camera_angle)) * camera_distance + camera_x
     cam_z = math.cos(math.radians(camera_angle)) * camera_distance + camera_z
@@ -485,6 +404,12 @@ def display():
               camera_x, camera_y, camera_z,
               0, 1, 0)
 
+    draw_background()
+
+    # Mettre à jour la position de la lumière (toujours au soleil) : après la caméra,
+    # sinon elle est placée sur la caméra et ne coïncide plus avec l'origine des ombres
+    glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 0.0, 0.0, 1.0])
+
     # Dessiner le système solaire
     solar_system.draw()
     show_info()
@@ -492,9 +417,6 @@ def display():
     glutSwapBuffers()
 
 def show_info():
-    glDisable(GL_LIGHTING)
-    glColor3f(1, 1, 1)
-    
     # Set up orthographic projection for text
     glMatrixMode(GL_PROJECTION)
     glPushMatrix()
@@ -520,9 +442,7 @@ def show_info():
     
     y_pos = window_height - 20  # Commence en haut
     for line in text_lines:
-        glRasterPos2f(10, y_pos)
-        for char in line:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
+        hud_text.add(line, 10, y_pos)
         y_pos -= 15  # Descend pour chaque ligne
     
     # Display planet shortcuts at bottom
@@ -540,10 +460,7 @@ def show_info():
     ]
     
     # Calculate starting position for centered text
-    total_width = 0
-    for text, _ in planet_shortcuts:
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        total_width += glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
+    total_width = sum(hud_text.width(text) for text, _ in planet_shortcuts)
     total_width += len(planet_shortcuts) * 10  # Ajouter l'espacement
     
     start_x = (window_width - total_width) // 4
@@ -552,25 +469,20 @@ def show_info():
     x_pos = start_x
     
     for text, body in planet_shortcuts:
-        if selected_body == body:
-            glColor3f(0, 1, 1)  # Cyan for selected
-        else:
-            glColor3f(1, 1, 1)  # White for others
-            
-        glRasterPos2f(x_pos, y_bottom)
-        for char in text:
-            glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(char))
-        
-        text_bytes = (ctypes.c_ubyte * len(text))(*[ord(c) for c in text])
-        text_width = glutBitmapLength(GLUT_BITMAP_9_BY_15, text_bytes)
-        x_pos += text_width + 12  # 12px spacing
+        # Cyan pour le corps sélectionné, blanc pour les autres
+        color = (0, 1, 1) if selected_body == body else (1, 1, 1)
+        hud_text.add(text, x_pos, y_bottom, color)
+        x_pos += hud_text.width(text) + 12  # 12px spacing
+    
+    # Tout le texte de l'image en un seul appel, l'état (éclairage, profondeur...) réglé par la file
+    hud_text.submit(hud_queue)
+    hud_queue.flush()
     
     # Restore previous matrices
     glPopMatrix()
     glMatrixMode(GL_PROJECTION)
     glPopMatrix()
     glMatrixMode(GL_MODELVIEW)
-    glEnable(GL_LIGHTING)
 
 def get_body_position(body):
     """Retourne la position (x, z) actuelle d'un corps céleste."""
@@ -662,7 +574,7 @@ def keyboard(key, x, y):
         camera_distance = 30
         camera_x = camera_y = camera_z = 0
     
-    glutPostRedisplay()
+    scheduler.invalidate()
 
 def center_camera_on_body(body):
     """Centre la caméra sur le corps céleste avec un positionnement optimal."""
@@ -726,11 +638,16 @@ def reshape(width, height):
     glLoadIdentity()
     gluPerspective(45, width / height, 0.1, 1000)
     glMatrixMode(GL_MODELVIEW)
+    scheduler.invalidate()
 
-def idle():
-    solar_system.update()
+def animate():
+    """Cadence du FrameScheduler : redessine seulement si la simulation ou la caméra a bougé"""
+    moved = solar_system.update()
+    camera = (camera_x, camera_z, camera_angle, camera_distance)
     update_camera_tracking()  # Ajout de la mise à jour du suivi
-    glutPostRedisplay()
+    # Le suivi converge sans jamais s'arrêter exactement : en deçà d'un seuil, la caméra est immobile
+    settled = max(abs(a - b) for a, b in zip(camera, (camera_x, camera_z, camera_angle, camera_distance))) < 1e-4
+    return moved or not settled
 
 
 # Fonction main
@@ -740,18 +657,26 @@ def main():
     glutInitWindowSize(1200, 800)
     glutCreateWindow(b"System Solar 3D - Simplified")
 
-    global solar_system
+    global solar_system, hud_text, hud_queue, scheduler, skybox
     solar_system = SolarSystem()
     initialize()
+    hud_text = TextBatch()
+    hud_queue = RenderQueue(cache=solar_system.render_queue.cache)
+    solar_system.enable_shadows()
 
-    load_background_texture("etoile.jpg")
+    skybox_path = os.path.join("Texture", "8k_stars_milky_way.jpg")
+    if os.path.exists(skybox_path):
+        skybox = Skybox(skybox_path, cache=texture_cache)
 
     glutDisplayFunc(display)
     glutReshapeFunc(reshape)
     glutKeyboardFunc(keyboard)
     glutMouseFunc(mouse)
     glutMotionFunc(motion)
-    glutIdleFunc(idle)
+    
+    # Pas de fonction idle : rien n'est redessiné tant que rien ne change (pause, caméra immobile)
+    scheduler = FrameScheduler(animate, on_wake=solar_system.clock.reset)
+    scheduler.start()
 
     glutMainLoop()
 
@@ -0,0 +1,229 @@
+# Mode gravitationnel : intégrateur saute-mouton (leapfrog) et arbre de Barnes-Hut
+# L'arbre est construit à partir des codes de Morton triés et parcouru niveau par
+# niveau pour tous les points à la fois : aucune boucle Python par particule.
+import argparse
+import time
+
+import numpy as np
+
+
+MAX_DEPTH = 16  # 3 * 16 bits de code de Morton
+
+
+def _spread_bits(values):
+    """Intercale deux zéros entre chaque bit (entiers sur 16 bits)"""
+    v = values.astype(np.uint64)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+class Octree:
+    """Octree de Barnes-Hut : masse, centre de masse et taille de chaque cellule, par niveau"""
+
+    def __init__(self, positions, masses, max_depth=MAX_DEPTH):
+        positions = np.asarray(positions, dtype=np.float64)
+        masses = np.asarray(masses, dtype=np.float64)
+        self.max_depth = max_depth
+
+        # Cube englobant
+        low = positions.min(axis=0)
+        self.size = max(float(np.max(positions.max(axis=0) - low)), 1e-12) * (1 + 1e-9)
+        cells = np.minimum(((positions - low) / self.size * (1 << max_depth)).astype(np.int64),
+                           (1 << max_depth) - 1)
+        codes = _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << np.uint64(1)) \
+            | (_spread_bits(cells[:, 2]) << np.uint64(2))
+
+        order = np.argsort(codes, kind='stable')
+        self.codes = codes[order]
+        self.positions = positions[order]
+        self.masses = masses[order]
+        weighted = self.positions * self.masses[:, None]
+
+        # Cellules non vides de chaque niveau (début/fin dans l'ordre trié)
+        self.levels = []
+        for level in range(max_depth + 1):
+            prefix = self.codes >> np.uint64(3 * (max_depth - level))
+            starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            ends = np.r_[starts[1:], len(prefix)]
+            mass = np.add.reduceat(self.masses, starts)
+            center = np.add.reduceat(weighted, starts, axis=0) / np.maximum(mass, 1e-300)[:, None]
+            self.levels.append({
+                'code': prefix[starts],
+                'start': starts,
+                'end': ends,
+                'mass': mass,
+                'center': center,
+                'size': self.size / (1 << level),
+            })
+
+        # Lien parent -> enfants (plage contiguë dans le niveau suivant)
+        for level in range(max_depth):
+            parent = self.levels[level]
+            child_codes = self.levels[level + 1]['code']
+            first = parent['code'] << np.uint64(3)
+            parent['child_start'] = np.searchsorted(child_codes, first, side='left')
+            parent['child_end'] = np.searchsorted(child_codes, first + np.uint64(8), side='left')
+
+
+def _pairwise_contribution(targets, centers, masses, G, softening):
+    diff = centers - targets
+    dist2 = np.einsum('ij,ij->i', diff, diff) + softening * softening
+    inv = np.zeros_like(dist2)
+    np.power(dist2, -1.5, out=inv, where=dist2 > 0)
+    return diff * (G * masses * inv)[:, None]
+
+
+def _accumulate(out, index, contribution):
+    for axis in range(3):
+        out[:, axis] += np.bincount(index, weights=contribution[:, axis], minlength=len(out))
+
+
+def direct_accelerations(targets, sources, masses, G=1.0, softening=1e-3, chunk=2048):
+    """Somme directe O(N*M), utilisée en dessous du seuil de Barnes-Hut"""
+    targets = np.asarray(targets, dtype=np.float64)
+    acc = np.zeros_like(targets)
+    for begin in range(0, len(targets), chunk):
+        block = targets[begin:begin + chunk]
+        diff = sources[None, :, :] - block[:, None, :]
+        dist2 = np.einsum('ijk,ijk->ij', diff, diff) + softening * softening
+        inv = np.zeros_like(dist2)
+        np.power(dist2, -1.5, out=inv, where=dist2 > 0)
+        acc[begin:begin + chunk] = G * np.einsum('ij,ijk->ik', inv * masses, diff)
+    return acc
+
+
+def barnes_hut_accelerations(targets, tree, G=1.0, theta=0.5, softening=1e-3, leaf_size=8, chunk=8192):
+    """Accélérations en O(N log N) par parcours de l'octree, un niveau à la fois"""
+    targets = np.asarray(targets, dtype=np.float64)
+    acc = np.zeros_like(targets)
+    for begin in range(0, len(targets), chunk):
+        block = targets[begin:begin + chunk]
+        block_acc = acc[begin:begin + chunk]
+        # Paires (point, cellule) encore à examiner ; on part de la racine
+        pair_target = np.arange(len(block))
+        pair_cell = np.zeros(len(block), dtype=np.int64)
+        for level_index, level in enumerate(tree.levels):
+            if len(pair_target) == 0:
+                break
+            points = block[pair_target]
+            center = level['center'][pair_cell]
+            diff = center - points
+            dist = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+            count = level['end'][pair_cell] - level['start'][pair_cell]
+
+            far = level['size'] < theta * dist
+            leaf = ~far & ((count <= leaf_size) | (level_index == tree.max_depth))
+            open_ = ~far & ~leaf
+
+            # Cellules assez lointaines : approximation par le centre de masse
+            if np.any(far):
+                _accumulate(block_acc, pair_target[far],
+                            _pairwise_contribution(points[far], center[far], level['mass'][pair_cell[far]],
+                                                   G, softening))
+
+            # Feuilles : somme directe sur les particules de la cellule
+            if np.any(leaf):
+                leaf_target = pair_target[leaf]
+                starts = level['start'][pair_cell[leaf]]
+                counts = count[leaf]
+                owner = np.repeat(leaf_target, counts)
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                members = np.repeat(starts, counts) + offsets
+                _accumulate(block_acc, owner,
+                            _pairwise_contribution(block[owner], tree.positions[members], tree.masses[members],
+                                                   G, softening))
+
+            # Cellules trop proches : on descend vers leurs enfants
+            if level_index == tree.max_depth or not np.any(open_):
+                break
+            cells = pair_cell[open_]
+            first = level['child_start'][cells]
+            counts = level['child_end'][cells] - first
+            pair_target = np.repeat(pair_target[open_], counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_cell = np.repeat(first, counts) + offsets
+    return acc
+
+
+def accelerations(targets, sources, masses, G=1.0, theta=0.5, softening=1e-3, direct_threshold=64):
+    """Accélération gravitationnelle exercée par les sources massives sur chaque cible"""
+    sources = np.asarray(sources, dtype=np.float64)
+    masses = np.asarray(masses, dtype=np.float64)
+    massive = masses > 0  # Les particules test ne créent pas de champ
+    sources, masses = sources[massive], masses[massive]
+    if len(sources) == 0:
+        return np.zeros_like(np.asarray(targets, dtype=np.float64))
+    if len(sources) <= direct_threshold:
+        return direct_accelerations(targets, sources, masses, G, softening)
+    tree = Octree(sources, masses)
+    return barnes_hut_accelerations(targets, tree, G, theta, softening)
+
+
+class NBodySimulation:
+    """Intégrateur symplectique saute-mouton (kick-drift-kick)"""
+
+    def __init__(self, positions, velocities, masses, G=1.0, theta=0.5, softening=1e-3, direct_threshold=64):
+        self.positions = np.array(positions, dtype=np.float64)
+        self.velocities = np.array(velocities, dtype=np.float64)
+        self.masses = np.array(masses, dtype=np.float64)
+        self.previous_positions = self.positions.copy()
+        self.G = G
+        self.theta = theta
+        self.softening = softening
+        self.direct_threshold = direct_threshold
+        self.acceleration = self.compute_accelerations()
+
+    def compute_accelerations(self):
+        return accelerations(self.positions, self.positions, self.masses, self.G, self.theta,
+                             self.softening, self.direct_threshold)
+
+    def step(self, dt):
+        self.previous_positions[:] = self.positions
+        if dt == 0:
+            return  # Simulation en pause
+        self.velocities += 0.5 * dt * self.acceleration
+        self.positions += dt * self.velocities
+        self.acceleration = self.compute_accelerations()
+        self.velocities += 0.5 * dt * self.acceleration
+
+    def interpolated_positions(self, alpha):
+        return self.previous_positions + (self.positions - self.previous_positions) * alpha
+
+
+# Banc d'essai : pas par seconde en fonction de N
+def benchmark(sizes, steps=5, test_particles=False, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'N':>8} {'mode':>10} {'pas/s':>10}")
+    for n in sizes:
+        radius = rng.uniform(0.5, 40.0, n)
+        angle = rng.uniform(0, 2 * np.pi, n)
+        positions = np.stack([radius * np.cos(angle), rng.normal(0, 0.2, n), radius * np.sin(angle)], axis=1)
+        velocities = np.stack([-np.sin(angle), np.zeros(n), np.cos(angle)], axis=1) / np.sqrt(radius)[:, None]
+        if test_particles:
+            # Quelques corps massifs (soleil + planètes), le reste en particules test
+            masses = np.zeros(n)
+            masses[:10] = 1e-3
+            masses[0] = 1.0
+            positions[0] = 0
+        else:
+            masses = np.full(n, 1.0 / n)
+        simulation = NBodySimulation(positions, velocities, masses)
+        start = time.perf_counter()
+        for _ in range(steps):
+            simulation.step(0.01)
+        rate = steps / (time.perf_counter() - start)
+        print(f"{n:>8} {'test' if test_particles else 'auto':>10} {rate:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'intégrateur N-corps (Barnes-Hut)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 50000])
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--test-particles', action='store_true',
+                        help="quelques corps massifs et N particules test")
+    args = parser.parse_args()
+    benchmark(args.sizes, args.steps, args.test_particles)
@@ -0,0 +1,290 @@
+# Sélection des corps à la souris (picking)
+# Le clic est « déprojeté » en un rayon de la scène avec les matrices de la dernière image,
+# puis le rayon est intersecté avec les sphères des corps. Les sphères sont rangées dans une
+# grille régulière : le rayon ne parcourt que les cases qu'il traverse (algorithme
+# d'Amanatides et Woo) et s'arrête à la première case qui contient un impact. La construction
+# de la grille coûte bien plus qu'un test de toutes les sphères : elle n'est faite que pour une
+# scène immobile (voir BodyPicker), puis seulement mise à jour en place quand les corps bougent.
+import time
+
+from OpenGL.GL import *
+import numpy as np
+
+
+def unproject_ray(x, y, projection, modelview, viewport):
+    """Origine et direction (normée) du rayon passant par le pixel (x, y) de la fenêtre
+
+    y est compté depuis le haut (coordonnées GLUT) ; les matrices sont celles lues avec
+    glGetDoublev (ordre colonne) et viewport celui de glGetIntegerv(GL_VIEWPORT).
+    """
+    vx, vy, width, height = viewport
+    ndc_x = 2.0 * (x + 0.5 - vx) / width - 1.0
+    ndc_y = 2.0 * (height - y - 0.5 - vy) / height - 1.0
+    # Inverse de P V ; les tableaux lus sont les transposées (voir frustum_planes)
+    m = (np.asarray(modelview).reshape(4, 4) @ np.asarray(projection).reshape(4, 4)).T
+    points = np.linalg.inv(m) @ np.array([[ndc_x, ndc_x], [ndc_y, ndc_y], [-1.0, 1.0], [1.0, 1.0]])
+    near, far = (points[:3] / points[3]).T
+    direction = far - near
+    return near, direction / np.linalg.norm(direction)
+
+
+def ray_spheres(origin, direction, centers, radii):
+    """Distance le long du rayon du premier impact avec chaque sphère (inf si manquée ou derrière)"""
+    oc = centers - origin
+    along = oc @ direction
+    discriminant = radii * radii - (np.einsum('ij,ij->i', oc, oc) - along * along)
+    hit = discriminant >= 0
+    root = np.sqrt(np.where(hit, discriminant, 0.0))
+    t = along - root
+    t = np.where(t < 0, along + root, t)  # Origine dans la sphère : point de sortie
+    return np.where(hit & (t >= 0), t, np.inf)
+
+
+class UniformGrid:
+    """Sphères rangées dans une grille régulière de cases cubiques
+
+    Chaque sphère est inscrite dans toutes les cases que touche sa boîte englobante, élargie de
+    padding (fraction de case) ; celles qui en couvriraient plus de max_cells (le Soleil dans une
+    grille fine) sont testées à part, à chaque requête. cell_size par défaut : environ une sphère
+    par case occupée. Quand les sphères bougent, refit() garde l'origine, les dimensions et la
+    taille des cases et ne range à nouveau que celles qui sont sorties de leurs cases.
+    """
+
+    def __init__(self, centers, radii, cell_size=None, max_cells=64, padding=0.25, rebuild_fraction=0.25):
+        self.centers = np.asarray(centers, dtype=np.float64)
+        self.radii = np.asarray(radii, dtype=np.float64)
+        self.max_cells = max_cells
+        self.rebuild_fraction = rebuild_fraction
+        count = len(self.radii)
+        lower = self.centers - self.radii[:, np.newaxis]
+        upper = self.centers + self.radii[:, np.newaxis]
+        origin = lower.min(axis=0) if count else np.zeros(3)
+        extent = (upper.max(axis=0) - origin) if count else np.ones(3)
+
+        if cell_size is None:
+            # Autant de cases que de sphères ; une dimension presque nulle (scène plate, en disque)
+            # ne doit pas réduire la taille des cases
+            side = extent.max() / max(count, 1) ** (1 / 3)
+            cell_size = (np.prod(np.maximum(extent, side)) / max(count, 1)) ** (1 / 3)
+            if count:
+                cell_size = max(cell_size, 2 * float(np.median(self.radii)))
+        self.cell_size = float(cell_size)
+        # Marge autour de chaque sphère : elle peut bouger d'autant sans changer de cases
+        self.margin = padding * self.cell_size
+        self.origin = origin - self.margin
+        self.dims = np.maximum(np.ceil((extent + 2 * self.margin) / self.cell_size).astype(np.int64), 1)
+
+        # Position de chaque centre tant que sa sphère reste dans ses cases (infinie : testée à part)
+        self.low = np.full((count, 3), -np.inf)
+        self.high = np.full((count, 3), np.inf)
+        self.large = np.zeros(0, dtype=np.int64)
+        self.entries, self.start = self._bin(np.arange(count))
+        self.rebinned = np.zeros(0, dtype=np.int64)  # Rangées à nouveau depuis la construction
+        self.extra_entries, self.extra_start = None, None
+
+    def _cell(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.dims - 1)
+
+    def _key(self, cells):
+        return (cells[..., 2] * self.dims[1] + cells[..., 1]) * self.dims[0] + cells[..., 0]
+
+    def _bin(self, rows):
+        """Range les sphères rows (boîtes élargies de la marge) ; renvoie la table compacte de leurs cases
+
+        Les sphères trop grandes, ou qui sortent de la grille, sont ajoutées à large.
+        """
+        centers = self.centers[rows]
+        reach = (self.radii[rows] + self.margin)[:, np.newaxis]
+        box_max = self.origin + self.dims * self.cell_size
+        first = self._cell(centers - reach)
+        last = self._cell(centers + reach)
+        spans = last - first + 1
+        cells_per_sphere = np.prod(spans, axis=1)
+        inside = ((centers - reach >= self.origin) & (centers + reach <= box_max)).all(axis=1)
+        small = inside & (cells_per_sphere <= self.max_cells)
+        if not small.all():
+            self.large = np.union1d(self.large, rows[~small])
+
+        # Le centre peut aller jusqu'au bord des cases moins le rayon sans sortir de celles-ci
+        radius = self.radii[rows][:, np.newaxis]
+        self.low[rows] = np.where(small[:, np.newaxis], self.origin + first * self.cell_size + radius, -np.inf)
+        self.high[rows] = np.where(small[:, np.newaxis], self.origin + (last + 1) * self.cell_size - radius, np.inf)
+
+        # Paires (case, sphère) de toutes les petites sphères, sans boucle Python
+        repeats = cells_per_sphere[small]
+        spheres = np.repeat(np.flatnonzero(small), repeats)
+        offset = np.arange(len(spheres)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        span = spans[spheres]
+        local = np.stack([offset % span[:, 0], (offset // span[:, 0]) % span[:, 1],
+                          offset // (span[:, 0] * span[:, 1])], axis=1)
+        keys = self._key(first[spheres] + local)
+
+        # Rangement compact : les sphères de la case k sont entries[start[k]:start[k + 1]]
+        # (leur ordre dans une case est indifférent : tri non stable, bien plus rapide)
+        order = np.argsort(keys)
+        cells = int(np.prod(self.dims))
+        start = np.zeros(cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=cells), out=start[1:])
+        return rows[spheres[order]], start
+
+    def refit(self, centers):
+        """Nouvelles positions des mêmes sphères ; False s'il vaut mieux reconstruire la grille
+
+        Seules les sphères sorties de leurs cases sont rangées à nouveau (dans une seconde table,
+        leurs anciennes entrées restent et ne coûtent qu'un test de plus).
+        """
+        self.centers = np.asarray(centers, dtype=np.float64)
+        inside = ((self.centers >= self.low) & (self.centers <= self.high)).all(axis=1)
+        moved = np.flatnonzero(~inside)
+        if not len(moved):
+            return True
+        rebinned = np.union1d(self.rebinned, moved)
+        if len(rebinned) > self.rebuild_fraction * len(self.radii):
+            return False
+        self.rebinned = rebinned
+        self.extra_entries, self.extra_start = self._bin(rebinned)
+        return True
+
+    def intersect(self, origin, direction):
+        """(indice, distance) de la première sphère touchée par le rayon, (None, inf) sinon"""
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        best, best_t = None, np.inf
+        if len(self.large):
+            t = ray_spheres(origin, direction, self.centers[self.large], self.radii[self.large])
+            i = int(np.argmin(t))
+            if np.isfinite(t[i]):
+                best, best_t = int(self.large[i]), float(t[i])
+
+        # Entrée et sortie du rayon dans la boîte de la grille (méthode des dalles)
+        box_min = self.origin
+        box_max = self.origin + self.dims * self.cell_size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1.0 / direction
+            t0 = (box_min - origin) * inverse
+            t1 = (box_max - origin) * inverse
+        t_enter = np.nanmax(np.minimum(t0, t1))
+        t_exit = np.nanmin(np.maximum(t0, t1))
+        t_enter = max(t_enter, 0.0)
+        if t_enter > t_exit or t_enter >= best_t:
+            return best, best_t
+
+        # Parcours case par case
+        cell = self._cell(origin + t_enter * direction)
+        step = np.where(direction >= 0, 1, -1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = np.abs(self.cell_size * inverse)
+            boundary = self.origin + (cell + (step > 0)) * self.cell_size
+            t_next = np.where(direction != 0, (boundary - origin) * inverse, np.inf)
+        cell = [int(c) for c in cell]
+        step = [int(s) for s in step]
+        t_next = [float(t) for t in t_next]
+        delta = [float(d) for d in delta]
+        dims = [int(d) for d in self.dims]
+        start = self.start
+        extra = self.extra_start
+        while True:
+            key = (cell[2] * dims[1] + cell[1]) * dims[0] + cell[0]
+            candidates = self.entries[start[key]:start[key + 1]]
+            if extra is not None and extra[key] != extra[key + 1]:
+                candidates = np.concatenate([candidates, self.extra_entries[extra[key]:extra[key + 1]]])
+            if len(candidates):
+                t = ray_spheres(origin, direction, self.centers[candidates], self.radii[candidates])
+                i = int(np.argmin(t))
+                if t[i] < best_t:
+                    best, best_t = int(candidates[i]), float(t[i])
+            axis = t_next.index(min(t_next))
+            # Un impact avant la sortie de la case ne peut plus être battu par les cases suivantes
+            if best_t <= t_next[axis]:
+                return best, best_t
+            cell[axis] += step[axis]
+            if not 0 <= cell[axis] < dims[axis]:
+                return best, best_t
+            t_next[axis] += delta[axis]
+
+
+class BodyPicker:
+    """Sélection des corps de l'éphéméride sous le curseur
+
+    begin_frame() garde les matrices de l'image dessinée. La grille n'est construite que si les
+    corps n'ont pas bougé depuis le clic précédent (simulation en pause) : les clics suivants ne
+    coûtent alors que le parcours du rayon. Si les corps ont bougé, la grille est mise à jour en
+    place (refit) tant que peu d'entre eux ont changé de cases ; sinon elle est abandonnée et le
+    rayon est testé contre toutes les sphères, sans reconstruction à chaque clic. Un corps trop
+    petit à l'écran reste sélectionnable si son centre est à moins de tolerance pixels du clic.
+    """
+
+    def __init__(self, tolerance=6):
+        self.tolerance = tolerance
+        self.projection = None
+        self.modelview = None
+        self.viewport = None
+        self.grid = None
+        self.grid_time = None
+        self.pick_time = None  # Temps d'affichage des corps au clic précédent
+        self.stats = {'pick_ms': 0.0, 'grid_builds': 0, 'grid_refits': 0, 'brute_force': 0}
+
+    def begin_frame(self):
+        """À appeler une fois la caméra placée (gluLookAt), comme FrustumCuller.begin_frame"""
+        self.projection = glGetDoublev(GL_PROJECTION_MATRIX)
+        self.modelview = glGetDoublev(GL_MODELVIEW_MATRIX)
+        self.viewport = glGetIntegerv(GL_VIEWPORT)
+
+    def pick(self, ephemeris, x, y):
+        """Indice du corps sous le pixel (x, y) de la fenêtre (depuis le haut), None sinon"""
+        if self.modelview is None:
+            return None
+        n = ephemeris.count
+        world = ephemeris.world_position[:n]
+        start = time.perf_counter()
+        self.update_grid(ephemeris)
+
+        origin, direction = unproject_ray(x, y, self.projection, self.modelview, self.viewport)
+        if self.grid is not None:
+            index, _ = self.grid.intersect(origin, direction)
+        else:
+            t = ray_spheres(origin, direction, world, ephemeris.radius[:n])
+            index = int(np.argmin(t)) if n else None
+            if index is not None and not np.isfinite(t[index]):
+                index = None
+            self.stats['brute_force'] += 1
+        if index is None and self.tolerance:
+            index = self._nearest_on_screen(world, x, y)
+        self.stats['pick_ms'] = (time.perf_counter() - start) * 1000
+        return index
+
+    def update_grid(self, ephemeris):
+        """Grille à jour pour les positions actuelles, ou None si les corps bougent trop"""
+        n = ephemeris.count
+        if self.grid is not None and len(self.grid.radii) != n:
+            self.grid = None
+        if self.grid is not None and self.grid_time != ephemeris.render_time:
+            # Corps déplacés : seuls ceux sortis de leurs cases sont rangés à nouveau
+            if self.grid.refit(ephemeris.world_position[:n]):
+                self.grid_time = ephemeris.render_time
+                self.stats['grid_refits'] += 1
+            else:
+                self.grid = None
+        if self.grid is None and self.pick_time == ephemeris.render_time:
+            # Scène immobile depuis le clic précédent : la grille servira aux suivants
+            self.grid = UniformGrid(ephemeris.world_position[:n], ephemeris.radius[:n])
+            self.grid_time = ephemeris.render_time
+            self.stats['grid_builds'] += 1
+        self.pick_time = ephemeris.render_time
+        return self.grid
+
+    def _nearest_on_screen(self, world, x, y):
+        """Corps dont le centre projeté est le plus proche du clic, à moins de tolerance pixels"""
+        m = (np.asarray(self.modelview).reshape(4, 4) @ np.asarray(self.projection).reshape(4, 4)).T
+        clip = np.c_[world, np.ones(len(world))] @ m.T
+        front = clip[:, 3] > 0
+        if not front.any():
+            return None
+        vx, vy, width, height = self.viewport
+        ndc = clip[:, :2] / np.where(front, clip[:, 3], 1.0)[:, np.newaxis]
+        screen_x = vx + (ndc[:, 0] + 1) * width / 2
+        screen_y = height - (vy + (ndc[:, 1] + 1) * height / 2)
+        distance = np.where(front, np.hypot(screen_x - x, screen_y - y), np.inf)
+        i = int(np.argmin(distance))
+        return i if distance[i] <= self.tolerance else None
@@ -0,0 +1,142 @@
+# Enregistrement des images rendues (séquence PNG ou vidéo)
+# Lecture asynchrone : glReadPixels écrit dans un anneau de tampons de pixels (PBO) et rend
+# la main aussitôt ; le tampon n'est relu que quelques images plus tard, quand la copie par le
+# GPU est terminée. Les images relues passent par une file bornée à un groupe de threads qui
+# les compressent en PNG, ou à un processus ffmpeg qui encode la vidéo. Si l'encodage prend du
+# retard, la file pleine ralentit le rendu au lieu de remplir la mémoire.
+import ctypes
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glReadPixels as raw_glReadPixels
+from PIL import Image
+import numpy as np
+
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi', '.webm')
+
+
+class FrameRecorder:
+    """Capture les images d'une fenêtre (ou d'un framebuffer) de taille fixe
+
+    output : dossier (une image PNG par capture) ou fichier vidéo (.mp4, .mkv... via ffmpeg).
+    buffers : taille de l'anneau de PBO ; une image est relue buffers - 1 captures après sa lecture.
+    workers : threads de compression PNG (un seul écrivain pour ffmpeg, qui garde l'ordre).
+    """
+
+    def __init__(self, output, width, height, fps=30.0, buffers=3, workers=None, queue_size=8):
+        self.output = output
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_size = width * height * 4
+        self.video = os.path.splitext(output)[1].lower() in VIDEO_EXTENSIONS
+        self.stats = {'captured': 0, 'written': 0, 'queued': 0, 'wait_ms': 0.0}
+
+        # Anneau de tampons de lecture
+        self.pbos = [int(pbo) for pbo in np.atleast_1d(glGenBuffers(buffers))]
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.frame_size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.pending = []  # Indices (dans l'ordre) des captures encore dans les PBO
+        self.next_pbo = 0
+        self.frame = 0
+
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.error = None
+        if self.video:
+            self.encoder = self._start_ffmpeg()
+            workers = 1
+        else:
+            os.makedirs(output, exist_ok=True)
+            self.encoder = None
+            workers = workers or min(4, os.cpu_count() or 1)
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _start_ffmpeg(self):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg introuvable : enregistrez plutôt une séquence PNG (dossier)")
+        command = [
+            ffmpeg, '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{self.width}x{self.height}', '-r', str(self.fps),
+            '-i', '-',
+            '-vf', 'vflip',  # Lignes d'OpenGL rangées de bas en haut
+            '-pix_fmt', 'yuv420p', self.output,
+        ]
+        return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def capture(self):
+        """Lance la lecture de l'image courante (tampon arrière, avant glutSwapBuffers)"""
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        pbo = self.pbos[self.next_pbo]
+        if len(self.pending) == len(self.pbos):
+            self._collect()  # Le plus ancien tampon a eu buffers - 1 images pour se remplir
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        raw_glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.pending.append((self.frame, self.next_pbo))
+        self.next_pbo = (self.next_pbo + 1) % len(self.pbos)
+        self.frame += 1
+        self.stats['captured'] = self.frame
+
+    def _collect(self):
+        """Recopie le plus ancien PBO en mémoire et le confie aux threads d'encodage"""
+        frame, index = self.pending.pop(0)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[index])
+        pointer = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        pixels = ctypes.string_at(pointer, self.frame_size) if pointer else None
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        if pixels is None:
+            return
+
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.frames.put((frame, pixels))  # Bloque si l'encodage est en retard
+        self.stats['wait_ms'] += (time.perf_counter() - start) * 1000
+        self.stats['queued'] = self.frames.qsize()
+
+    def _work(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            frame, pixels = item
+            try:
+                if self.encoder is not None:
+                    self.encoder.stdin.write(pixels)
+                else:
+                    image = Image.frombytes('RGBA', (self.width, self.height), pixels)
+                    image = image.transpose(Image.FLIP_TOP_BOTTOM).convert('RGB')
+                    image.save(os.path.join(self.output, f"frame_{frame:05d}.png"), compress_level=1)
+            except Exception as error:  # Signalé au thread de rendu à la capture suivante
+                self.error = error
+            with self.lock:
+                self.stats['written'] += 1
+
+    def close(self):
+        """Relit les tampons restants, attend la fin de l'encodage et libère les PBO"""
+        while self.pending:
+            self._collect()
+        for _ in self.threads:
+            self.frames.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.encoder is not None:
+            self.encoder.stdin.close()
+            self.encoder.wait()
+        glDeleteBuffers(len(self.pbos), self.pbos)
+        self.pbos = []
+        if self.error is not None:
+            raise self.error
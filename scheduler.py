@@ -0,0 +1,54 @@
+# Affichage à la demande
+# Remplace la fonction idle de GLUT (appelée en boucle, un cœur à 100 %) par un minuteur
+# cadencé à la fréquence d'images voulue. Une image n'est redessinée que si la simulation a
+# avancé ou si une entrée l'a demandé (invalidate) ; quand plus rien ne change, aucun minuteur
+# n'est réarmé et la boucle GLUT dort jusqu'au prochain événement.
+import time
+
+from OpenGL.GLUT import glutPostRedisplay, glutTimerFunc
+
+
+class FrameScheduler:
+    def __init__(self, update, fps=60.0, on_wake=None):
+        self.update = update  # Appelée à chaque cadence ; renvoie True si la scène a changé
+        self.on_wake = on_wake  # Appelée au réveil, avant la première cadence (remise à zéro de l'horloge)
+        self.fps = float(fps)
+        self.dirty = True  # Une image est demandée
+        self.sleeping = True  # Aucun minuteur armé
+        self.next_time = None
+        self.stats = {'ticks': 0, 'frames': 0}
+
+    @property
+    def frame_duration(self):
+        return 1.0 / self.fps
+
+    def start(self):
+        """À appeler avant glutMainLoop"""
+        self.invalidate()
+
+    def invalidate(self):
+        """Demande une nouvelle image (souris, clavier, redimensionnement...)"""
+        self.dirty = True
+        if self.sleeping:
+            self.sleeping = False
+            if self.on_wake is not None:
+                self.on_wake()
+            self.next_time = time.perf_counter()
+            glutTimerFunc(0, self._tick, 0)
+
+    def _tick(self, value):
+        self.stats['ticks'] += 1
+        if self.update():
+            self.dirty = True
+        if not self.dirty:
+            self.sleeping = True  # Réveil par invalidate()
+            return
+
+        self.dirty = False
+        self.stats['frames'] += 1
+        glutPostRedisplay()
+
+        # Cadence régulière : l'échéance suivante ne dépend pas du temps passé à dessiner
+        now = time.perf_counter()
+        self.next_time = max(self.next_time + self.frame_duration, now)
+        glutTimerFunc(int(round((self.next_time - now) * 1000)), self._tick, 0)
@@ -0,0 +1,170 @@
+# Rendu des corps par shaders GLSL (pipeline programmable)
+# L'éclairage (modèle jour/nuit sigmoïde), l'émission du soleil et les éclipses sont
+# calculés par pixel sur la carte graphique. Le processeur n'envoie que quelques
+# uniformes par image : position du soleil et des corps occultants dans le repère caméra.
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+import numpy as np
+
+
+MAX_OCCLUDERS = 32
+
+# Modes de dessin (uniforme u_mode)
+LIT, EMISSIVE, UNLIT = 0, 1, 2
+
+VERTEX_SHADER = """
+#version 120
+varying vec3 v_position;  // Repère caméra
+varying vec3 v_normal;
+varying vec2 v_texcoord;
+varying vec4 v_color;
+
+void main() {
+    vec4 eye = gl_ModelViewMatrix * gl_Vertex;
+    v_position = eye.xyz;
+    v_normal = normalize(gl_NormalMatrix * gl_Normal);
+    v_texcoord = gl_MultiTexCoord0.xy;
+    v_color = gl_Color;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+#define MAX_OCCLUDERS %d
+uniform int u_mode;                      // 0 éclairé, 1 émissif (soleil), 2 couleur seule
+uniform sampler2D u_texture;
+uniform vec3 u_light_position;           // Centre du soleil, repère caméra
+uniform float u_light_radius;
+uniform vec3 u_light_color;
+uniform vec3 u_emission;
+uniform float u_ambient;
+uniform float u_specular;
+uniform float u_shininess;
+uniform int u_occluder_count;
+uniform vec4 u_occluders[MAX_OCCLUDERS]; // Centre (repère caméra) et rayon
+
+varying vec3 v_position;
+varying vec3 v_normal;
+varying vec2 v_texcoord;
+varying vec4 v_color;
+
+// Transition jour/nuit nette, même courbe que illumination.sigmoid_model
+float day_night(float d) {
+    if (d > 0.0)
+        return max(0.1, 1.0 / (1.0 + exp(-12.0 * (d - 0.5))));
+    return 0.02 + 0.01 * abs(d);
+}
+
+// Fraction du disque solaire visible depuis p (ombre et pénombre des autres corps)
+float sunlight(vec3 p) {
+    vec3 to_sun = u_light_position - p;
+    float sun_distance = length(to_sun);
+    vec3 direction = to_sun / sun_distance;
+    float sun_size = u_light_radius / sun_distance;
+    float light = 1.0;
+    for (int i = 0; i < MAX_OCCLUDERS; i++) {
+        if (i >= u_occluder_count)
+            break;
+        vec3 to_occluder = u_occluders[i].xyz - p;
+        float along = dot(to_occluder, direction);
+        float radius = u_occluders[i].w;
+        // Occulteur derrière le point, au-delà du soleil, ou corps portant le point lui-même
+        if (along <= radius || along >= sun_distance)
+            continue;
+        float size = radius / along;
+        float separation = length(to_occluder - along * direction) / along;
+        float cover = 1.0 - smoothstep(abs(size - sun_size), size + sun_size, separation);
+        light = min(light, 1.0 - cover * min(1.0, (size * size) / (sun_size * sun_size)));
+    }
+    return light;
+}
+
+void main() {
+    if (u_mode == 2) {
+        gl_FragColor = v_color;
+        return;
+    }
+    vec4 texel = texture2D(u_texture, v_texcoord);
+    if (u_mode == 1) {
+        gl_FragColor = vec4(texel.rgb * u_emission, texel.a);
+        return;
+    }
+    vec3 n = normalize(v_normal);
+    vec3 l = normalize(u_light_position - v_position);
+    float facing = dot(n, l);
+    float lit = day_night(facing) * sunlight(v_position);
+    float specular = 0.0;
+    if (facing > 0.0) {
+        vec3 h = normalize(l + normalize(-v_position));
+        specular = pow(max(dot(n, h), 0.0), u_shininess) * u_specular * lit;
+    }
+    vec3 base = texel.rgb * v_color.rgb;
+    gl_FragColor = vec4(base * (u_ambient + lit * u_light_color) + specular * u_light_color, v_color.a);
+}
+""" % MAX_OCCLUDERS
+
+UNIFORMS = ('u_mode', 'u_texture', 'u_light_position', 'u_light_radius', 'u_light_color', 'u_emission',
+            'u_ambient', 'u_specular', 'u_shininess', 'u_occluder_count', 'u_occluders')
+
+
+def white_texture():
+    """Texture blanche 1x1 pour les corps sans texture (les shaders échantillonnent toujours)"""
+    texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, 1, 1, 0, GL_RGB, GL_UNSIGNED_BYTE, bytes([255, 255, 255]))
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return texture
+
+
+class BodyShader:
+    """Programme GLSL des corps célestes ; lève une exception si GLSL n'est pas disponible"""
+
+    def __init__(self, light_color=(1.0, 0.9, 0.7), emission=(0.8, 0.7, 0.6),
+                 ambient=0.02, specular=0.21, shininess=30.0):
+        self.program = shaders.compileProgram(
+            shaders.compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+        )
+        self.uniforms = {name: glGetUniformLocation(self.program, name) for name in UNIFORMS}
+
+        # Constantes du matériau : envoyées une seule fois
+        glUseProgram(self.program)
+        glUniform1i(self.uniforms['u_texture'], 0)
+        glUniform3f(self.uniforms['u_light_color'], *light_color)
+        glUniform3f(self.uniforms['u_emission'], *emission)
+        glUniform1f(self.uniforms['u_ambient'], ambient)
+        glUniform1f(self.uniforms['u_specular'], specular)
+        glUniform1f(self.uniforms['u_shininess'], shininess)
+        glUseProgram(0)
+
+        self.white_texture = white_texture()
+
+    def begin_frame(self, ephemeris, light_index):
+        """Active le programme et envoie les uniformes de l'image (caméra déjà placée)"""
+        n = ephemeris.count
+        view = np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4)
+        eye = ephemeris.world_position[:n] @ view[:3, :3] + view[3, :3]
+        radius = ephemeris.radius[:n]
+
+        # Corps occultants : tous sauf le soleil, les plus gros d'abord si la place manque
+        others = np.flatnonzero((np.arange(n) != light_index) & (radius > 0))
+        others = others[np.argsort(-radius[others], kind='stable')][:MAX_OCCLUDERS]
+        occluders = np.zeros((MAX_OCCLUDERS, 4), dtype=np.float32)
+        occluders[:len(others), :3] = eye[others]
+        occluders[:len(others), 3] = radius[others]
+
+        glUseProgram(self.program)
+        glUniform1i(self.uniforms['u_mode'], LIT)
+        glUniform3f(self.uniforms['u_light_position'], *eye[light_index])
+        glUniform1f(self.uniforms['u_light_radius'], float(radius[light_index]))
+        glUniform1i(self.uniforms['u_occluder_count'], len(others))
+        glUniform4fv(self.uniforms['u_occluders'], MAX_OCCLUDERS, occluders)
+
+    def set_mode(self, mode):
+        glUniform1i(self.uniforms['u_mode'], mode)
+
+    def end_frame(self):
+        glUseProgram(0)
@@ -0,0 +1,272 @@
+# Ombres portées par le soleil (carte d'ombres cubique)
+# Le soleil est une source ponctuelle : la profondeur des corps vue depuis son centre est
+# rendue dans les six faces d'une texture cubique, puis comparée pixel par pixel pendant le
+# rendu de la scène. Une face n'est re-rendue que si les corps qu'elle contient ont bougé de
+# plus d'une fraction de texel : en pause, les ombres ne coûtent plus aucun rendu.
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+import numpy as np
+
+from culling import frustum_planes
+from geometry import draw_sphere
+from shaders import VERTEX_SHADER, white_texture
+
+
+# Direction de visée et vecteur « haut » de chaque face (convention des textures cubiques)
+FACES = (
+    ((1, 0, 0), (0, -1, 0)),
+    ((-1, 0, 0), (0, -1, 0)),
+    ((0, 1, 0), (0, 0, 1)),
+    ((0, -1, 0), (0, 0, -1)),
+    ((0, 0, 1), (0, -1, 0)),
+    ((0, 0, -1), (0, -1, 0)),
+)
+
+
+def face_matrices(light, near, far):
+    """Projection et modelview (ordre colonne, comme glGetDoublev) des six faces vues depuis light"""
+    # gluPerspective(90, 1, near, far)
+    projection = np.zeros((4, 4))
+    projection[0, 0] = projection[1, 1] = 1.0
+    projection[2, 2] = (far + near) / (near - far)
+    projection[2, 3] = 2 * far * near / (near - far)
+    projection[3, 2] = -1.0
+
+    matrices = []
+    for direction, up in FACES:
+        # gluLookAt(light, light + direction, up)
+        forward = np.array(direction, dtype=np.float64)
+        side = np.cross(forward, up)
+        view = np.identity(4)
+        view[0, :3] = side
+        view[1, :3] = np.cross(side, forward)
+        view[2, :3] = -forward
+        view[:3, 3] = -view[:3, :3] @ light
+        matrices.append((projection.T.ravel(), view.T.ravel()))
+    return matrices
+
+
+class CubeShadowMap:
+    """Carte de profondeur cubique centrée sur la lumière, mise à jour face par face"""
+
+    def __init__(self, size=1024, near=1.0, far=100.0, threshold=0.5):
+        self.size = size
+        self.near = near
+        self.far = far
+        self.threshold = threshold  # Déplacement (en texels) qui impose de re-rendre une face
+        self.light = None
+        self.matrices = None
+        self.snapshots = [None] * 6  # Corps, positions et rayons au dernier rendu de chaque face
+        self.stats = {'faces_rendered': 0, 'faces_cached': 0}
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+        for face in range(6):
+            glTexImage2D(GL_TEXTURE_CUBE_MAP_POSITIVE_X + face, 0, GL_DEPTH_COMPONENT24, size, size, 0,
+                         GL_DEPTH_COMPONENT, GL_UNSIGNED_INT, None)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        for wrap in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_CUBE_MAP, wrap, GL_CLAMP_TO_EDGE)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_TEXTURE_CUBE_MAP_POSITIVE_X, self.texture, 0)
+        glDrawBuffer(GL_NONE)
+        glReadBuffer(GL_NONE)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Framebuffer des ombres incomplet (0x{status:x})")
+
+    def invalidate(self):
+        """Force le rendu des six faces à la prochaine mise à jour"""
+        self.snapshots = [None] * 6
+
+    def update(self, ephemeris, light_index):
+        """Re-rend les faces dont le contenu a changé ; renvoie le nombre de faces rendues"""
+        n = ephemeris.count
+        world = ephemeris.world_position[:n]
+        radius = ephemeris.radius[:n]
+        light = world[light_index].copy()
+        if self.light is None or np.any(light != self.light):
+            self.light = light
+            self.matrices = face_matrices(light, self.near, self.far)
+            self.invalidate()
+
+        casters = np.flatnonzero((np.arange(n) != light_index) & (radius > 0))
+        # Taille d'un texel à la distance de chaque corps (une face couvre 90° sur size texels)
+        texel = np.linalg.norm(world[casters] - light, axis=1) * 2.0 / self.size
+
+        dirty = []
+        for face, (projection, modelview) in enumerate(self.matrices):
+            planes = frustum_planes(projection, modelview)
+            inside = np.all(world[casters] @ planes[:, :3].T + planes[:, 3] > -radius[casters, np.newaxis], axis=1)
+            rows = casters[inside]
+            snapshot = (rows, world[rows].copy(), radius[rows].copy())
+            previous = self.snapshots[face]
+            if previous is not None and np.array_equal(previous[0], rows) and np.array_equal(previous[2], snapshot[2]) \
+                    and np.all(np.linalg.norm(snapshot[1] - previous[1], axis=1) <= self.threshold * texel[inside]):
+                continue
+            self.snapshots[face] = snapshot
+            dirty.append(face)
+
+        if dirty:
+            self._render(dirty)
+        self.stats = {'faces_rendered': len(dirty), 'faces_cached': 6 - len(dirty)}
+        return len(dirty)
+
+    def _render(self, faces):
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glPushAttrib(GL_VIEWPORT_BIT | GL_ENABLE_BIT | GL_POLYGON_BIT | GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.size, self.size)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
+        glEnable(GL_DEPTH_TEST)
+        glDepthMask(GL_TRUE)
+        glColorMask(GL_FALSE, GL_FALSE, GL_FALSE, GL_FALSE)
+        # Seules les faces arrière sont enregistrées : pas d'auto-ombrage sur la face éclairée
+        glEnable(GL_CULL_FACE)
+        glCullFace(GL_FRONT)
+
+        for face in faces:
+            glFramebufferTexture2D(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_TEXTURE_CUBE_MAP_POSITIVE_X + face,
+                                   self.texture, 0)
+            glClear(GL_DEPTH_BUFFER_BIT)
+            projection, modelview = self.matrices[face]
+            glMatrixMode(GL_PROJECTION)
+            glLoadMatrixd(projection)
+            glMatrixMode(GL_MODELVIEW)
+            glLoadMatrixd(modelview)
+            rows, positions, radii = self.snapshots[face]
+            for position, radius in zip(positions, radii):
+                glPushMatrix()
+                glTranslatef(*position)
+                draw_sphere(radius, 16, 16)  # Tessellation fixe : seule la silhouette compte
+                glPopMatrix()
+
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopAttrib()
+
+
+# Sommets : VERTEX_SHADER de shaders.py (mêmes variables v_position, v_normal, v_texcoord, v_color)
+# Même modèle que le pipeline fixe (LIGHT0, matériau courant), diffus et spéculaire masqués par l'ombre
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D u_texture;
+uniform samplerCube u_shadow_map;
+uniform mat4 u_eye_to_world;
+uniform vec3 u_light_world;
+uniform vec2 u_depth_range;  // Plans proche et lointain des faces de la carte d'ombres
+uniform float u_bias;
+uniform float u_texel;          // Taille angulaire d'un texel (2 / côté de la face)
+uniform float u_normal_offset;  // Décalage le long de la normale, en texels
+
+varying vec3 v_position;
+varying vec3 v_normal;
+varying vec2 v_texcoord;
+varying vec4 v_color;
+
+float occluded(vec3 direction) {
+    // Profondeur que ce point aurait dans la face qui le contient (axe dominant)
+    vec3 a = abs(direction);
+    float z = max(a.x, max(a.y, a.z));
+    float n = u_depth_range.x, f = u_depth_range.y;
+    float depth = 0.5 * (f + n) / (f - n) - f * n / ((f - n) * z) + 0.5;
+    return depth - u_bias > textureCube(u_shadow_map, direction).r ? 1.0 : 0.0;
+}
+
+// Part de lumière reçue : 3 x 3 échantillons autour du point, décalé le long de sa normale
+float shadow(vec3 eye, vec3 normal) {
+    vec3 world_normal = (u_eye_to_world * vec4(normal, 0.0)).xyz;
+    vec3 direction = (u_eye_to_world * vec4(eye, 1.0)).xyz - u_light_world;
+    float footprint = length(direction) * u_texel;  // Taille d'un texel à cette distance
+    direction += world_normal * footprint * u_normal_offset;
+    vec3 side = normalize(cross(direction, abs(direction.y) < 0.9 * length(direction) ? vec3(0, 1, 0) : vec3(1, 0, 0)));
+    vec3 up = normalize(cross(side, direction));
+    float total = 0.0;
+    for (int i = -1; i <= 1; i++)
+        for (int j = -1; j <= 1; j++)
+            total += occluded(direction + (float(i) * side + float(j) * up) * footprint);
+    return 1.0 - total / 9.0;
+}
+
+void main() {
+    vec3 n = normalize(v_normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz - v_position);
+    float facing = max(dot(n, l), 0.0);
+    float lit = facing > 0.0 ? shadow(v_position, n) : 0.0;
+    vec4 diffuse = gl_LightSource[0].diffuse * v_color;
+    vec4 ambient = (gl_LightSource[0].ambient + gl_LightModel.ambient) * v_color;
+    float specular = 0.0;
+    if (facing > 0.0) {
+        vec3 h = normalize(l + normalize(-v_position));
+        specular = pow(max(dot(n, h), 0.0), gl_FrontMaterial.shininess);
+    }
+    vec4 texel = texture2D(u_texture, v_texcoord);
+    vec3 color = texel.rgb * (gl_FrontMaterial.emission.rgb + ambient.rgb + lit * facing * diffuse.rgb)
+        + lit * specular * gl_FrontLightProduct[0].specular.rgb;
+    gl_FragColor = vec4(color, v_color.a);
+}
+"""
+
+UNIFORMS = ('u_texture', 'u_shadow_map', 'u_eye_to_world', 'u_light_world', 'u_depth_range', 'u_bias',
+            'u_texel', 'u_normal_offset')
+
+
+class ShadowShader:
+    """Éclairage par pixel avec la carte d'ombres ; lève une exception si GLSL n'est pas disponible"""
+
+    def __init__(self, shadow_map, bias=0.0002, normal_offset=1.5, texture_unit=1):
+        self.shadow_map = shadow_map
+        self.texture_unit = texture_unit
+        # Validation impossible avant d'avoir placé les deux échantillonneurs sur des unités distinctes
+        self.program = shaders.compileProgram(
+            shaders.compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            validate=False,
+        )
+        self.uniforms = {name: glGetUniformLocation(self.program, name) for name in UNIFORMS}
+
+        glUseProgram(self.program)
+        glUniform1i(self.uniforms['u_texture'], 0)
+        glUniform1i(self.uniforms['u_shadow_map'], texture_unit)
+        glUniform2f(self.uniforms['u_depth_range'], shadow_map.near, shadow_map.far)
+        glUniform1f(self.uniforms['u_bias'], bias)
+        glUniform1f(self.uniforms['u_texel'], 2.0 / shadow_map.size)
+        glUniform1f(self.uniforms['u_normal_offset'], normal_offset)
+        glUseProgram(0)
+
+        self.white_texture = white_texture()
+
+    def begin_frame(self, ephemeris, light_index):
+        """Met à jour la carte d'ombres puis active le programme (caméra déjà placée)"""
+        self.shadow_map.update(ephemeris, light_index)
+        view = np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4)
+
+        glActiveTexture(GL_TEXTURE0 + self.texture_unit)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.shadow_map.texture)
+        glActiveTexture(GL_TEXTURE0)
+
+        glUseProgram(self.program)
+        # Inverse de la vue : les lignes lues sont déjà celles de la transposée attendue
+        glUniformMatrix4fv(self.uniforms['u_eye_to_world'], 1, GL_FALSE, np.linalg.inv(view).astype(np.float32))
+        glUniform3f(self.uniforms['u_light_world'], *self.shadow_map.light)
+
+    def end_frame(self):
+        glUseProgram(0)
+        glActiveTexture(GL_TEXTURE0 + self.texture_unit)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+        glActiveTexture(GL_TEXTURE0)
@@ -0,0 +1,157 @@
+# Fond d'étoiles en cubemap
+# L'image équirectangulaire du ciel est convertie une fois en six faces de cube, gardées dans
+# le cache de textures (relu en mémoire projetée aux lancements suivants). Le fond est un cube
+# unité centré sur la caméra (seule la rotation de la vue est gardée), dessiné sans écrire
+# dans le tampon de profondeur : il ne dépend plus du plan lointain de la projection.
+from OpenGL.GL import *
+from PIL import Image
+import numpy as np
+
+# Faces dans l'ordre de GL_TEXTURE_CUBE_MAP_POSITIVE_X + i : direction de chaque texel
+# en fonction de (sc, tc) dans [-1, 1] (convention de la spécification OpenGL)
+FACES = (
+    lambda sc, tc: (np.ones_like(sc), -tc, -sc),   # +X
+    lambda sc, tc: (-np.ones_like(sc), -tc, sc),   # -X
+    lambda sc, tc: (sc, np.ones_like(sc), tc),     # +Y
+    lambda sc, tc: (sc, -np.ones_like(sc), -tc),   # -Y
+    lambda sc, tc: (sc, -tc, np.ones_like(sc)),    # +Z
+    lambda sc, tc: (-sc, -tc, -np.ones_like(sc)),  # -Z
+)
+
+# Taille par défaut des faces : un quart de la largeur de l'image, sans dépasser cette limite
+# (le ciel de 8k donnerait six faces de 2048 pixels, environ 75 Mo et plusieurs secondes de calcul)
+MAX_FACE_SIZE = 1024
+
+CUBE_VERTICES = np.array([[x, y, z] for z in (-1, 1) for y in (-1, 1) for x in (-1, 1)], dtype=np.float32)
+CUBE_INDICES = np.array([
+    0, 2, 3, 0, 3, 1,  # -Z
+    4, 5, 7, 4, 7, 6,  # +Z
+    0, 4, 6, 0, 6, 2,  # -X
+    1, 3, 7, 1, 7, 5,  # +X
+    0, 1, 5, 0, 5, 4,  # -Y
+    2, 6, 7, 2, 7, 3,  # +Y
+], dtype=np.uint32)
+
+
+def equirectangular_to_cube(image, face_size):
+    """Six faces (6, face_size, face_size, 3) échantillonnées dans une image équirectangulaire
+
+    Même orientation que l'ancienne sphère texturée (gluSphere) : pôles selon z,
+    longitude 0 sur l'axe +y.
+    """
+    pixels = np.asarray(image.convert("RGB"), dtype=np.uint8)  # Pas de copie en float de toute l'image
+    height, width = pixels.shape[:2]
+    coords = (np.arange(face_size, dtype=np.float64) + 0.5) / face_size * 2 - 1
+    tc, sc = np.meshgrid(coords, coords, indexing='ij')
+
+    faces = np.empty((6, face_size, face_size, 3), dtype=np.uint8)
+    for i, direction in enumerate(FACES):
+        x, y, z = direction(sc, tc)
+        norm = np.sqrt(x * x + y * y + z * z)
+        theta = np.arctan2(x, y) % (2 * np.pi)
+        rho = np.arccos(np.clip(z / norm, -1.0, 1.0))
+        # Coordonnées de texture de la sphère : s = 1 - theta / 2 pi, t = 1 - rho / pi (t = 0 en haut)
+        u = (1.0 - theta / (2 * np.pi)) * width - 0.5
+        v = (1.0 - rho / np.pi) * height - 0.5
+
+        # Filtrage bilinéaire, longitude périodique
+        u0 = np.floor(u).astype(np.int64)
+        v0 = np.floor(v).astype(np.int64)
+        fu = (u - u0)[..., np.newaxis]
+        fv = (v - v0)[..., np.newaxis]
+        u1 = (u0 + 1) % width
+        u0 %= width
+        v1 = np.clip(v0 + 1, 0, height - 1)
+        v0 = np.clip(v0, 0, height - 1)
+        # Seuls les texels lus pour la face passent en float32
+        fu = fu.astype(np.float32)
+        fv = fv.astype(np.float32)
+        top = pixels[v0, u0].astype(np.float32) * (1 - fu) + pixels[v0, u1].astype(np.float32) * fu
+        bottom = pixels[v1, u0].astype(np.float32) * (1 - fu) + pixels[v1, u1].astype(np.float32) * fu
+        faces[i] = np.clip(top * (1 - fv) + bottom * fv + 0.5, 0, 255)
+    return faces
+
+
+def load_cube_faces(path, face_size=None, cache=None):
+    """Faces du cube de l'image, lues du cache (TextureCache) ou calculées puis mises en cache
+
+    Renvoie (faces, lues du cache ou non), comme TextureCache.load.
+    """
+    with Image.open(path) as image:
+        if face_size is None:
+            face_size = min(image.size[0] // 4, MAX_FACE_SIZE)  # Un quart de tour de longitude par face
+        if cache is None:
+            return equirectangular_to_cube(image, face_size), False
+
+    def convert(source):
+        with Image.open(source) as image:
+            return [equirectangular_to_cube(image, face_size)]
+
+    (faces,), cached = cache.load(path, convert, face_size, 'cube')
+    return faces, cached
+
+
+class Skybox:
+    """Cubemap du ciel et cube unité pour la dessiner"""
+
+    def __init__(self, path, face_size=None, cache=None, faces=None):
+        """faces : résultat de load_cube_faces déjà calculé (par exemple dans un thread)"""
+        maximum = int(glGetIntegerv(GL_MAX_CUBE_MAP_TEXTURE_SIZE))
+        if face_size is not None:
+            face_size = min(face_size, maximum)
+        if faces is None:
+            faces, _ = load_cube_faces(path, face_size, cache)
+        if faces.shape[1] > maximum:
+            faces, _ = load_cube_faces(path, maximum, cache)
+        self.face_size = faces.shape[1]
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        for parameter in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_CUBE_MAP, parameter, GL_CLAMP_TO_EDGE)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        for i in range(6):
+            glTexImage2D(GL_TEXTURE_CUBE_MAP_POSITIVE_X + i, 0, GL_RGB, self.face_size, self.face_size, 0,
+                         GL_RGB, GL_UNSIGNED_BYTE, np.ascontiguousarray(faces[i]))
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+        self.display_list = None
+
+    def _compile(self):
+        # Les sommets du cube servent aussi de direction dans la cubemap
+        self.display_list = glGenLists(1)
+        glNewList(self.display_list, GL_COMPILE)
+        glBegin(GL_TRIANGLES)
+        for index in CUBE_INDICES:
+            glTexCoord3fv(CUBE_VERTICES[index])
+            glVertex3fv(CUBE_VERTICES[index])
+        glEnd()
+        glEndList()
+
+    def draw(self):
+        """Dessine le fond autour de la caméra (à appeler avant le reste de la scène)"""
+        if self.display_list is None:
+            self._compile()
+
+        # Rotation de la vue seulement : le cube reste centré sur la caméra
+        view = np.array(glGetDoublev(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(4, 4)
+        view[3, :3] = 0.0
+
+        glPushAttrib(GL_ENABLE_BIT | GL_DEPTH_BUFFER_BIT | GL_TEXTURE_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glDepthMask(GL_FALSE)
+        glDisable(GL_CULL_FACE)
+        glDisable(GL_TEXTURE_2D)
+        glEnable(GL_TEXTURE_CUBE_MAP)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_REPLACE)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadMatrixd(view)
+        glCallList(self.display_list)
+        glPopMatrix()
+        glPopAttrib()
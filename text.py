@@ -0,0 +1,154 @@
+# Affichage de texte par atlas de glyphes
+# La police est rastérisée une seule fois (PIL) dans une texture ; chaque chaîne est mise en
+# page une fois en quadrilatères (position + coordonnées de texture) gardés en cache selon le
+# texte et sa position, puis tout le texte de l'image est dessiné en un seul appel, déposé
+# dans la file de rendu (glstate.py) qui règle l'état GL (texture, transparence, profondeur).
+from collections import OrderedDict
+
+from OpenGL.GL import *
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+
+
+CHARACTERS = ''.join(chr(code) for code in range(32, 256) if chr(code).isprintable())
+FONTS = ('DejaVuSansMono.ttf', 'DejaVuSans.ttf')
+
+
+def load_font(size, font_path=None):
+    """Police TrueType demandée, sinon une police système courante, sinon celle de PIL"""
+    for path in ((font_path,) if font_path else ()) + FONTS:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+class GlyphAtlas:
+    """Tous les caractères d'une police rangés dans une texture alpha"""
+
+    def __init__(self, size=15, font_path=None, atlas_width=512):
+        font = load_font(size, font_path)
+        if hasattr(font, 'getmetrics'):
+            self.ascent, self.descent = font.getmetrics()
+        else:
+            self.ascent, self.descent = font.getbbox('Ay')[3], 0
+        self.height = self.ascent + self.descent
+
+        # Rangement des glyphes ligne par ligne
+        self.advance = {}
+        cells = {}
+        x = y = 0
+        for char in CHARACTERS:
+            advance = font.getlength(char)
+            width = int(np.ceil(advance)) + 1
+            if x + width > atlas_width:
+                x, y = 0, y + self.height + 1
+            cells[char] = (x, y, width)
+            self.advance[char] = advance
+            x += width + 1
+        atlas_height = 1 << int(np.ceil(np.log2(y + self.height + 1)))
+
+        image = Image.new('L', (atlas_width, atlas_height), 0)
+        draw = ImageDraw.Draw(image)
+        # Rectangle de chaque glyphe : (x0, y0, x1, y1) en pixels et (s0, t0, s1, t1) dans la texture
+        self.quads = {}
+        for char, (x, y, width) in cells.items():
+            draw.text((x, y), char, fill=255, font=font)
+            self.quads[char] = (
+                (0, -self.descent, width, self.ascent),
+                (x / atlas_width, (y + self.height) / atlas_height, (x + width) / atlas_width, y / atlas_height),
+            )
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, atlas_width, atlas_height, 0, GL_ALPHA, GL_UNSIGNED_BYTE,
+                     image.tobytes())
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def glyph(self, char):
+        return char if char in self.quads else '?'
+
+    def width(self, text):
+        """Largeur en pixels (remplace glutBitmapLength)"""
+        return sum(self.advance[self.glyph(char)] for char in text)
+
+
+class TextBatch:
+    """Texte d'une image : add() accumule les chaînes, submit() les dépose dans une file de rendu
+    qui les dessine toutes en un appel
+
+    Les coordonnées sont en pixels, origine en bas à gauche (comme gluOrtho2D(0, w, 0, h)),
+    y étant la ligne de base comme pour glRasterPos.
+    """
+
+    def __init__(self, atlas=None, max_layouts=512):
+        self.atlas = atlas or GlyphAtlas()
+        self.max_layouts = max_layouts
+        self.layouts = OrderedDict()  # (texte, x, y) -> sommets (4 par caractère, x y s t)
+        self.pending = []
+        self.stats = {'strings': 0, 'glyphs': 0, 'cached_layouts': 0}
+
+    def layout(self, text, x, y):
+        """Quadrilatères de la chaîne, calculés au premier appel puis repris du cache"""
+        key = (text, x, y)
+        vertices = self.layouts.get(key)
+        if vertices is not None:
+            self.layouts.move_to_end(key)
+            return vertices
+        vertices = np.empty((len(text), 4, 4), dtype=np.float32)
+        pen = float(x)
+        for i, char in enumerate(text):
+            char = self.atlas.glyph(char)
+            (x0, y0, x1, y1), (s0, t0, s1, t1) = self.atlas.quads[char]
+            left = round(pen)  # Glyphes alignés sur les pixels : texture lue sans filtrage
+            vertices[i] = ((left + x0, y + y0, s0, t0), (left + x1, y + y0, s1, t0),
+                           (left + x1, y + y1, s1, t1), (left + x0, y + y1, s0, t1))
+            pen += self.atlas.advance[char]
+        vertices = vertices.reshape(-1, 4)
+        self.layouts[key] = vertices
+        if len(self.layouts) > self.max_layouts:
+            self.layouts.popitem(last=False)  # Chaîne la moins récemment affichée
+        return vertices
+
+    def add(self, text, x, y, color=(1.0, 1.0, 1.0)):
+        if text:
+            self.pending.append((self.layout(text, x, y), color))
+
+    def width(self, text):
+        return self.atlas.width(text)
+
+    def submit(self, render_queue, layer=0):
+        """Dépose le texte accumulé dans la file (RenderQueue), à vider avec la projection en pixels en place"""
+        render_queue.submit(self.draw, texture=self.atlas.texture, blend=True, lighting=False, depth_test=False,
+                            depth_write=False, layer=layer)
+
+    def draw(self):
+        """Dessine tout le texte accumulé puis vide le lot (état réglé par la file de rendu)"""
+        pending, self.pending = self.pending, []
+        glyphs = sum(len(vertices) for vertices, _ in pending) // 4
+        self.stats = {'strings': len(pending), 'glyphs': glyphs, 'cached_layouts': len(self.layouts)}
+        if not pending:
+            return
+        vertices = np.concatenate([vertices for vertices, _ in pending])
+        colors = np.concatenate([np.tile(np.asarray(color, dtype=np.float32), (len(vertices), 1))
+                                 for vertices, color in pending])
+
+        glPushAttrib(GL_CURRENT_BIT)  # Les couleurs par sommet changent la couleur courante, gardée par la file
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        # Tableaux contigus séparés (PyOpenGL recopierait une vue entrelacée)
+        glVertexPointer(2, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 0:2]))
+        glTexCoordPointer(2, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 2:4]))
+        glColorPointer(colors.shape[1], GL_FLOAT, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+        glPopClientAttrib()
+        glPopAttrib()
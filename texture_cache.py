@@ -0,0 +1,150 @@
+# Cache disque des textures décodées
+# Les images décodées (avec toute leur chaîne de mipmaps) sont écrites une fois dans un
+# fichier brut, relu aux lancements suivants en mémoire projetée : les pixels partent vers
+# OpenGL sans passer par PIL. Le nom du fichier dépend du chemin, de la taille et de la date
+# de l'image source. Le dossier a une taille maximale : les entrées les moins récemment
+# utilisées (date de modification, mise à jour à chaque lecture) sont supprimées au-delà.
+import hashlib
+import os
+import struct
+import threading
+
+from PIL import Image
+import numpy as np
+
+from textures import decode_image
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = "texture_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+MAGIC = b"TXC1"
+SUFFIX = ".txc"
+
+
+def mip_chain(pixels):
+    """Niveaux de mipmap jusqu'à 1x1 (filtre boîte), mêmes tailles que celles attendues par OpenGL"""
+    levels = [np.ascontiguousarray(pixels)]
+    mode = {3: 'RGB', 4: 'RGBA'}[pixels.shape[2]]
+    image = Image.fromarray(levels[0], mode)
+    while max(image.size) > 1:
+        width, height = image.size
+        image = image.resize((max(1, width // 2), max(1, height // 2)), Image.BOX)
+        levels.append(np.asarray(image, dtype=np.uint8))
+    return levels
+
+
+def write_arrays(path, arrays):
+    """En-tête (nombre de tableaux, forme de chacun) puis les pixels uint8 bout à bout"""
+    header = [MAGIC, struct.pack("<I", len(arrays))]
+    for array in arrays:
+        header.append(struct.pack("<I", array.ndim) + struct.pack(f"<{array.ndim}I", *array.shape))
+    with open(path, "wb") as file:
+        file.write(b"".join(header))
+        for array in arrays:
+            file.write(np.ascontiguousarray(array, dtype=np.uint8).tobytes())
+
+
+def read_arrays(path):
+    """Tableaux d'un fichier du cache, en mémoire projetée (aucune copie)"""
+    with open(path, "rb") as file:
+        if file.read(4) != MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier du cache de textures")
+        count, = struct.unpack("<I", file.read(4))
+        shapes = []
+        for _ in range(count):
+            ndim, = struct.unpack("<I", file.read(4))
+            shapes.append(struct.unpack(f"<{ndim}I", file.read(4 * ndim)))
+        offset = file.tell()
+    data = np.memmap(path, dtype=np.uint8, mode='r', offset=offset)
+    arrays = []
+    for shape in shapes:
+        size = int(np.prod(shape))
+        arrays.append(data[:size].reshape(shape))
+        data = data[size:]
+    return arrays
+
+
+class TextureCache:
+    """Tableaux de pixels décodés, rangés sur disque et relus en mémoire projetée"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()  # Utilisé depuis les threads de décodage
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def path(self, source, *parameters):
+        """Entrée du cache pour l'image source et les paramètres de conversion"""
+        stat = os.stat(source)
+        key = ":".join(str(part) for part in (f"v{CACHE_VERSION}", os.path.abspath(source), stat.st_size,
+                                              stat.st_mtime_ns) + parameters)
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest()[:16] + SUFFIX)
+
+    def get(self, source, *parameters):
+        """Tableaux en cache pour l'image, None s'ils n'y sont pas (ou plus)"""
+        path = self.path(source, *parameters)
+        try:
+            arrays = read_arrays(path)
+            os.utime(path)  # Utilisation récente : dernière entrée à supprimer
+        except (OSError, ValueError, struct.error):
+            with self.lock:
+                self.stats['misses'] += 1
+            return None
+        with self.lock:
+            self.stats['hits'] += 1
+        return arrays
+
+    def put(self, source, arrays, *parameters):
+        path = self.path(source, *parameters)
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        write_arrays(temporary, arrays)
+        os.replace(temporary, path)  # Jamais de fichier à moitié écrit dans le cache
+        self.evict(keep=path)
+
+    def load(self, source, convert, *parameters):
+        """Tableaux de l'image : lus du cache, sinon calculés par convert(source) puis mis en cache
+
+        Renvoie (tableaux, lus du cache ou non).
+        """
+        arrays = self.get(source, *parameters)
+        if arrays is not None:
+            return arrays, True
+        arrays = convert(source)
+        try:
+            self.put(source, arrays, *parameters)
+        except OSError as e:
+            print(f"Cache de textures : écriture impossible ({e})")
+        return arrays, False
+
+    def load_texture(self, source, mode='RGB'):
+        """Chaîne de mipmaps de l'image (niveau 0 en premier)"""
+        return self.load(source, lambda path: mip_chain(decode_image(path, mode)), mode, 'mip')
+
+    def evict(self, keep=None):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self.lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(SUFFIX):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)  # Une projection en mémoire déjà ouverte reste valide
+                except OSError:
+                    continue
+                total -= size
+                self.stats['evicted'] += 1
+
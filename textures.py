@@ -0,0 +1,178 @@
+# Chargement des textures en parallèle
+# Le décodage des images (JPEG/PNG, le plus long au démarrage) se fait dans un groupe de
+# threads, qui peut être lancé avant même la création du contexte OpenGL ; les envois à
+# OpenGL (glTexImage2D) restent sur le thread principal et se font au fur et à mesure que
+# les décodages se terminent. Le détail des temps de chaque texture est affiché à la fin.
+# Avec un cache (texture_cache.py), les pixels et leurs mipmaps sont relus du disque sans PIL.
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import time
+
+from OpenGL.GL import *
+from PIL import Image
+import numpy as np
+
+
+FORMATS = {'RGB': GL_RGB, 'RGBA': GL_RGBA}
+
+
+def decode_image(path, mode='RGB'):
+    """Pixels de l'image (hauteur, largeur, canaux) en uint8 ; appelée dans un thread"""
+    with Image.open(path) as image:
+        return np.asarray(image.convert(mode), dtype=np.uint8)
+
+
+def upload_texture(levels, mode='RGB'):
+    """Nouvelle texture à partir des pixels (un tableau, ou la liste des niveaux de mipmap)"""
+    if isinstance(levels, np.ndarray):
+        levels = [levels]
+    texture_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER,
+                    GL_LINEAR_MIPMAP_LINEAR if len(levels) > 1 else GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, pixels in enumerate(levels):
+        height, width = pixels.shape[:2]
+        glTexImage2D(GL_TEXTURE_2D, level, FORMATS[mode], width, height, 0, FORMATS[mode], GL_UNSIGNED_BYTE,
+                     np.ascontiguousarray(pixels))
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return texture_id
+
+
+class TextureLoader:
+    """Décodage dans un groupe de threads, envoi à OpenGL sur le thread principal
+
+    prefetch() lance un décodage (sans contexte OpenGL), request() demande une texture et la
+    fonction à appeler avec son identifiant, finish() envoie les textures dans l'ordre où
+    leurs décodages se terminent ; submit() et complete() font de même pour une autre
+    préparation. cache : TextureCache (texture_cache.py) ou None.
+    """
+
+    def __init__(self, workers=None, decode=decode_image, cache=None):
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="texture")
+        self.decode = decode
+        self.cache = cache
+        self.decodes = {}    # (chemin, mode) -> Future du décodage
+        self.requests = {}   # (chemin, mode) -> fonctions à appeler avec l'identifiant
+        self.textures = {}   # (chemin, mode) -> identifiant OpenGL déjà envoyé
+        self.tasks = {}      # Autres préparations sans OpenGL (voir submit)
+        self.timings = []
+        self.start_time = time.perf_counter()
+
+    def _decode_timed(self, path, mode):
+        start = time.perf_counter()
+        if self.cache is not None:
+            levels, cached = self.cache.load_texture(path, mode)
+        else:
+            levels, cached = [self.decode(path, mode)], False
+        return levels, (time.perf_counter() - start) * 1000, cached
+
+    def prefetch(self, path, mode='RGB'):
+        key = (path, mode)
+        if key not in self.decodes and key not in self.textures:
+            self.decodes[key] = self.pool.submit(self._decode_timed, path, mode)
+
+    def _run_timed(self, function, args):
+        start = time.perf_counter()
+        result, cached = function(*args)
+        return result, (time.perf_counter() - start) * 1000, cached
+
+    def submit(self, key, function, *args):
+        """Autre préparation sans OpenGL (faces du fond d'étoiles...) dans le même groupe de threads
+
+        function renvoie (résultat, lu du cache ou non), comme TextureCache.load ; key est
+        (nature, chemin de l'image). Le résultat est repris par complete().
+        """
+        if key not in self.tasks:
+            self.tasks[key] = self.pool.submit(self._run_timed, function, args)
+        return self.tasks[key]
+
+    def complete(self, key, upload):
+        """Attend la préparation key et renvoie upload(résultat), appelée sur le thread principal
+
+        Les temps (préparation, attente, envoi) figurent ensuite dans le rapport. None si la
+        préparation a échoué.
+        """
+        wait_start = time.perf_counter()
+        try:
+            result, prepare_ms, cached = self.tasks.pop(key).result()
+        except Exception as e:
+            print(f"Erreur lors de la préparation de {key[1]} : {e}")
+            return None
+        waited = (time.perf_counter() - wait_start) * 1000
+
+        start = time.perf_counter()
+        value = upload(result)
+        upload_ms = (time.perf_counter() - start) * 1000
+        self.timings.append({'path': key[1], 'kind': key[0], 'size': (result.shape[-2], result.shape[-3]),
+                             'decode_ms': prepare_ms, 'wait_ms': waited, 'upload_ms': upload_ms,
+                             'cached': cached})
+        return value
+
+    def request(self, path, callback, mode='RGB'):
+        """callback(texture_id) est appelée par finish() (tout de suite si la texture est déjà envoyée)"""
+        key = (path, mode)
+        if key in self.textures:
+            callback(self.textures[key])
+            return
+        self.prefetch(path, mode)
+        self.requests.setdefault(key, []).append(callback)
+
+    def finish(self, report=True):
+        """Envoie toutes les textures demandées, à mesure que leurs décodages se terminent"""
+        futures = {self.decodes[key]: key for key in self.requests}
+        wait_start = time.perf_counter()
+        for future in as_completed(futures):
+            key = futures[future]
+            waited = (time.perf_counter() - wait_start) * 1000
+            try:
+                levels, decode_ms, cached = future.result()
+            except Exception as e:
+                print(f"Erreur lors du chargement de {key[0]} : {e}")
+                del self.decodes[key]
+                continue
+
+            start = time.perf_counter()
+            texture_id = upload_texture(levels, key[1])
+            upload_ms = (time.perf_counter() - start) * 1000
+            self.textures[key] = texture_id
+            del self.decodes[key]
+            for callback in self.requests[key]:
+                callback(texture_id)
+            self.timings.append({'path': key[0], 'size': (levels[0].shape[1], levels[0].shape[0]),
+                                 'decode_ms': decode_ms, 'wait_ms': waited, 'upload_ms': upload_ms,
+                                 'cached': cached})
+            wait_start = time.perf_counter()
+        self.requests = {}
+        if report:
+            self.print_report()
+
+    def print_report(self):
+        """Temps de chaque texture : décodage ou lecture du cache (thread), attente et envoi (thread principal)
+
+        Les préparations de submit (faces du fond d'étoiles) y figurent avec leur nature entre parenthèses.
+        """
+        if not self.timings:
+            return
+        print("Textures :")
+        for timing in self.timings:
+            width, height = timing['size']
+            source = "cache   " if timing['cached'] else "décodage"
+            name = os.path.basename(timing['path'])
+            if 'kind' in timing:
+                name = f"{name} ({timing['kind']})"
+            print(f"  {name:<32} {width:>5}x{height:<5} "
+                  f"{source} {timing['decode_ms']:7.1f} ms  attente {timing['wait_ms']:7.1f} ms  "
+                  f"envoi {timing['upload_ms']:6.1f} ms")
+        decode = sum(timing['decode_ms'] for timing in self.timings)
+        elapsed = (time.perf_counter() - self.start_time) * 1000
+        cached = sum(timing['cached'] for timing in self.timings)
+        print(f"  {len(self.timings)} textures ({cached} du cache) : {decode:.0f} ms de préparation "
+              f"en {elapsed:.0f} ms ({self.workers} threads)")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)